@@ -8,7 +8,7 @@ from app.core.config import settings
 
 GITHUB_URL = settings.GITHUB_URL
 from app.db.session import get_db
-from app.services.github_service import GitHubService
+from app.services.github_service import GitHubService, github_singleflight
 from app.services.membership_service import MembershipService
 from app.db.models.account import OrganizationMembership, Organization
 from app.db.models.user_preferences import UserPreference
@@ -74,39 +74,44 @@ async def get_organization_members(
     headers = {
         "Accept": "application/vnd.github.v3+json",
         "User-Agent": "PipelineVision/1.0",
-        "Authorization": f"token {token}",
     }
 
-    members: OrganizationMembersResponse = []
-    async with httpx.AsyncClient() as client:
-        try:
-            page = 1
-            while True:
-                response = await client.get(
-                    f"{GITHUB_URL}/orgs/{organization.login}/members",
-                    headers=headers,
-                    params={"per_page": 100, "page": page},
-                )
-                response.raise_for_status()
-                page_members = response.json()
-                if not page_members:
-                    break
-                members.extend(page_members)
-                page += 1
-
-            return {"members": members}
-
-        except httpx.HTTPStatusError as e:
-            logger.error(
-                f"GitHub API error: {e.response.status_code} - {e.response.text}"
-            )
-            raise HTTPException(
-                status_code=e.response.status_code,
-                detail=f"GitHub API error: {e.response.text}",
-            )
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            raise HTTPException(status_code=500, detail="Internal server error")
+    try:
+        members = await github_singleflight.do(
+            f"members:{installation_id}:{organization.login}",
+            lambda: _fetch_organization_members(
+                github_service, installation_id, organization.login, headers
+            ),
+        )
+
+        return {"members": members}
+
+    except httpx.HTTPStatusError as e:
+        logger.error(f"GitHub API error: {e.response.status_code} - {e.response.text}")
+        raise HTTPException(
+            status_code=e.response.status_code,
+            detail=f"GitHub API error: {e.response.text}",
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+async def _fetch_organization_members(
+    github_service: GitHubService,
+    installation_id: int,
+    organization_login: str,
+    headers: dict,
+) -> list:
+    """Fetch every member of an organization from GitHub."""
+    members = []
+    async for page_members in github_service.paginate(
+        f"{GITHUB_URL}/orgs/{organization_login}/members",
+        headers=headers,
+        auth=github_service.installation_auth(installation_id),
+    ):
+        members.extend(page_members)
+    return members
 
 
 # TODO: Create reponse object
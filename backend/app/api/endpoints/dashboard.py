@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 from sqlalchemy import desc
 from typing import List, Optional
 from datetime import datetime, timedelta
@@ -220,14 +220,19 @@ async def get_workflow_run_jobs(run_id: str, db: Session = Depends(get_db)):
 
     Notes:
         - Duration is calculated for completed jobs.
-        - Runner name is extracted from job raw_data if available.
+        - Runner name is the one recorded when the job was ingested.
     """
 
     workflow_run = db.query(WorkflowRun).filter(WorkflowRun.run_id == run_id).first()
     if not workflow_run:
         raise HTTPException(status_code=404, detail="Workflow run not found")
 
-    jobs = db.query(Job).filter(Job.workflow_run_id == workflow_run.id).all()
+    jobs = (
+        db.query(Job)
+        .options(defer(Job.raw_data))
+        .filter(Job.workflow_run_id == workflow_run.id)
+        .all()
+    )
 
     job_summaries = []
     for job in jobs:
@@ -235,10 +240,6 @@ async def get_workflow_run_jobs(run_id: str, db: Session = Depends(get_db)):
         if job.started_at and job.completed_at:
             duration_seconds = int((job.completed_at - job.started_at).total_seconds())
 
-        runner_name = None
-        if job.raw_data and isinstance(job.raw_data, dict):
-            runner_name = job.raw_data.get("runner_name")
-
         job_summaries.append(
             JobSummary(
                 id=job.id,
@@ -249,7 +250,7 @@ async def get_workflow_run_jobs(run_id: str, db: Session = Depends(get_db)):
                 started_at=job.started_at,
                 completed_at=job.completed_at,
                 duration_seconds=duration_seconds,
-                runner_name=runner_name,
+                runner_name=job.runner_name,
             )
         )
 
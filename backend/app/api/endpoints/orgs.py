@@ -1,16 +1,40 @@
 import logging
+from datetime import datetime, timedelta
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, defer
+from sqlalchemy import func
 
 
 from app.db.session import get_db
 from app.db.models.installation import Installation
+from app.db.models.job import Job
 from app.db.models.runner import Runner
 from app.schemas.user import User
-from app.schemas.org import Runners
+from app.schemas.org import (
+    QueueTimesResponse,
+    RunnerForecastResponse,
+    RunnerJobHistoryResponse,
+    RunnerUtilizationResponse,
+    Runners,
+)
+from app.schemas.workflow_run import JobSummary
 from app.api.dependencies import get_current_user
+from app.core.config import settings
+from app.services.queue_time_service import (
+    forecast_runner_demand,
+    get_queue_time_stats,
+)
+from app.services.runner_service import (
+    runner_scheduler_election,
+    smart_runner_scheduler,
+)
+from app.services.runner_utilization_service import (
+    RESOLUTIONS,
+    get_utilization_series,
+)
+from app.utils.labels import label_names
 
 router = APIRouter()
 
@@ -21,6 +45,9 @@ logger = logging.getLogger(__name__)
 # TODO: Create response object
 @router.get("/runners")
 async def get_organization_runners(
+    labels: Optional[str] = Query(
+        None, description="Comma-separated labels the runners must all have"
+    ),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -29,9 +56,12 @@ async def get_organization_runners(
 
     This endpoint provides details about the self-hosted runners associated with the user's
     organization, including the total number of runners, their statuses (online, offline, busy),
-    and a list of all runners.
+    and a list of all runners. The counts are window aggregates over the same rows as the
+    list, so everything comes back in a single query.
 
     Args:
+        labels (Optional[str]): Only include runners that have all of these labels
+            (case-insensitive).
         user (User): The authenticated user (injected via dependency).
         db (Session): The database session (injected via dependency).
 
@@ -57,29 +87,321 @@ async def get_organization_runners(
         raise HTTPException(status_code=404, detail="No installation found")
 
     # TODO: Not a good long term solution if this label does not exist.
-    base_query = db.query(Runner).filter(
-        Runner.installation_id == installation.installation_id,
-        text(
-            "EXISTS (SELECT 1 FROM json_array_elements(labels) AS elem WHERE elem->>'name' = 'self-hosted')"
+    required_labels = {"self-hosted", *label_names(labels.split(",") if labels else [])}
+
+    rows = (
+        db.query(
+            Runner,
+            func.count().over().label("total"),
+            func.count().filter(Runner.status == "online").over().label("online"),
+            func.count().filter(Runner.status == "offline").over().label("offline"),
+            func.count().filter(Runner.busy.is_(True)).over().label("busy"),
+        )
+        .filter(
+            Runner.installation_id == installation.installation_id,
+            # GIN-indexed containment on the lowercase label names
+            Runner.label_names.contains(sorted(required_labels)),
+        )
+        .all()
+    )
+
+    counts = rows[0] if rows else None
+
+    return {
+        "total_runners": counts.total if counts else 0,
+        "runners": [Runners.from_orm(row.Runner) for row in rows],
+        "online": counts.online if counts else 0,
+        "offline": counts.offline if counts else 0,
+        "busy": counts.busy if counts else 0,
+    }
+
+
+@router.get("/runners/scheduler")
+async def get_runner_scheduler_status(user: User = Depends(get_current_user)):
+    """
+    Report which worker runs the runner sync scheduler and how its last sync went.
+
+    Args:
+        user (User): The authenticated user (injected via dependency).
+
+    Returns:
+        dict: A dictionary containing the following keys:
+            - enabled (bool): Whether the scheduler is enabled on this deployment.
+            - worker (str): Identity of the worker that served this request.
+            - is_leader (bool): Whether that worker is the scheduler leader.
+            - leader (dict | None): Identity and remaining lease of the current leader.
+            - last_sync (dict | None): Time, duration and stats of the latest sync.
+    """
+    try:
+        leader = await runner_scheduler_election.get_leader()
+    except Exception as e:
+        logger.warning(f"Failed to read runner scheduler leader: {e}")
+        leader = None
+
+    return {
+        "enabled": settings.RUNNER_SCHEDULER_ENABLED,
+        "worker": runner_scheduler_election.identity,
+        "is_leader": runner_scheduler_election.is_leader,
+        "leader": leader,
+        "last_sync": await smart_runner_scheduler.get_last_sync(),
+    }
+
+
+@router.get("/runners/utilization", response_model=RunnerUtilizationResponse)
+async def get_runner_utilization(
+    start: Optional[datetime] = Query(
+        None, description="Start of the range (UTC), 24 hours before end by default"
+    ),
+    end: Optional[datetime] = Query(
+        None, description="End of the range (UTC), now by default"
+    ),
+    resolution: Optional[str] = Query(
+        None, description="1m, 1h or 1d; picked from the range length by default"
+    ),
+    pool: Optional[str] = Query(
+        None, description="Only this runner pool, as comma-separated labels"
+    ),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Retrieve busy and idle time of the organization's runner pools over time.
+
+    Runners are grouped into pools by their label set. Series come from
+    precomputed rollups, so ranges of several months stay cheap at 1d resolution.
+
+    Args:
+        start (Optional[datetime]): Start of the range.
+        end (Optional[datetime]): End of the range.
+        resolution (Optional[str]): Bucket size of the series.
+        pool (Optional[str]): Restrict the series to one pool.
+        user (User): The authenticated user (injected via dependency).
+        db (Session): The database session (injected via dependency).
+
+    Returns:
+        RunnerUtilizationResponse: The resolution used and a series per pool.
+
+    Raises:
+        HTTPException: If the range or resolution is invalid (400), or no
+            installation is found for the user's organization (404).
+    """
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if resolution is not None and resolution not in RESOLUTIONS:
+        raise HTTPException(
+            status_code=400, detail=f"resolution must be one of {list(RESOLUTIONS)}"
+        )
+    if resolution == "1m" and end - start > timedelta(
+        days=settings.RUNNER_UTILIZATION_MINUTE_RETENTION_DAYS
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="1m resolution is only kept for "
+            f"{settings.RUNNER_UTILIZATION_MINUTE_RETENTION_DAYS} days",
+        )
+
+    installation: Installation = (
+        db.query(Installation)
+        .filter(Installation.organization_id == user["organization_id"])
+        .first()
+    )
+
+    if not installation:
+        logger.warning(f"No installation found for {user}")
+        raise HTTPException(status_code=404, detail="No installation found")
+
+    series = get_utilization_series(
+        db, installation.installation_id, start, end, resolution, pool
+    )
+    return {"start": start, "end": end, **series}
+
+
+@router.get("/runners/{runner_id}/jobs", response_model=RunnerJobHistoryResponse)
+async def get_runner_job_history(
+    runner_id: str,
+    days: int = Query(7, ge=1, le=90, description="Days of history to summarize"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of jobs to list"),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Retrieve the recent jobs of one of the organization's runners and its success rate.
+
+    Jobs are linked to their runner when they are ingested, so both the list and
+    the summary are served from the (runner_id, started_at) index on jobs.
+
+    Args:
+        runner_id (str): The GitHub runner ID.
+        days (int): Days of history to summarize.
+        limit (int): Maximum number of jobs to list, newest first.
+        user (User): The authenticated user (injected via dependency).
+        db (Session): The database session (injected via dependency).
+
+    Returns:
+        RunnerJobHistoryResponse: Job counts, success rate and average duration
+        over the period, and the most recent jobs.
+
+    Raises:
+        HTTPException: If the runner is not found in the user's organization (404).
+    """
+    runner: Runner = (
+        db.query(Runner)
+        .join(Installation, Installation.installation_id == Runner.installation_id)
+        .filter(
+            Runner.runner_id == runner_id,
+            Installation.organization_id == user["organization_id"],
+        )
+        .first()
+    )
+
+    if not runner:
+        raise HTTPException(status_code=404, detail="Runner not found")
+
+    since = datetime.utcnow() - timedelta(days=days)
+    recent = db.query(Job).filter(Job.runner_id == runner.id, Job.started_at >= since)
+
+    duration = func.extract("epoch", Job.completed_at - Job.started_at)
+    totals = recent.with_entities(
+        func.count().label("total"),
+        func.count().filter(Job.status == "completed").label("completed"),
+        func.count().filter(Job.conclusion == "success").label("successful"),
+        func.avg(duration).filter(Job.status == "completed").label("avg_duration"),
+    ).one()
+
+    jobs = (
+        recent.options(defer(Job.raw_data))
+        .order_by(Job.started_at.desc())
+        .limit(limit)
+        .all()
+    )
+
+    return {
+        "runner_id": runner.runner_id,
+        "name": runner.name,
+        "days": days,
+        "total_jobs": totals.total,
+        "completed_jobs": totals.completed,
+        "successful_jobs": totals.successful,
+        "success_rate": (
+            round(totals.successful / totals.completed, 4) if totals.completed else None
+        ),
+        "average_duration_seconds": (
+            round(float(totals.avg_duration), 1)
+            if totals.avg_duration is not None
+            else None
         ),
+        "jobs": [
+            JobSummary(
+                id=job.id,
+                job_id=job.job_id,
+                job_name=job.job_name,
+                status=job.status,
+                conclusion=job.conclusion,
+                started_at=job.started_at,
+                completed_at=job.completed_at,
+                duration_seconds=(
+                    int((job.completed_at - job.started_at).total_seconds())
+                    if job.started_at and job.completed_at
+                    else None
+                ),
+                runner_name=job.runner_name,
+            )
+            for job in jobs
+        ],
+    }
+
+
+def _get_installation(db: Session, user: User) -> Installation:
+    installation: Installation = (
+        db.query(Installation)
+        .filter(Installation.organization_id == user["organization_id"])
+        .first()
     )
 
-    total_runners = base_query.count()
+    if not installation:
+        logger.warning(f"No installation found for {user}")
+        raise HTTPException(status_code=404, detail="No installation found")
+
+    return installation
+
+
+@router.get("/runners/queue-times", response_model=QueueTimesResponse)
+async def get_runner_queue_times(
+    days: int = Query(7, ge=1, le=90, description="Days of history to summarize"),
+    pool: Optional[str] = Query(
+        None, description="Only this runner pool, as comma-separated labels"
+    ),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Retrieve how long jobs waited for a runner, per runs-on label pool.
+
+    Served from hourly rollups that are updated as jobs complete.
 
-    online_count = base_query.filter(Runner.status == "online").count()
+    Args:
+        days (int): Days of history to summarize.
+        pool (Optional[str]): Restrict the summary to one pool.
+        user (User): The authenticated user (injected via dependency).
+        db (Session): The database session (injected via dependency).
 
-    offline_count = base_query.filter(Runner.status == "offline").count()
+    Returns:
+        QueueTimesResponse: Queue time percentiles and concurrent demand per pool.
 
-    busy_count = base_query.filter(Runner.busy).count()
+    Raises:
+        HTTPException: If no installation is found for the user's organization (404).
+    """
+    installation = _get_installation(db, user)
+    since = datetime.utcnow() - timedelta(days=days)
 
-    runners = base_query.all()
+    return {
+        "days": days,
+        "pools": get_queue_time_stats(db, installation.installation_id, since, pool),
+    }
 
-    runners_list = [Runners.from_orm(r) for r in runners]
+
+@router.get("/runners/forecast", response_model=RunnerForecastResponse)
+async def get_runner_forecast(
+    weeks: int = Query(4, ge=1, le=12, description="Weeks of history to use"),
+    percentile: float = Query(
+        90, ge=50, le=100, description="Percentile of past weeks to plan for"
+    ),
+    headroom: float = Query(
+        0.2, ge=0, le=2, description="Extra capacity for bursts within an hour"
+    ),
+    pool: Optional[str] = Query(
+        None, description="Only this runner pool, as comma-separated labels"
+    ),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Forecast how many runners each pool needs for every hour of the week.
+
+    Args:
+        weeks (int): Complete weeks of history to use.
+        percentile (float): Percentile of the weekly demand to plan for.
+        headroom (float): Extra capacity as a fraction of the forecast demand.
+        pool (Optional[str]): Restrict the forecast to one pool.
+        user (User): The authenticated user (injected via dependency).
+        db (Session): The database session (injected via dependency).
+
+    Returns:
+        RunnerForecastResponse: Per pool, the forecast for each hour of the week
+        (0 is Monday 00:00 UTC) and the peak number of runners required.
+
+    Raises:
+        HTTPException: If no installation is found for the user's organization (404).
+    """
+    installation = _get_installation(db, user)
 
     return {
-        "total_runners": total_runners,
-        "runners": runners_list,
-        "online": online_count,
-        "offline": offline_count,
-        "busy": busy_count,
+        "weeks": weeks,
+        "percentile": percentile,
+        "headroom": headroom,
+        "pools": forecast_runner_demand(
+            db, installation.installation_id, weeks, percentile, headroom, pool
+        ),
     }
@@ -1,19 +1,23 @@
-import asyncio
 import json
 import logging
 import time
-from typing import Dict
+from typing import Optional
 
-import redis
 
-
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query
 from fastapi.responses import StreamingResponse
 
 from app.api.dependencies import get_current_user
 from app.schemas.user import User
+from app.services.sse_batcher import SSEEventBatcher
+from app.services.sse_connections import (
+    ConnectionRegistry,
+    SlowConsumerError,
+    event_key,
+)
 from app.services.sse_redis_manager import RedisSSEManager
 from app.core.config import settings
+from app.core.redis import get_redis
 
 
 router = APIRouter()
@@ -24,31 +28,67 @@ logger = logging.getLogger(__name__)
 # TODO: Remove dict fallback eventually
 # TODO: Weird caching issue that seems to happen when the client disconnects and reconnects
 
-try:
-    redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
-    redis_client.ping()
-    sse_manager = RedisSSEManager(redis_client)
-    logger.info(f"SSE using Redis at {settings.REDIS_URL}")
-except Exception as e:
-    sse_manager = None
-    logger.warning(f"SSE falling back to memory-based connections: {e}")
-    connections: Dict[str, asyncio.Queue] = {}
-    user_orgs: Dict[str, int] = {}
+redis_client = get_redis()
+sse_manager = RedisSSEManager(redis_client) if redis_client else None
+# Connections of this worker when Redis is unavailable
+local_connections = ConnectionRegistry()
+
+# Redis stream entry IDs, as sent in the SSE `id:` field
+LAST_EVENT_ID_PATTERN = r"^\d+-\d+$"
+
+
+async def configure_sse(redis_available: bool):
+    """
+    Choose the SSE backend once Redis has been checked at startup.
+
+    With Redis, this worker's stream reader is started so it receives events
+    broadcast by every worker.
+
+    Args:
+        redis_available (bool): Whether the shared Redis client answered a PING.
+    """
+    global sse_manager
+
+    if sse_manager and not redis_available:
+        sse_manager = None
+        logger.warning("SSE falling back to memory-based connections")
+    elif sse_manager:
+        await sse_manager.start()
+        logger.info("SSE using Redis")
+
+
+async def close_sse():
+    """Stop the stream reader before the Redis client is closed."""
+    if sse_manager:
+        await sse_manager.stop()
 
 
 @router.get("/events")
 async def stream_events(
     user: User = Depends(get_current_user),
+    last_event_id_header: Optional[str] = Header(
+        None, alias="Last-Event-ID", pattern=LAST_EVENT_ID_PATTERN
+    ),
+    last_event_id: Optional[str] = Query(None, pattern=LAST_EVENT_ID_PATTERN),
 ):
     """
     Establishes a Server-Sent Events (SSE) connection for real-time workflow run updates.
 
     This endpoint creates a persistent connection for the authenticated user, allowing the server
-    to push events to the client as they occur. Each user is assigned a unique asyncio.Queue to
-    receive events. Heartbeat messages are sent every 30 seconds to keep the connection alive.
+    to push events to the client as they occur. Each connection gets its own ID and
+    bounded queue, so a user can have several tabs open, and a client that falls
+    behind is handled by the SSE_QUEUE_POLICY. Heartbeat messages are sent every 30
+    seconds to keep the connection alive.
+
+    With Redis, events carry the ID of their entry in the organization's stream.
+    A client reconnecting with the last ID it received, in the `Last-Event-ID`
+    header or the `last_event_id` query parameter, first gets the events it
+    missed, or a `resync` event if they are no longer available.
 
     Args:
         user (User): The currently authenticated user, injected via FastAPI dependency.
+        last_event_id_header (Optional[str]): The `Last-Event-ID` header.
+        last_event_id (Optional[str]): The last event ID, for clients that can't set headers.
 
     Yields:
         str: SSE-formatted event data.
@@ -63,39 +103,46 @@ async def stream_events(
 
     if sse_manager:
         try:
-            queue = await sse_manager.register_connection(user_id, org_id)
+            connection = await sse_manager.register_connection(
+                user_id, org_id, last_event_id=last_event_id_header or last_event_id
+            )
             logger.info(f"Redis SSE: Registered user {user_id} for org {org_id}")
         except Exception as e:
             logger.error(
                 f"Redis SSE: Failed to register user {user_id} for org {org_id}: {e}"
             )
-            queue = asyncio.Queue()
-            connections[user_id] = queue
-            user_orgs[user_id] = org_id
+            connection = local_connections.add(user_id, org_id)
             logger.info(
                 f"Memory SSE: Fallback registered user {user_id} for org {org_id}"
             )
     else:
-        queue = asyncio.Queue()
-        connections[user_id] = queue
-        user_orgs[user_id] = org_id
+        connection = local_connections.add(user_id, org_id)
         logger.info(f"Memory SSE: Registered user {user_id} for org {org_id}")
         logger.info(
-            f"Memory SSE: Total connections: {len(connections)}, Total users: {len(user_orgs)}"
+            f"Memory SSE: Total connections: {len(local_connections)}, "
+            f"Total users: {len(local_connections.by_user)}"
         )
 
+    connection_id = connection.connection_id
+    queue = connection.queue
+
     async def event_stream():
         try:
             yield f"data: {json.dumps({'type': 'connected', 'org_id': org_id})}\n\n"
 
             while True:
                 try:
-                    message = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield message
-                except asyncio.TimeoutError:
-                    if sse_manager:
-                        await sse_manager.update_heartbeat(user_id)
+                    message = await queue.get(timeout=30.0)
+                    if message is not None:
+                        yield message
+                        continue
                     yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': time.time()})}\n\n"
+                except SlowConsumerError:
+                    # The browser reconnects and refetches what it missed
+                    logger.warning(
+                        f"Closing SSE connection {connection_id} of user {user_id}: queue full"
+                    )
+                    break
                 except Exception as e:
                     logger.error(f"SSE stream error for user {user_id}: {e}")
                     break
@@ -103,12 +150,9 @@ async def stream_events(
         except Exception as e:
             logger.error(f"SSE event_stream error: {e}")
         finally:
-            if sse_manager:
-                await sse_manager.unregister_connection(user_id)
-            else:
-                connections.pop(user_id, None)
-                user_orgs.pop(user_id, None)
-            logger.info(f"Cleaned up SSE connection for user {user_id}")
+            if local_connections.remove(connection_id) is None and sse_manager:
+                await sse_manager.unregister_connection(connection_id)
+            logger.info(f"Cleaned up SSE connection {connection_id} for user {user_id}")
 
     return StreamingResponse(
         event_stream(),
@@ -134,38 +178,51 @@ async def broadcast_event(org_id: int, event_type: str, data: dict):
         None
     """
     if sse_manager:
-        delivered_count = await sse_manager.broadcast_to_org(org_id, event_type, data)
-        if delivered_count > 0:
+        event_id = await sse_manager.broadcast_to_org(org_id, event_type, data)
+        if event_id:
             logger.info(
-                f"Redis SSE: Broadcasted {event_type} to {delivered_count} users in org {org_id}"
+                f"Redis SSE: Broadcasted {event_type} as {event_id} for org {org_id}"
             )
         else:
             logger.warning(
-                f"Redis SSE: No users connected to receive {event_type} for org {org_id}"
+                f"Redis SSE: Delivered {event_type} for org {org_id} to local connections only"
             )
     else:
-        message = f"data: {json.dumps({'type': event_type, **data})}\n\n"
-
-        users_to_notify = [
-            user_id
-            for user_id, user_org_id in user_orgs.items()
-            if user_org_id == org_id and user_id in connections
-        ]
-
-        for user_id in users_to_notify:
-            try:
-                queue = connections[user_id]
-                await queue.put(message)
-            except Exception as e:
-                logger.warning(f"Failed to send SSE message to user {user_id}: {e}")
-                connections.pop(user_id, None)
-                user_orgs.pop(user_id, None)
-
-        if users_to_notify:
+        event = {"type": event_type, **data}
+        message = f"data: {json.dumps(event)}\n\n"
+
+        connections_to_notify = local_connections.for_org(org_id)
+        key = event_key(event)
+        for connection in connections_to_notify:
+            connection.queue.put(message, key)
+
+        if connections_to_notify:
             logger.info(
-                f"Memory SSE: Broadcasted {event_type} to {len(users_to_notify)} users in org {org_id}"
+                f"Memory SSE: Broadcasted {event_type} to {len(connections_to_notify)} connections in org {org_id}"
             )
         else:
             logger.warning(
                 f"Memory SSE: No users connected to receive {event_type} for org {org_id}"
             )
+
+
+event_batcher = SSEEventBatcher(broadcast_event, settings.SSE_BATCH_WINDOW_SECONDS)
+
+
+def queue_event(org_id: int, event_type: str, data: dict):
+    """
+    Queues an event for an organization's clients, to be sent batched with others.
+
+    Events for the same workflow run or job within SSE_BATCH_WINDOW_SECONDS are
+    collapsed into the latest one. Use this for bursty events such as webhooks,
+    and `broadcast_event` for events that must go out right away.
+
+    Args:
+        org_id (int): The organization ID to send the event to.
+        event_type (str): The type of event being sent (e.g., 'workflow_job_completed').
+        data (dict): The event payload to send to clients.
+
+    Returns:
+        None
+    """
+    event_batcher.add(org_id, event_type, data)
@@ -1,12 +1,13 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-import httpx
 
 from app.db.session import get_db
 from app.db.models.account import AuthUser, AuthAccount
 from app.schemas.user import User, UserProfileResponse, UserProfileUpdateRequest
 from app.api.dependencies import get_current_user
+from app.core.config import settings
+from app.services.github_client import github_client
 
 logger = logging.getLogger(__name__)
 
@@ -16,24 +17,23 @@ router = APIRouter()
 # TODO: Update docstring
 async def get_github_profile_data(github_username: str, access_token: str) -> dict:
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://api.github.com/user",
-                headers={
-                    "Authorization": f"token {access_token}",
-                    "Accept": "application/vnd.github.v3+json",
-                },
-            )
-            if response.status_code == 200:
-                github_data = response.json()
-                return {
-                    "bio": github_data.get("bio"),
-                    "location": github_data.get("location"),
-                    "company": github_data.get("company"),
-                    "website": github_data.get("blog"),
-                    "avatar_url": github_data.get("avatar_url"),
-                    "github_username": github_data.get("login"),
-                }
+        response = await github_client.get(
+            f"{settings.GITHUB_URL}/user",
+            headers={
+                "Authorization": f"token {access_token}",
+                "Accept": "application/vnd.github.v3+json",
+            },
+        )
+        if response.status_code == 200:
+            github_data = response.json()
+            return {
+                "bio": github_data.get("bio"),
+                "location": github_data.get("location"),
+                "company": github_data.get("company"),
+                "website": github_data.get("blog"),
+                "avatar_url": github_data.get("avatar_url"),
+                "github_username": github_data.get("login"),
+            }
     except Exception as e:
         logger.warning(f"Failed to fetch GitHub profile data: {e}")
 
@@ -2,16 +2,17 @@ import hmac
 import hashlib
 import json
 import logging
-import asyncio
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Header
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.core.config import settings
+from app.core.redis import get_redis
 from app.services.github_service import GitHubService
+from app.services.runner_service import RunnerService, smart_runner_scheduler
 from app.services.workflow_service import WorkflowService
-from app.api.endpoints.sse import broadcast_event
+from app.api.endpoints.sse import queue_event
 from app.db.models.installation import Installation
 
 
@@ -81,6 +82,7 @@ async def github_webhook(
 
     - `workflow_run`: Updates workflow run status and broadcasts changes via SSE.
     - `workflow_job`: Updates workflow job status and broadcasts changes via SSE.
+    - `push`: Syncs workflow definitions whose files changed on the default branch.
     - `installation` (created/deleted): Handles GitHub App installation lifecycle.
 
     Args:
@@ -146,14 +148,9 @@ async def github_webhook(
                 )
                 logger.info(f"Event data: {event_data}")
 
-                asyncio.create_task(
-                    broadcast_event(
-                        installation_record.organization_id,
-                        event_type,
-                        event_data,
-                    )
+                queue_event(
+                    installation_record.organization_id, event_type, event_data
                 )
-                logger.info("SSE event broadcast task created")
             else:
                 logger.debug("No installation record found for SSE broadcast")
         except Exception as e:
@@ -182,6 +179,14 @@ async def github_webhook(
             installation["id"], workflow_job, repository
         )
 
+        # Runners change while jobs run, so poll this installation more often
+        await smart_runner_scheduler.record_activity(installation["id"])
+
+        # The job tells which runner picked it up, before the next sync does
+        await RunnerService(db, get_redis()).extract_runner_from_job_webhook(
+            installation["id"], workflow_job, payload.get("action")
+        )
+
         try:
             installation_record = (
                 db.query(Installation)
@@ -206,14 +211,9 @@ async def github_webhook(
                 )
                 logger.info(f"Job event data: {event_data}")
 
-                asyncio.create_task(
-                    broadcast_event(
-                        installation_record.organization_id,
-                        event_type,
-                        event_data,
-                    )
+                queue_event(
+                    installation_record.organization_id, event_type, event_data
                 )
-                logger.info("SSE job event broadcast task created")
             else:
                 logger.debug("No installation record found for job SSE broadcast")
         except Exception as e:
@@ -221,6 +221,23 @@ async def github_webhook(
 
         return {"status": "success", "message": "Processed workflow_job event"}
 
+    # Push payloads also carry "installation", so they must be matched first
+    if "commits" in payload and "ref" in payload:
+        installation = payload.get("installation")
+        repository = payload.get("repository")
+
+        if not installation or not repository:
+            logger.warning("Missing required fields in push payload")
+            raise HTTPException(status_code=400, detail="Missing required fields")
+
+        result = await workflow_service.process_push_event(installation["id"], payload)
+
+        return {
+            "status": "success",
+            "message": "Processed push event",
+            "workflows": result,
+        }
+
     if "installation" in payload and payload.get("action") in ["created", "deleted"]:
         logger.info(
             f"Processing installation event: {payload['action']} for installation {payload['installation']['id']}"
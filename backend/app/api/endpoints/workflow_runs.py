@@ -17,6 +17,7 @@ from app.schemas.workflow_run import (
     RepositoryBase,
     JobBase,
     JobStepBase,
+    CriticalPathAnalysis,
 )
 from app.db.session import get_db
 
@@ -335,4 +336,9 @@ async def get_workflow_run_by_id(
         url=workflow_run.url,
         repository=repository_data,
         jobs=jobs_data,
+        critical_path=(
+            CriticalPathAnalysis.model_validate(workflow_run.analysis)
+            if workflow_run.analysis
+            else None
+        ),
     )
@@ -10,6 +10,12 @@ from app.db.models.installation import Installation
 from app.db.models.job import Workflow, WorkflowRun
 from app.db.models.repository import Repository
 from app.schemas.user import User
+from app.services.critical_path_service import CriticalPathService
+from app.services.workflow_parser import get_workflow_summary, is_current
+from app.services.workflow_refresh_service import (
+    get_workflow_refresh,
+    start_workflow_refresh,
+)
 from app.db.session import get_db
 
 router = APIRouter()
@@ -143,6 +149,15 @@ async def get_workflows(
 
 
 # TODO: Create response object
+def _get_summary(workflow: Workflow) -> Optional[dict]:
+    """Return the stored workflow summary, re-parsing (cached) if it is stale."""
+    if is_current(workflow.summary, workflow.content_sha):
+        return workflow.summary
+    if workflow.content:
+        return get_workflow_summary(workflow.content, workflow.content_sha)
+    return None
+
+
 # TODO: Update docstring
 @router.get("/{workflow_id}")
 async def get_workflow_by_id(
@@ -202,6 +217,7 @@ async def get_workflow_by_id(
         "created_at": workflow.created_at,
         "updated_at": workflow.updated_at,
         "content": workflow.content,
+        "summary": _get_summary(workflow),
         "description": workflow.description,
         "badge_url": workflow.badge_url,
         "repository": (
@@ -223,6 +239,7 @@ async def get_workflow_by_id(
             ),
             "last_run_at": stats.last_run_at,
         },
+        "critical_path": CriticalPathService(db).workflow_summary(workflow.id),
     }
 
     return workflow_data
@@ -348,12 +365,24 @@ async def get_workflow_status(
     }
 
 
-# TODO: Update docstring
-@router.post("/refresh-all")
+@router.post("/refresh-all", status_code=202)
 async def refresh_all_workflows(
+    force: bool = Query(
+        False, description="Re-download files even when their SHA is unchanged"
+    ),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
+    """
+    Start a background refresh of every workflow's YAML content.
+
+    Only files whose git blob SHA changed since the last refresh are downloaded.
+    Progress is pushed over SSE as `workflow_refresh_progress` events and can also
+    be polled from `/refresh-all/{job_id}`.
+
+    Returns:
+        dict: The job status, including its `job_id`.
+    """
     installation: Installation = (
         db.query(Installation)
         .filter(Installation.organization_id == user["organization_id"])
@@ -368,47 +397,40 @@ async def refresh_all_workflows(
             status_code=404, detail="No installation found for organization"
         )
 
-    workflows_without_content = (
-        db.query(Workflow)
-        .filter(
-            Workflow.installation_id == installation.installation_id,
-            (Workflow.content.is_(None)) | (Workflow.content == ""),
-        )
-        .all()
+    job = await start_workflow_refresh(
+        installation.installation_id, installation.organization_id, force=force
     )
+    job.pop("installation_id")
+    return job
 
-    if not workflows_without_content:
-        return {
-            "status": "success",
-            "message": "All workflows already have content",
-            "refreshed_count": 0,
-        }
-
-    try:
-        from app.services.workflow_service import WorkflowService
 
-        workflow_service = WorkflowService(db)
+@router.get("/refresh-all/{job_id}")
+async def get_refresh_all_status(
+    job_id: str,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Return the progress of a background workflow refresh.
 
-        success_count = 0
-        error_count = 0
-        errors = []
+    Args:
+        job_id (str): The ID returned by `POST /refresh-all`.
 
-        for workflow in workflows_without_content:
-            try:
-                await workflow_service.refresh_workflow_content(workflow.id)
-                success_count += 1
-            except Exception as e:
-                error_count += 1
-                errors.append(f"Workflow {workflow.id} ({workflow.name}): {str(e)}")
+    Returns:
+        dict: The job status.
+    """
+    installation: Installation = (
+        db.query(Installation)
+        .filter(Installation.organization_id == user["organization_id"])
+        .first()
+    )
 
-        return {
-            "status": "completed",
-            "message": f"Refreshed {success_count} workflows successfully",
-            "refreshed_count": success_count,
-            "error_count": error_count,
-            "errors": errors,
-        }
+    job = await get_workflow_refresh(job_id)
+    if (
+        not job
+        or not installation
+        or job.pop("installation_id") != installation.installation_id
+    ):
+        raise HTTPException(status_code=404, detail="Refresh job not found")
 
-    except Exception as e:
-        logger.error(f"Failed to refresh workflows: {e}")
-        raise HTTPException(status_code=500, detail="Failed to refresh workflows")
+    return job
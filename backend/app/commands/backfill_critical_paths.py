@@ -0,0 +1,45 @@
+"""
+Compute critical-path analyses for historical workflow runs.
+
+Usage:
+    python -m app.commands.backfill_critical_paths [--batch-size 200] [--limit N] [--force]
+"""
+
+import argparse
+import logging
+
+from app.db.session import SessionLocal, Base, engine
+from app.services.critical_path_service import CriticalPathService
+from app.utils.logger import setup_logger
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--batch-size", type=int, default=200, help="Runs per batch and transaction"
+    )
+    parser.add_argument("--limit", type=int, help="Stop after this many runs")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Recompute runs that already have a current analysis",
+    )
+    args = parser.parse_args()
+
+    setup_logger()
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        analyzed = CriticalPathService(db).backfill(
+            batch_size=args.batch_size, limit=args.limit, force=args.force
+        )
+        logger.info(f"Critical path backfill finished: {analyzed} runs analyzed")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
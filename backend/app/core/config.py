@@ -6,8 +6,65 @@ load_dotenv()
 
 class Settings:
     API_V1_STR: str = "/api/v1"
-    GITHUB_URL: str = "https://api.github.com"
+    # Point the app at the local stand-in server (app/devtools/fake_github.py)
+    USE_FAKE_GITHUB: bool = os.getenv("USE_FAKE_GITHUB", "false").lower() == "true"
+    FAKE_GITHUB_URL: str = os.getenv("FAKE_GITHUB_URL", "http://localhost:9000")
+    GITHUB_URL: str = (
+        FAKE_GITHUB_URL
+        if USE_FAKE_GITHUB
+        else os.getenv("GITHUB_URL", "https://api.github.com")
+    )
+    GITHUB_SINGLEFLIGHT_REDIS: bool = (
+        os.getenv("GITHUB_SINGLEFLIGHT_REDIS", "false").lower() == "true"
+    )
+    GITHUB_PAGINATION_CONCURRENCY: int = int(
+        os.getenv("GITHUB_PAGINATION_CONCURRENCY", "8")
+    )
+    WORKFLOW_REFRESH_CONCURRENCY: int = int(
+        os.getenv("WORKFLOW_REFRESH_CONCURRENCY", "8")
+    )
+    WORKFLOW_SUMMARY_CACHE_SIZE: int = int(
+        os.getenv("WORKFLOW_SUMMARY_CACHE_SIZE", "1024")
+    )
+    RUNNER_SCHEDULER_ENABLED: bool = (
+        os.getenv("RUNNER_SCHEDULER_ENABLED", "true").lower() == "true"
+    )
+    RUNNER_SYNC_CONCURRENCY: int = int(os.getenv("RUNNER_SYNC_CONCURRENCY", "10"))
+    # Seconds before a crashed scheduler leader is replaced by another worker
+    RUNNER_SCHEDULER_LEASE_TTL: float = float(
+        os.getenv("RUNNER_SCHEDULER_LEASE_TTL", "15")
+    )
+    # Per-minute runner utilization is kept this long; hourly and daily forever
+    RUNNER_UTILIZATION_MINUTE_RETENTION_DAYS: int = int(
+        os.getenv("RUNNER_UTILIZATION_MINUTE_RETENTION_DAYS", "7")
+    )
+    RUNNER_STATE_EVENT_RETENTION_DAYS: int = int(
+        os.getenv("RUNNER_STATE_EVENT_RETENTION_DAYS", "30")
+    )
+    # Runner changes within this many seconds go out as one SSE event per org
+    RUNNER_EVENT_COALESCE_SECONDS: float = float(
+        os.getenv("RUNNER_EVENT_COALESCE_SECONDS", "1")
+    )
+    # Messages queued per SSE connection, and what to do when a client falls that
+    # far behind: "drop_oldest", "coalesce" (also keep only the latest state of
+    # each run and job) or "disconnect"
+    SSE_QUEUE_MAXSIZE: int = int(os.getenv("SSE_QUEUE_MAXSIZE", "256"))
+    SSE_QUEUE_POLICY: str = os.getenv("SSE_QUEUE_POLICY", "coalesce")
+    # Workflow run and job events within this many seconds go out as one SSE message
+    SSE_BATCH_WINDOW_SECONDS: float = float(
+        os.getenv("SSE_BATCH_WINDOW_SECONDS", "0.5")
+    )
+    # Recent events kept per organization for clients resuming with Last-Event-ID
+    SSE_STREAM_MAXLEN: int = int(os.getenv("SSE_STREAM_MAXLEN", "1000"))
+    # How often SSE connection counters are recounted from Redis with SCAN
+    SSE_STATS_RECONCILE_SECONDS: int = int(
+        os.getenv("SSE_STATS_RECONCILE_SECONDS", "300")
+    )
+    GITHUB_MAX_RETRIES: int = int(os.getenv("GITHUB_MAX_RETRIES", "3"))
+    GITHUB_REQUEST_TIMEOUT: float = float(os.getenv("GITHUB_REQUEST_TIMEOUT", "30"))
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+    # Bearer token Prometheus must send to scrape /metrics; unset disables it
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
 
     POSTGRES_HOST: str = str(os.getenv("POSTGRES_HOST"))
     POSTGRES_USER: str = str(os.getenv("POSTGRES_USER"))
@@ -16,6 +73,7 @@ class Settings:
     POSTGRES_PORT: str = str(os.getenv("POSTGRES_PORT"))
 
     REDIS_URL: str = str(os.getenv("REDIS_URL"))
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
 
     GITHUB_APP_ID: str = str(os.getenv("GITHUB_APP_ID"))
 
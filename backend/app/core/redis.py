@@ -0,0 +1,68 @@
+import logging
+from typing import Optional
+
+from redis import asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+_redis_client: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> Optional[aioredis.Redis]:
+    """
+    Return the process-wide asyncio Redis client.
+
+    The client is created lazily from `REDIS_URL` on top of a single connection
+    pool shared by every user in the process. Commands are only sent when the
+    client is used, so callers must still handle connection errors.
+
+    Returns:
+        Optional[aioredis.Redis]: The shared client, or None if Redis is not configured.
+    """
+    global _redis_client
+
+    if _redis_client is None:
+        if not settings.REDIS_URL or settings.REDIS_URL == "None":
+            return None
+        pool = aioredis.ConnectionPool.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+        )
+        _redis_client = aioredis.Redis(connection_pool=pool)
+        logger.info("Created asyncio Redis client")
+
+    return _redis_client
+
+
+async def init_redis() -> bool:
+    """
+    Create the shared client at startup and check that Redis is reachable.
+
+    Returns:
+        bool: True if Redis answered a PING.
+    """
+    client = get_redis()
+    if client is None:
+        logger.info("REDIS_URL is not set, running without Redis")
+        return False
+
+    try:
+        await client.ping()
+        logger.info("Redis connection established")
+        return True
+    except Exception as e:
+        logger.warning(f"Redis is unreachable: {e}")
+        return False
+
+
+async def close_redis():
+    """Close the shared client and disconnect its pool."""
+    global _redis_client
+
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
@@ -4,6 +4,8 @@ from sqlalchemy import (
     Integer,
     String,
     DateTime,
+    Float,
+    Index,
     JSON,
     Text,
     UniqueConstraint,
@@ -27,6 +29,9 @@ class Workflow(Base):
         name (str): The name of the workflow.
         path (str): The path to the workflow file (e.g., .github/workflows/ci.yml).
         state (str): The state of the workflow (active, disabled, etc.).
+        content_sha (str): The git blob SHA of the stored workflow file content.
+        summary (dict): Parsed structure of the workflow file (triggers, jobs, needs
+            edges, matrix dimensions and runs-on labels).
         created_at (datetime): When the workflow record was created.
         updated_at (datetime): When the workflow record was last updated.
 
@@ -50,6 +55,8 @@ class Workflow(Base):
     content = Column(Text, nullable=True)
     description = Column(String, nullable=True)
     badge_url = Column(String, nullable=True)
+    content_sha = Column(String, nullable=True)
+    summary = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(
         DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow
@@ -90,6 +97,7 @@ class WorkflowRun(Base):
         repository (Repository): The repository.
         installation (Installation): The GitHub App installation.
         jobs (list[Job]): All jobs in this workflow run.
+        analysis (WorkflowRunAnalysis): Critical-path analysis of the completed run.
     """
 
     __tablename__ = "workflow_runs"
@@ -126,6 +134,55 @@ class WorkflowRun(Base):
     repository = relationship("Repository", back_populates="workflow_runs")
     installation = relationship("Installation", back_populates="workflow_runs")
     jobs = relationship("Job", back_populates="workflow_run")
+    analysis = relationship(
+        "WorkflowRunAnalysis",
+        back_populates="workflow_run",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
+
+
+class WorkflowRunAnalysis(Base):
+    """
+    Critical-path analysis of a completed workflow run.
+
+    Attributes:
+        id (int): The unique identifier for the analysis in the database.
+        workflow_run_id (int): The analyzed workflow run.
+        workflow_id (int): The workflow of the run (denormalized for aggregation).
+        version (int): Version of the analysis algorithm that produced the row.
+        critical_path (JSON): Job database IDs on the critical path, in execution order.
+        critical_path_seconds (float): Length of the critical path using job durations only.
+        wall_clock_seconds (float): Time from run start to the last job completing.
+        jobs (JSON): Per-job timings: duration, earliest start, slack and wait time.
+        created_at (datetime): When the analysis was first computed.
+        updated_at (datetime): When the analysis was last recomputed.
+
+    Relationships:
+        workflow_run (WorkflowRun): The analyzed workflow run.
+    """
+
+    __tablename__ = "workflow_run_analyses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    workflow_run_id = Column(
+        Integer,
+        ForeignKey("workflow_runs.id", ondelete="CASCADE"),
+        unique=True,
+        index=True,
+    )
+    workflow_id = Column(Integer, ForeignKey("workflows.id"), index=True)
+    version = Column(Integer, nullable=False)
+    critical_path = Column(JSON, nullable=False)
+    critical_path_seconds = Column(Float, nullable=False)
+    wall_clock_seconds = Column(Float, nullable=False)
+    jobs = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(
+        DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow
+    )
+
+    workflow_run = relationship("WorkflowRun", back_populates="analysis")
 
 
 class Job(Base):
@@ -141,9 +198,14 @@ class Job(Base):
         repository_id (int): The ID of the repository (denormalized for queries).
         installation_id (int): The ID of the GitHub App installation (denormalized).
         runner_id (int): The ID of the runner assigned to the job (nullable).
+        runner_name (str): The name of the runner that ran the job, also for
+            GitHub-hosted runners, which have no runner record (nullable).
         job_name (str): The name of the job.
+        runner_pool (str): The `runs-on` label pool of the job (see `label_pool_key`).
         status (str): The current status of the job.
         conclusion (str): The conclusion of the job (nullable).
+        queued_at (datetime): When the job was queued (nullable).
+        queue_seconds (float): How long the job waited for a runner (nullable).
         started_at (datetime): When the job started (nullable).
         completed_at (datetime): When the job completed (nullable).
         url (str): The URL of the job in GitHub.
@@ -171,9 +233,13 @@ class Job(Base):
         Integer, ForeignKey("installations.installation_id", ondelete="CASCADE")
     )
     runner_id = Column(Integer, ForeignKey("runners.id"), nullable=True)
+    runner_name = Column(String, nullable=True)
     job_name = Column(String)
+    runner_pool = Column(String, nullable=True)
     status = Column(String)
     conclusion = Column(String, nullable=True)
+    queued_at = Column(DateTime, nullable=True)
+    queue_seconds = Column(Float, nullable=True)
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     url = Column(String)
@@ -183,6 +249,11 @@ class Job(Base):
         DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow
     )
 
+    __table_args__ = (
+        # Per-runner job history, newest first
+        Index("ix_jobs_runner_id_started_at", "runner_id", "started_at"),
+    )
+
     workflow_run = relationship("WorkflowRun", back_populates="jobs")
     repository = relationship("Repository", back_populates="jobs")
     installation = relationship("Installation", back_populates="jobs")
@@ -191,6 +262,48 @@ class Job(Base):
     logs = relationship("JobLog", back_populates="job", cascade="all, delete-orphan")
 
 
+class JobQueueRollup(Base):
+    """
+    Queue times and runner demand of the jobs of one label pool over one hour.
+
+    Updated incrementally as jobs complete. Queue statistics count jobs in the
+    hour they were queued; demand and run time are split over every hour a job
+    spanned.
+
+    Attributes:
+        id (int): The unique identifier for the rollup.
+        installation_id (int): The GitHub App installation of the jobs.
+        pool (str): The `runs-on` label pool (see `label_pool_key`).
+        bucket_start (datetime): Start of the hour.
+        jobs (int): Jobs queued during the hour.
+        queue_seconds_total (float): Total time those jobs waited for a runner.
+        queue_seconds_max (float): Longest time one of those jobs waited.
+        queue_histogram (list[int]): Job counts per `QUEUE_TIME_BUCKETS` bucket,
+            plus a final bucket for longer waits.
+        demand_seconds (float): Job-seconds spent queued or running in the hour.
+        run_seconds (float): Job-seconds spent running in the hour.
+    """
+
+    __tablename__ = "job_queue_rollups"
+
+    id = Column(Integer, primary_key=True)
+    installation_id = Column(Integer, nullable=False)
+    pool = Column(String, nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    jobs = Column(Integer, nullable=False, default=0)
+    queue_seconds_total = Column(Float, nullable=False, default=0)
+    queue_seconds_max = Column(Float, nullable=False, default=0)
+    queue_histogram = Column(JSON, nullable=False, default=list)
+    demand_seconds = Column(Float, nullable=False, default=0)
+    run_seconds = Column(Float, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "installation_id", "pool", "bucket_start", name="unique_job_queue_bucket"
+        ),
+    )
+
+
 class JobStep(Base):
     """
     Represents an individual step within a job.
@@ -1,4 +1,16 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, JSON, Boolean
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import relationship
 import datetime
 
@@ -18,7 +30,9 @@ class Runner(Base):
         busy (bool): Whether the runner is currently busy (nullable).
         ephemeral (bool): Whether the runner is ephemeral (nullable).
         status (str): The current status of the runner (e.g., "online", "offline").
-        labels (JSON): The labels associated with the runner (nullable).
+        labels (JSONB): The labels associated with the runner (nullable).
+        label_names (list[str]): The lowercase label names, indexed for filtering
+            runners by label set (nullable).
         architecture (str): The architecture of the runner (nullable).
         last_seen (datetime): The timestamp when the runner was last seen.
         created_at (datetime): The timestamp when the runner record was created.
@@ -42,7 +56,8 @@ class Runner(Base):
     busy = Column(Boolean, nullable=False, default=False)
     ephemeral = Column(Boolean, nullable=True)
     status = Column(String)
-    labels = Column(JSON, nullable=True)
+    labels = Column(JSONB, nullable=True)
+    label_names = Column(ARRAY(String), nullable=True)
     architecture = Column(
         String, nullable=True
     )  # TODO: Decide if we still need this or not
@@ -57,3 +72,104 @@ class Runner(Base):
 
     jobs = relationship("Job", back_populates="runner")
     installation = relationship("Installation", back_populates="runners")
+
+    __table_args__ = (
+        # Serves `label_names @> ARRAY[...]` containment filters
+        Index("ix_runners_label_names", "label_names", postgresql_using="gin"),
+    )
+
+
+class RunnerStateEvent(Base):
+    """
+    An append-only record of a runner entering the busy, idle or offline state.
+
+    Rows are only ever inserted, in time order, so the BRIN index on
+    `recorded_at` stays tiny while letting time-range scans skip old blocks.
+
+    Attributes:
+        id (int): The unique identifier for the event.
+        installation_id (int): The GitHub App installation of the runner.
+        runner_id (str): The GitHub runner ID.
+        pool (str): The runner's label pool (see `label_pool_key`).
+        state (str): "busy", "idle" or "offline".
+        recorded_at (datetime): When the runner entered the state.
+    """
+
+    __tablename__ = "runner_state_events"
+
+    id = Column(BigInteger, primary_key=True)
+    installation_id = Column(Integer, nullable=False)
+    runner_id = Column(String, nullable=False)
+    pool = Column(String, nullable=False)
+    state = Column(String(8), nullable=False)
+    recorded_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        Index(
+            "ix_runner_state_events_recorded_at_brin",
+            "recorded_at",
+            postgresql_using="brin",
+        ),
+        Index("ix_runner_state_events_runner_recorded_at", "runner_id", "recorded_at"),
+    )
+
+
+class RunnerRollupState(Base):
+    """
+    The state of each runner at the end of the utilization rollups so far.
+
+    Updated with every rollup pass, so the next one can carry runner states
+    forward without searching the event history for each runner's last event.
+
+    Attributes:
+        runner_id (str): The GitHub runner ID.
+        installation_id (int): The GitHub App installation of the runner.
+        pool (str): The runner's label pool (see `label_pool_key`).
+        state (str): "busy", "idle" or "offline".
+        recorded_at (datetime): When the runner entered the state.
+    """
+
+    __tablename__ = "runner_rollup_states"
+
+    runner_id = Column(String, primary_key=True)
+    installation_id = Column(Integer, nullable=False)
+    pool = Column(String, nullable=False)
+    state = Column(String(8), nullable=False)
+    recorded_at = Column(DateTime, nullable=False)
+
+
+class RunnerUtilizationRollup(Base):
+    """
+    Busy and idle runner time of a label pool over one time bucket.
+
+    Attributes:
+        id (int): The unique identifier for the rollup.
+        installation_id (int): The GitHub App installation of the pool.
+        pool (str): The runner label pool (see `label_pool_key`).
+        resolution (str): Bucket size, "1m", "1h" or "1d".
+        bucket_start (datetime): Start of the bucket.
+        busy_seconds (float): Runner-seconds spent busy during the bucket.
+        idle_seconds (float): Runner-seconds spent online but idle during the bucket.
+        max_runners (int): Most runners online at once in any minute of the bucket.
+    """
+
+    __tablename__ = "runner_utilization_rollups"
+
+    id = Column(BigInteger, primary_key=True)
+    installation_id = Column(Integer, nullable=False)
+    pool = Column(String, nullable=False)
+    resolution = Column(String(2), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    busy_seconds = Column(Float, nullable=False, default=0)
+    idle_seconds = Column(Float, nullable=False, default=0)
+    max_runners = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "installation_id",
+            "resolution",
+            "pool",
+            "bucket_start",
+            name="unique_runner_utilization_bucket",
+        ),
+    )
@@ -0,0 +1,490 @@
+"""
+Local stand-in for the parts of the GitHub REST API that PipelineVision uses.
+
+Run it next to the backend and point the app at it:
+
+    uvicorn app.devtools.fake_github:app --port 9000
+    USE_FAKE_GITHUB=true FAKE_GITHUB_URL=http://localhost:9000 uvicorn main:app
+
+All data is generated deterministically from the configured seed, so benchmarks of the
+sync and ingest pipeline are repeatable offline. Behaviour (latency, rate limits, error
+injection, page sizes, log sizes) is configured through `FAKE_GITHUB_*` environment
+variables or at runtime through the `/_fake/config` endpoint.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
+from pydantic import BaseModel
+
+WORKFLOWS_DIR = ".github/workflows"
+
+
+class FakeGitHubConfig(BaseModel):
+    seed: int = int(os.getenv("FAKE_GITHUB_SEED", "42"))
+    latency_ms: float = float(os.getenv("FAKE_GITHUB_LATENCY_MS", "0"))
+    latency_jitter_ms: float = float(os.getenv("FAKE_GITHUB_LATENCY_JITTER_MS", "0"))
+    rate_limit: int = int(os.getenv("FAKE_GITHUB_RATE_LIMIT", "5000"))
+    rate_limit_window: int = int(os.getenv("FAKE_GITHUB_RATE_LIMIT_WINDOW", "3600"))
+    error_rate: float = float(os.getenv("FAKE_GITHUB_ERROR_RATE", "0"))
+    secondary_rate_limit_rate: float = float(
+        os.getenv("FAKE_GITHUB_SECONDARY_RATE_LIMIT_RATE", "0")
+    )
+    orgs: List[str] = os.getenv("FAKE_GITHUB_ORGS", "acme").split(",")
+    runners_per_org: int = int(os.getenv("FAKE_GITHUB_RUNNERS_PER_ORG", "250"))
+    members_per_org: int = int(os.getenv("FAKE_GITHUB_MEMBERS_PER_ORG", "120"))
+    workflows_per_repo: int = int(os.getenv("FAKE_GITHUB_WORKFLOWS_PER_REPO", "5"))
+    log_lines: int = int(os.getenv("FAKE_GITHUB_LOG_LINES", "20000"))
+
+
+def git_blob_sha(content: bytes) -> str:
+    """Return the git blob SHA GitHub reports for a file with this content."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+class FakeGitHub:
+    """Deterministic in-memory GitHub state plus request accounting."""
+
+    def __init__(self, config: FakeGitHubConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.stats: Counter = Counter()
+        self.rate_limits: Dict[str, Dict[str, int]] = {}
+        # Bumped by /_fake/.../touch so workflow contents (and SHAs) change
+        self.revisions: Dict[str, int] = {}
+
+    def reset(self):
+        self.rng = random.Random(self.config.seed)
+        self.stats.clear()
+        self.rate_limits.clear()
+        self.revisions.clear()
+
+    def _rng_for(self, *parts: Any) -> random.Random:
+        return random.Random(f"{self.config.seed}:" + ":".join(map(str, parts)))
+
+    def installations(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": index + 1,
+                "app_id": 1,
+                "target_type": "Organization",
+                "account": {
+                    "login": org,
+                    "id": 1000 + index,
+                    "type": "Organization",
+                    "avatar_url": f"https://avatars.example.com/{org}",
+                },
+            }
+            for index, org in enumerate(self.config.orgs)
+        ]
+
+    def runners(self, org: str) -> List[Dict[str, Any]]:
+        rng = self._rng_for("runners", org)
+        # Runner IDs are unique across organizations on GitHub
+        first_id = (
+            self.config.orgs.index(org) * 100000 if org in self.config.orgs else 0
+        )
+        runners = []
+        for index in range(self.config.runners_per_org):
+            os_name = rng.choice(["Linux", "Linux", "Windows", "macOS"])
+            labels = ["self-hosted", os_name, rng.choice(["X64", "ARM64"])]
+            if rng.random() < 0.3:
+                labels.append("gpu")
+            status = "online" if rng.random() < 0.85 else "offline"
+            runners.append(
+                {
+                    "id": first_id + index + 1,
+                    "name": f"{org}-runner-{index + 1:04d}",
+                    "os": os_name,
+                    "status": status,
+                    "busy": status == "online" and rng.random() < 0.4,
+                    "labels": [
+                        {"id": position + 1, "name": name, "type": "read-only"}
+                        for position, name in enumerate(labels)
+                    ],
+                }
+            )
+        return runners
+
+    def members(self, org: str) -> List[Dict[str, Any]]:
+        return [
+            {
+                "login": f"{org}-user-{index + 1}",
+                "id": 50000 + index,
+                "avatar_url": f"https://avatars.example.com/{org}-user-{index + 1}",
+                "type": "User",
+                "site_admin": False,
+            }
+            for index in range(self.config.members_per_org)
+        ]
+
+    def workflow_filenames(self, owner: str, repo: str) -> List[str]:
+        return [
+            f"pipeline-{index + 1}.yml"
+            for index in range(self.config.workflows_per_repo)
+        ]
+
+    def workflow_content(self, owner: str, repo: str, filename: str) -> bytes:
+        key = f"{owner}/{repo}/{filename}"
+        revision = self.revisions.get(key, 0)
+        rng = self._rng_for("workflow", key)
+        versions = ", ".join(
+            f'"{v}"' for v in rng.sample(["3.10", "3.11", "3.12", "3.13"], 2)
+        )
+        name = filename.rsplit(".", 1)[0].replace("-", " ").title()
+        return (
+            f"# {name} for {owner}/{repo} (revision {revision})\n"
+            f"name: {name}\n"
+            "on:\n"
+            "  push:\n"
+            "    branches: [main]\n"
+            "  pull_request:\n"
+            "jobs:\n"
+            "  lint:\n"
+            "    runs-on: ubuntu-latest\n"
+            "    steps:\n"
+            "      - uses: actions/checkout@v4\n"
+            "      - run: make lint\n"
+            "  build:\n"
+            "    needs: lint\n"
+            "    runs-on: [self-hosted, Linux, X64]\n"
+            "    steps:\n"
+            "      - uses: actions/checkout@v4\n"
+            "      - run: make build\n"
+            "  test:\n"
+            "    needs: build\n"
+            "    runs-on: [self-hosted, Linux, X64]\n"
+            "    strategy:\n"
+            "      matrix:\n"
+            f"        python: [{versions}]\n"
+            "    steps:\n"
+            "      - run: make test\n"
+            "  deploy:\n"
+            "    needs: [build, test]\n"
+            "    if: github.ref == 'refs/heads/main'\n"
+            "    runs-on: ubuntu-latest\n"
+            "    steps:\n"
+            "      - run: make deploy\n"
+        ).encode()
+
+    def workflow(self, owner: str, repo: str, filename: str) -> Dict[str, Any]:
+        index = self.workflow_filenames(owner, repo).index(filename)
+        workflow_id = int(hashlib.sha1(f"{owner}/{repo}".encode()).hexdigest()[:6], 16)
+        return {
+            "id": workflow_id * 100 + index,
+            "node_id": f"W_{workflow_id}_{index}",
+            "name": filename.rsplit(".", 1)[0].replace("-", " ").title(),
+            "path": f"{WORKFLOWS_DIR}/{filename}",
+            "state": "active",
+            "created_at": "2024-01-01T00:00:00Z",
+            "updated_at": "2024-01-01T00:00:00Z",
+            "url": f"https://api.github.com/repos/{owner}/{repo}/actions/workflows/{filename}",
+            "html_url": f"https://github.com/{owner}/{repo}/blob/main/{WORKFLOWS_DIR}/{filename}",
+            "badge_url": f"https://github.com/{owner}/{repo}/workflows/{filename}/badge.svg",
+        }
+
+    def job_log_lines(self, job_id: int):
+        """Yield a synthetic job log in the format GitHub serves it."""
+        rng = self._rng_for("logs", job_id)
+        started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        steps = [
+            "Set up job",
+            "Run actions/checkout@v4",
+            "Run make build",
+            "Run make test",
+        ]
+        lines_per_step = max(1, self.config.log_lines // len(steps))
+        offset = 0.0
+
+        for step in steps:
+            for position in range(lines_per_step):
+                offset += rng.random() / 10
+                timestamp = (started + timedelta(seconds=offset)).strftime(
+                    "%Y-%m-%dT%H:%M:%S.%f0Z"
+                )
+                if position == 0:
+                    message = f"##[group]{step}"
+                elif position == lines_per_step - 1:
+                    message = "##[endgroup]"
+                elif rng.random() < 0.01:
+                    message = f"##[warning]Synthetic warning {position}"
+                else:
+                    message = f"{step}: output line {position} " + "x" * rng.randint(
+                        0, 80
+                    )
+                yield f"{timestamp} {message}\n"
+
+
+def create_app(config: Optional[FakeGitHubConfig] = None) -> FastAPI:
+    """
+    Build the fake GitHub API application.
+
+    Args:
+        config (Optional[FakeGitHubConfig]): Behaviour settings. Defaults to the environment.
+
+    Returns:
+        FastAPI: The application, with its state available as `app.state.github`.
+    """
+    fake_app = FastAPI(title="Fake GitHub API", docs_url=None, redoc_url=None)
+    github = FakeGitHub(config or FakeGitHubConfig())
+    fake_app.state.github = github
+
+    @fake_app.middleware("http")
+    async def simulate_github(request: Request, call_next):
+        if request.url.path.startswith("/_"):
+            return await call_next(request)
+
+        config = github.config
+        if config.latency_ms or config.latency_jitter_ms:
+            delay = config.latency_ms + github.rng.uniform(0, config.latency_jitter_ms)
+            await asyncio.sleep(delay / 1000)
+
+        # Rate limits are tracked per credential like GitHub does
+        credential = request.headers.get("Authorization", "anonymous")
+        now = int(time.time())
+        bucket = github.rate_limits.get(credential)
+        if bucket is None or bucket["reset"] <= now:
+            bucket = {"used": 0, "reset": now + config.rate_limit_window}
+            github.rate_limits[credential] = bucket
+
+        def rate_limit_headers() -> Dict[str, str]:
+            return {
+                "X-RateLimit-Limit": str(config.rate_limit),
+                "X-RateLimit-Remaining": str(
+                    max(0, config.rate_limit - bucket["used"])
+                ),
+                "X-RateLimit-Used": str(bucket["used"]),
+                "X-RateLimit-Reset": str(bucket["reset"]),
+                "X-RateLimit-Resource": "core",
+            }
+
+        if bucket["used"] >= config.rate_limit:
+            github.stats["403 rate_limit"] += 1
+            return JSONResponse(
+                {"message": "API rate limit exceeded"},
+                status_code=403,
+                headers=rate_limit_headers(),
+            )
+
+        if github.rng.random() < config.secondary_rate_limit_rate:
+            github.stats["403 secondary_rate_limit"] += 1
+            return JSONResponse(
+                {"message": "You have exceeded a secondary rate limit."},
+                status_code=403,
+                headers={"Retry-After": "1", **rate_limit_headers()},
+            )
+
+        if github.rng.random() < config.error_rate:
+            github.stats["502 injected"] += 1
+            return JSONResponse({"message": "Server Error"}, status_code=502)
+
+        response = await call_next(request)
+
+        # Conditional requests answered with 304 do not count against the limit
+        if response.status_code != 304:
+            bucket["used"] += 1
+        response.headers.update(rate_limit_headers())
+
+        route = request.scope.get("route")
+        github.stats[
+            f"{response.status_code} {getattr(route, 'path', request.url.path)}"
+        ] += 1
+        return response
+
+    def json_response(request: Request, body: Any, headers: Optional[Dict] = None):
+        payload = json.dumps(body).encode()
+        etag = f'W/"{hashlib.sha1(payload).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(
+            payload,
+            media_type="application/json",
+            headers={"ETag": etag, **(headers or {})},
+        )
+
+    def paginated(
+        request: Request,
+        items: List[Any],
+        item_key: Optional[str] = None,
+    ):
+        per_page = min(int(request.query_params.get("per_page", 30)), 100)
+        page = max(int(request.query_params.get("page", 1)), 1)
+        last_page = max(1, -(-len(items) // per_page))
+        page_items = items[(page - 1) * per_page : page * per_page]
+
+        relations = []
+        if page > 1:
+            relations += [("prev", page - 1), ("first", 1)]
+        if page < last_page:
+            relations += [("next", page + 1), ("last", last_page)]
+        links = [
+            f'<{request.url.include_query_params(page=target, per_page=per_page)}>; rel="{rel}"'
+            for rel, target in relations
+        ]
+
+        body = (
+            {"total_count": len(items), item_key: page_items}
+            if item_key
+            else page_items
+        )
+        headers = {"Link": ", ".join(links)} if links else None
+        return json_response(request, body, headers)
+
+    def not_found():
+        return JSONResponse({"message": "Not Found"}, status_code=404)
+
+    @fake_app.post(
+        "/app/installations/{installation_id}/access_tokens", status_code=201
+    )
+    async def create_installation_token(installation_id: int):
+        expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+        return JSONResponse(
+            {
+                "token": f"ghs_fake_{installation_id}_{github.rng.getrandbits(64):016x}",
+                "expires_at": expires_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            },
+            status_code=201,
+        )
+
+    @fake_app.get("/app/installations")
+    async def list_installations(request: Request):
+        return paginated(request, github.installations())
+
+    @fake_app.get("/user")
+    async def get_user(request: Request):
+        return json_response(
+            request,
+            {"login": "octocat", "id": 1, "bio": None, "blog": "", "company": None},
+        )
+
+    @fake_app.get("/user/orgs")
+    async def list_user_orgs(request: Request):
+        return paginated(
+            request,
+            [installation["account"] for installation in github.installations()],
+        )
+
+    @fake_app.get("/orgs/{org}/actions/runners")
+    async def list_org_runners(org: str, request: Request):
+        if org not in github.config.orgs:
+            return not_found()
+        return paginated(request, github.runners(org), item_key="runners")
+
+    @fake_app.get("/orgs/{org}/members")
+    async def list_org_members(org: str, request: Request):
+        if org not in github.config.orgs:
+            return not_found()
+        return paginated(request, github.members(org))
+
+    @fake_app.get("/repos/{owner}/{repo}/actions/workflows")
+    async def list_workflows(owner: str, repo: str, request: Request):
+        workflows = [
+            github.workflow(owner, repo, filename)
+            for filename in github.workflow_filenames(owner, repo)
+        ]
+        return paginated(request, workflows, item_key="workflows")
+
+    @fake_app.get("/repos/{owner}/{repo}/actions/workflows/{workflow_id}")
+    async def get_workflow(owner: str, repo: str, workflow_id: str, request: Request):
+        for filename in github.workflow_filenames(owner, repo):
+            workflow = github.workflow(owner, repo, filename)
+            if workflow_id in (filename, str(workflow["id"])):
+                return json_response(request, workflow)
+        return not_found()
+
+    @fake_app.get("/repos/{owner}/{repo}/contents/{path:path}")
+    async def get_contents(owner: str, repo: str, path: str, request: Request):
+        filenames = github.workflow_filenames(owner, repo)
+        path = path.strip("/")
+
+        if path == WORKFLOWS_DIR:
+            entries = []
+            for filename in filenames:
+                content = github.workflow_content(owner, repo, filename)
+                entries.append(
+                    {
+                        "type": "file",
+                        "name": filename,
+                        "path": f"{WORKFLOWS_DIR}/{filename}",
+                        "sha": git_blob_sha(content),
+                        "size": len(content),
+                    }
+                )
+            return json_response(request, entries)
+
+        directory, _, filename = path.rpartition("/")
+        if directory != WORKFLOWS_DIR or filename not in filenames:
+            return not_found()
+
+        content = github.workflow_content(owner, repo, filename)
+        return json_response(
+            request,
+            {
+                "type": "file",
+                "encoding": "base64",
+                "name": filename,
+                "path": path,
+                "sha": git_blob_sha(content),
+                "size": len(content),
+                "content": base64.encodebytes(content).decode(),
+            },
+        )
+
+    @fake_app.get("/repos/{owner}/{repo}/actions/jobs/{job_id}/logs")
+    async def download_job_logs(owner: str, repo: str, job_id: int, request: Request):
+        # GitHub answers with a redirect to a short-lived blob storage URL
+        return RedirectResponse(
+            str(request.url_for("job_log_blob", job_id=job_id)), status_code=302
+        )
+
+    @fake_app.get("/_blobs/logs/{job_id}", name="job_log_blob")
+    async def job_log_blob(job_id: int):
+        github.stats["200 /_blobs/logs/{job_id}"] += 1
+        return StreamingResponse(
+            (line.encode() for line in github.job_log_lines(job_id)),
+            media_type="text/plain",
+        )
+
+    @fake_app.get("/_fake/config")
+    async def get_config():
+        return github.config
+
+    @fake_app.patch("/_fake/config")
+    async def update_config(changes: Dict[str, Any]):
+        github.config = github.config.model_copy(update=changes)
+        return github.config
+
+    @fake_app.get("/_fake/stats")
+    async def get_stats():
+        return {
+            "requests": dict(github.stats),
+            "total": sum(github.stats.values()),
+        }
+
+    @fake_app.post("/_fake/reset")
+    async def reset():
+        github.reset()
+        return {"status": "reset"}
+
+    @fake_app.post("/_fake/repos/{owner}/{repo}/workflows/{filename}/touch")
+    async def touch_workflow(owner: str, repo: str, filename: str):
+        """Change a workflow file so its content and blob SHA differ."""
+        key = f"{owner}/{repo}/{filename}"
+        github.revisions[key] = github.revisions.get(key, 0) + 1
+        content = github.workflow_content(owner, repo, filename)
+        return {"path": f"{WORKFLOWS_DIR}/{filename}", "sha": git_blob_sha(content)}
+
+    return fake_app
+
+
+app = create_app()
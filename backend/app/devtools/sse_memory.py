@@ -0,0 +1,65 @@
+"""
+Memory benchmark for idle SSE connections.
+
+Opens many idle connections in a `ConnectionRegistry`, each with a task parked
+on its queue like the `/events` stream loop, and reports the Python memory they
+take per connection as traced by `tracemalloc`. Redis is not used.
+
+    python -m app.devtools.sse_memory --connections 10000 --tabs 2
+"""
+
+import argparse
+import asyncio
+import tracemalloc
+
+from app.services.sse_connections import ConnectionQueue, ConnectionRegistry
+
+
+async def idle_stream(queue: ConnectionQueue):
+    while True:
+        await queue.get(timeout=30.0)
+
+
+async def measure(connections: int, tabs: int, orgs: int):
+    registry = ConnectionRegistry()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    streams = []
+    for index in range(connections):
+        user_index = index // tabs
+        connection = registry.add(f"user-{user_index}", user_index % orgs)
+        streams.append(asyncio.create_task(idle_stream(connection.queue)))
+
+    # Let every stream start waiting on its queue
+    await asyncio.sleep(0.1)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    for stream in streams:
+        stream.cancel()
+    await asyncio.gather(*streams, return_exceptions=True)
+
+    used = after - before
+    print(
+        f"{connections} idle connections ({len(registry.by_user)} users, "
+        f"{len(registry.by_org)} orgs)"
+    )
+    print(f"  {used / 1024 / 1024:.1f} MiB, {used / connections:.0f} bytes/connection")
+    print(f"  peak {(peak - before) / 1024 / 1024:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument(
+        "--tabs", type=int, default=2, help="Connections opened by each user"
+    )
+    parser.add_argument("--orgs", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(measure(args.connections, args.tabs, args.orgs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Broadcast storm benchmark for the Redis SSE manager.
+
+Registers a set of SSE users, broadcasts events to their organization as fast as
+possible and reports how much the event loop lagged meanwhile. Users marked
+local are connected to the broadcasting manager; the rest to a second manager
+standing in for another worker. Both receive the events by reading the
+organization's Redis stream.
+
+    python -m app.devtools.sse_storm --users 200 --events 500
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.redis import close_redis, get_redis, init_redis
+from app.core.config import settings
+from app.services.sse_connections import ConnectionQueue, sse_messages_dropped
+from app.services.sse_redis_manager import RedisSSEManager
+from app.utils.loop_monitor import EventLoopMonitor
+
+
+async def run_storm(users: int, events: int, local_ratio: float, concurrency: int):
+    if not await init_redis():
+        raise SystemExit("Redis is not reachable, set REDIS_URL")
+
+    manager = RedisSSEManager(get_redis())
+    other_worker = RedisSSEManager(get_redis())
+    await manager.start()
+    await other_worker.start()
+    org_id = "sse-storm"
+    local_users = int(users * local_ratio)
+
+    for index in range(users):
+        user_id = f"sse-storm-user-{index}"
+        worker = manager if index < local_users else other_worker
+        await worker.register_connection(user_id, org_id)
+    connections = [
+        (worker, connection)
+        for worker in (manager, other_worker)
+        for connection in list(worker.local.connections.values())
+    ]
+
+    received = 0
+
+    async def drain(queue: ConnectionQueue):
+        nonlocal received
+        while True:
+            if await queue.get(timeout=30.0) is not None:
+                received += 1
+
+    drainers = [
+        asyncio.create_task(drain(connection.queue)) for _, connection in connections
+    ]
+
+    monitor = EventLoopMonitor(interval=0.01, window=3600, keep_samples=True)
+    monitor.start()
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def broadcast(index: int):
+        async with semaphore:
+            await manager.broadcast_to_org(org_id, "storm", {"index": index})
+
+    started = time.monotonic()
+    await asyncio.gather(*(broadcast(index) for index in range(events)))
+    elapsed = time.monotonic() - started
+
+    # Let the monitor record a sleep that overlapped the end of the storm, and
+    # the stream readers catch up
+    await asyncio.sleep(max(monitor.interval * 2, 0.5))
+    await monitor.stop()
+    for drainer in drainers:
+        drainer.cancel()
+
+    for worker, connection in connections:
+        await worker.unregister_connection(connection.connection_id)
+    await manager.stop()
+    await other_worker.stop()
+    await get_redis().delete(manager.STREAM_KEY.format(org_id=org_id))
+    await close_redis()
+
+    samples = sorted(monitor.samples)
+    print(
+        f"{events} broadcasts to {users} users ({local_users} local) in {elapsed:.2f}s"
+    )
+    print(f"  {events / elapsed:.0f} broadcasts/s")
+    print(f"  {received}/{events * users} messages delivered")
+    policy = settings.SSE_QUEUE_POLICY
+    print(f"  {sse_messages_dropped.get(policy=policy):.0f} dropped ({policy})")
+    if samples:
+        print(
+            f"  event loop lag: p50 {statistics.median(samples) * 1000:.1f}ms, "
+            f"p99 {samples[int(len(samples) * 0.99)] * 1000:.1f}ms, "
+            f"max {samples[-1] * 1000:.1f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument(
+        "--local-ratio",
+        type=float,
+        default=0.5,
+        help="Share of users connected to this process",
+    )
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(run_storm(args.users, args.events, args.local_ratio, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
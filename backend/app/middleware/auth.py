@@ -14,6 +14,7 @@ PUBLIC_ROUTES = {
     "/redoc",
     "/openapi.json",
     "/health",
+    "/metrics",
     "/api/v1/webhooks/github",
     "/api/v1/webhooks/github/installation",
     "/api/v1/auth/signin",
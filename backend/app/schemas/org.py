@@ -2,6 +2,8 @@ from datetime import datetime
 
 from pydantic import BaseModel, HttpUrl, field_validator
 
+from app.schemas.workflow_run import JobSummary
+
 
 class OrganizationMembershipSchema(BaseModel):
     id: str
@@ -64,3 +66,72 @@ class OrganizationMember(BaseModel):
 
 class OrganizationMembersResponse(BaseModel):
     members: list[OrganizationMember]
+
+
+class UtilizationPoint(BaseModel):
+    bucket_start: datetime
+    busy_seconds: float
+    idle_seconds: float
+    utilization: float | None
+    max_runners: int
+
+
+class PoolUtilization(BaseModel):
+    pool: str
+    points: list[UtilizationPoint]
+
+
+class RunnerUtilizationResponse(BaseModel):
+    resolution: str
+    start: datetime
+    end: datetime
+    pools: list[PoolUtilization]
+
+
+class RunnerJobHistoryResponse(BaseModel):
+    runner_id: str
+    name: str
+    days: int
+    total_jobs: int
+    completed_jobs: int
+    successful_jobs: int
+    success_rate: float | None
+    average_duration_seconds: float | None
+    jobs: list[JobSummary]
+
+
+class PoolQueueTimes(BaseModel):
+    pool: str
+    jobs: int
+    mean_queue_seconds: float | None
+    max_queue_seconds: float
+    p50_queue_seconds: float | None
+    p90_queue_seconds: float | None
+    p95_queue_seconds: float | None
+    average_demand: float
+    peak_hour_demand: float
+
+
+class QueueTimesResponse(BaseModel):
+    days: int
+    pools: list[PoolQueueTimes]
+
+
+class ForecastHour(BaseModel):
+    hour_of_week: int
+    demand: float
+    required_runners: int
+    p90_queue_seconds: float | None
+
+
+class PoolForecast(BaseModel):
+    pool: str
+    peak_required_runners: int
+    hours: list[ForecastHour]
+
+
+class RunnerForecastResponse(BaseModel):
+    weeks: int
+    percentile: float
+    headroom: float
+    pools: list[PoolForecast]
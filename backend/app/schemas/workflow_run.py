@@ -32,6 +32,27 @@ class JobBase(BaseModel):
     steps: List["JobStepBase"] = []
 
 
+class CriticalPathJob(BaseModel):
+    job_id: int
+    job_name: str
+    workflow_job: Optional[str] = None
+    duration_seconds: float
+    earliest_start_seconds: float
+    slack_seconds: float
+    wait_seconds: float
+    critical: bool
+
+
+class CriticalPathAnalysis(BaseModel):
+    critical_path: List[int]
+    critical_path_seconds: float
+    wall_clock_seconds: float
+    jobs: List[CriticalPathJob]
+
+    class Config:
+        from_attributes = True
+
+
 class WorkflowRunResponse(BaseModel):
     id: int
     run_id: str
@@ -50,6 +71,7 @@ class WorkflowRunResponse(BaseModel):
     url: str
     repository: Optional[RepositoryBase] = None
     jobs: List[JobBase] = []
+    critical_path: Optional[CriticalPathAnalysis] = None
 
     class Config:
         from_attributes = True
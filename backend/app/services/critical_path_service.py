@@ -0,0 +1,374 @@
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.models.job import Job, Workflow, WorkflowRun, WorkflowRunAnalysis
+from app.services.workflow_parser import get_workflow_summary, is_current
+
+logger = logging.getLogger(__name__)
+
+# Bump when the analysis changes so the backfill recomputes older rows
+ANALYSIS_VERSION = 1
+
+# Jobs may start slightly before a dependency's reported completion time
+DEPENDENCY_TOLERANCE_SECONDS = 1.0
+
+
+def match_workflow_job(job_name: str, jobs: Dict[str, dict]) -> Optional[str]:
+    """
+    Map a job name reported by GitHub to its job id in the workflow YAML.
+
+    Matrix jobs are reported as `name (value, ...)` and reusable workflow jobs as
+    `caller / called`, so both prefixes are recognized.
+
+    Args:
+        job_name (str): The name of the job run.
+        jobs (Dict[str, dict]): The `jobs` section of a workflow summary.
+
+    Returns:
+        Optional[str]: The YAML job id, or None if the name could not be matched.
+    """
+    for key, spec in jobs.items():
+        if job_name in (key, spec.get("name")):
+            return key
+
+    for key, spec in jobs.items():
+        for display in {key, spec.get("name") or key}:
+            if job_name.startswith(f"{display} (") or job_name.startswith(
+                f"{display} / "
+            ):
+                return key
+
+    return None
+
+
+def compute_critical_path(
+    jobs: List[dict], needs: Dict[str, List[str]], run_started_at: datetime
+) -> dict:
+    """
+    Compute the critical path and per-job slack of a completed run.
+
+    The dependency graph comes from the YAML `needs` edges, expanded to every job
+    run (matrix instances included). Earliest starts use job durations only, so
+    the critical path length is how long the run would take with no queueing;
+    `wait_seconds` is how long each job waited after its dependencies finished.
+
+    Args:
+        jobs (List[dict]): Job runs with `id`, `name`, `key` (YAML job id or None),
+            `started_at` and `completed_at`.
+        needs (Dict[str, List[str]]): YAML job id to the job ids it needs.
+        run_started_at (datetime): When the run started.
+
+    Returns:
+        dict: `critical_path` (job ids in order), `critical_path_seconds`,
+        `wall_clock_seconds` and per-job `jobs` timings.
+    """
+    nodes = sorted(jobs, key=lambda job: (job["started_at"], job["completed_at"]))
+    origin = min([run_started_at] + [job["started_at"] for job in nodes])
+
+    by_key: Dict[str, List[dict]] = {}
+    for node in nodes:
+        node["duration"] = max(
+            (node["completed_at"] - node["started_at"]).total_seconds(), 0.0
+        )
+        node["successors"] = []
+        if node["key"]:
+            by_key.setdefault(node["key"], []).append(node)
+
+    # Only keep edges that match what actually happened. Dependencies must also
+    # come earlier in `nodes`, which rules out cycles and makes it a topological
+    # order even for jobs finishing within the tolerance after their dependents
+    # started, such as skipped jobs
+    position = {node["id"]: index for index, node in enumerate(nodes)}
+    for node in nodes:
+        node["dependencies"] = [
+            dependency
+            for need in needs.get(node["key"], [])
+            for dependency in by_key.get(need, [])
+            if position[dependency["id"]] < position[node["id"]]
+            and (dependency["completed_at"] - node["started_at"]).total_seconds()
+            <= DEPENDENCY_TOLERANCE_SECONDS
+        ]
+        for dependency in node["dependencies"]:
+            dependency["successors"].append(node)
+
+    for node in nodes:
+        node["earliest_start"] = max(
+            (dependency["earliest_finish"] for dependency in node["dependencies"]),
+            default=0.0,
+        )
+        node["earliest_finish"] = node["earliest_start"] + node["duration"]
+        ready_at = max(
+            [origin]
+            + [dependency["completed_at"] for dependency in node["dependencies"]]
+        )
+        node["wait"] = max((node["started_at"] - ready_at).total_seconds(), 0.0)
+
+    critical_path_seconds = max(
+        (node["earliest_finish"] for node in nodes), default=0.0
+    )
+
+    for node in reversed(nodes):
+        node["latest_finish"] = min(
+            (successor["latest_start"] for successor in node["successors"]),
+            default=critical_path_seconds,
+        )
+        node["latest_start"] = node["latest_finish"] - node["duration"]
+
+    path = []
+    if nodes:
+        current = max(
+            nodes, key=lambda node: (node["earliest_finish"], node["completed_at"])
+        )
+        while current:
+            path.append(current)
+            current = max(
+                current["dependencies"],
+                key=lambda node: node["earliest_finish"],
+                default=None,
+            )
+        path.reverse()
+    on_path = {node["id"] for node in path}
+
+    wall_clock_seconds = max(
+        ((node["completed_at"] - origin).total_seconds() for node in nodes),
+        default=0.0,
+    )
+
+    return {
+        "critical_path": [node["id"] for node in path],
+        "critical_path_seconds": round(critical_path_seconds, 3),
+        "wall_clock_seconds": round(wall_clock_seconds, 3),
+        "jobs": [
+            {
+                "job_id": node["id"],
+                "job_name": node["name"],
+                "workflow_job": node["key"],
+                "duration_seconds": round(node["duration"], 3),
+                "earliest_start_seconds": round(node["earliest_start"], 3),
+                "slack_seconds": round(
+                    max(node["latest_start"] - node["earliest_start"], 0.0), 3
+                ),
+                "wait_seconds": round(node["wait"], 3),
+                "critical": node["id"] in on_path,
+            }
+            for node in nodes
+        ],
+    }
+
+
+class CriticalPathService:
+    """
+    Computes and stores critical-path analyses of completed workflow runs.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def analyze_run(self, workflow_run: WorkflowRun) -> Optional[WorkflowRunAnalysis]:
+        """
+        Analyze a completed workflow run and store the result.
+
+        Args:
+            workflow_run (WorkflowRun): The run to analyze.
+
+        Returns:
+            Optional[WorkflowRunAnalysis]: The stored analysis, or None if the run is
+            not completed or has no timed jobs.
+        """
+        if workflow_run.status != "completed":
+            return None
+
+        job_rows = (
+            self.db.query(Job.id, Job.job_name, Job.started_at, Job.completed_at)
+            .filter(
+                Job.run_id == workflow_run.run_id,
+                Job.run_attempt == workflow_run.run_attempt,
+                Job.started_at.isnot(None),
+                Job.completed_at.isnot(None),
+            )
+            .all()
+        )
+        if not job_rows:
+            return None
+
+        workflow_jobs = self._get_workflow_jobs(workflow_run.workflow_id)
+        jobs = [
+            {
+                "id": row.id,
+                "name": row.job_name or "",
+                "key": match_workflow_job(row.job_name or "", workflow_jobs),
+                "started_at": row.started_at,
+                "completed_at": row.completed_at,
+            }
+            for row in job_rows
+        ]
+        needs = {key: spec.get("needs", []) for key, spec in workflow_jobs.items()}
+
+        result = compute_critical_path(
+            jobs, needs, workflow_run.started_at or jobs[0]["started_at"]
+        )
+
+        analysis = (
+            self.db.query(WorkflowRunAnalysis)
+            .filter(WorkflowRunAnalysis.workflow_run_id == workflow_run.id)
+            .first()
+        )
+        if not analysis:
+            analysis = WorkflowRunAnalysis(workflow_run_id=workflow_run.id)
+
+        analysis.workflow_id = workflow_run.workflow_id
+        analysis.version = ANALYSIS_VERSION
+        analysis.critical_path = result["critical_path"]
+        analysis.critical_path_seconds = result["critical_path_seconds"]
+        analysis.wall_clock_seconds = result["wall_clock_seconds"]
+        analysis.jobs = result["jobs"]
+
+        self.db.add(analysis)
+        return analysis
+
+    def backfill(
+        self, batch_size: int = 200, limit: Optional[int] = None, force: bool = False
+    ) -> int:
+        """
+        Analyze completed runs that have no current analysis, in batches.
+
+        Each batch is committed separately and runs are visited in id order, so the
+        backfill can be interrupted and resumed. A run that fails to analyze is
+        logged and skipped without affecting the rest of its batch.
+
+        Args:
+            batch_size (int): Runs processed per batch and transaction.
+            limit (Optional[int]): Stop after this many runs.
+            force (bool): Recompute runs that already have a current analysis.
+
+        Returns:
+            int: The number of runs analyzed.
+        """
+        analyzed = 0
+        last_id = 0
+
+        while limit is None or analyzed < limit:
+            query = (
+                self.db.query(WorkflowRun)
+                .outerjoin(
+                    WorkflowRunAnalysis,
+                    WorkflowRunAnalysis.workflow_run_id == WorkflowRun.id,
+                )
+                .filter(WorkflowRun.status == "completed", WorkflowRun.id > last_id)
+            )
+            if not force:
+                query = query.filter(
+                    (WorkflowRunAnalysis.id.is_(None))
+                    | (WorkflowRunAnalysis.version < ANALYSIS_VERSION)
+                )
+
+            size = batch_size if limit is None else min(batch_size, limit - analyzed)
+            runs = query.order_by(WorkflowRun.id).limit(size).all()
+            if not runs:
+                break
+
+            last_id = runs[-1].id
+            for run in runs:
+                try:
+                    with self.db.begin_nested():
+                        if self.analyze_run(run):
+                            analyzed += 1
+                except Exception as e:
+                    logger.warning(
+                        f"Critical path analysis failed for run {run.run_id}: {e}"
+                    )
+            self.db.commit()
+
+            logger.info(f"Critical path backfill: {analyzed} runs analyzed so far")
+
+        return analyzed
+
+    def workflow_summary(self, workflow_id: int, limit: int = 50) -> Optional[dict]:
+        """
+        Aggregate the latest analyses of a workflow per YAML job.
+
+        Args:
+            workflow_id (int): The workflow database ID.
+            limit (int): Number of most recent analyzed runs to aggregate.
+
+        Returns:
+            Optional[dict]: How often each job was critical and its average duration,
+            slack and wait, or None if no run has been analyzed.
+        """
+        analyses = (
+            self.db.query(
+                WorkflowRunAnalysis.jobs,
+                WorkflowRunAnalysis.critical_path_seconds,
+                WorkflowRunAnalysis.wall_clock_seconds,
+            )
+            .filter(WorkflowRunAnalysis.workflow_id == workflow_id)
+            .order_by(WorkflowRunAnalysis.workflow_run_id.desc())
+            .limit(limit)
+            .all()
+        )
+        if not analyses:
+            return None
+
+        totals: Dict[str, Dict[str, float]] = {}
+        for analysis in analyses:
+            for job in analysis.jobs:
+                key = job["workflow_job"] or job["job_name"]
+                total = totals.setdefault(
+                    key,
+                    {"runs": 0, "critical": 0, "duration": 0, "slack": 0, "wait": 0},
+                )
+                total["runs"] += 1
+                total["critical"] += int(job["critical"])
+                total["duration"] += job["duration_seconds"]
+                total["slack"] += job["slack_seconds"]
+                total["wait"] += job["wait_seconds"]
+
+        return {
+            "runs_analyzed": len(analyses),
+            "avg_critical_path_seconds": round(
+                _mean(analysis.critical_path_seconds for analysis in analyses), 1
+            ),
+            "avg_wall_clock_seconds": round(
+                _mean(analysis.wall_clock_seconds for analysis in analyses), 1
+            ),
+            "jobs": sorted(
+                (
+                    {
+                        "workflow_job": key,
+                        "critical_ratio": round(total["critical"] / total["runs"], 3),
+                        "avg_duration_seconds": round(
+                            total["duration"] / total["runs"], 1
+                        ),
+                        "avg_slack_seconds": round(total["slack"] / total["runs"], 1),
+                        "avg_wait_seconds": round(total["wait"] / total["runs"], 1),
+                    }
+                    for key, total in totals.items()
+                ),
+                key=lambda job: (-job["critical_ratio"], -job["avg_duration_seconds"]),
+            ),
+        }
+
+    def _get_workflow_jobs(self, workflow_id: Optional[int]) -> Dict[str, dict]:
+        if not workflow_id:
+            return {}
+
+        workflow = (
+            self.db.query(Workflow.content, Workflow.content_sha, Workflow.summary)
+            .filter(Workflow.id == workflow_id)
+            .first()
+        )
+        if not workflow:
+            return {}
+        if is_current(workflow.summary, workflow.content_sha):
+            return workflow.summary.get("jobs", {})
+        if workflow.content:
+            return get_workflow_summary(workflow.content, workflow.content_sha)["jobs"]
+        return {}
+
+
+def _mean(values: Iterable[float]) -> float:
+    values = list(values)
+    return sum(values) / len(values) if values else 0.0
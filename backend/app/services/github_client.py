@@ -0,0 +1,361 @@
+import asyncio
+import contextlib
+import contextvars
+import logging
+import random
+import re
+import time
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+github_requests = registry.counter(
+    "github_requests_total",
+    "GitHub API responses by endpoint class and status code",
+    ["endpoint_class", "status"],
+)
+github_retries = registry.counter(
+    "github_request_retries_total",
+    "GitHub API requests retried after a transient failure",
+    ["endpoint_class", "reason"],
+)
+github_shed = registry.counter(
+    "github_requests_shed_total",
+    "Background GitHub API requests rejected by an open circuit breaker",
+    ["endpoint_class"],
+)
+github_breaker_state = registry.gauge(
+    "github_circuit_breaker_state",
+    "Circuit breaker state per endpoint class (0=closed, 1=half-open, 2=open)",
+    ["endpoint_class"],
+)
+
+# Ordered so the first matching pattern decides the endpoint class
+ENDPOINT_CLASSES = [
+    ("token", re.compile(r"/app/installations/\d+/access_tokens$")),
+    ("app", re.compile(r"/app/")),
+    ("logs", re.compile(r"/actions/jobs/\d+/logs$")),
+    ("runners", re.compile(r"/actions/runners")),
+    ("workflows", re.compile(r"/actions/workflows")),
+    ("contents", re.compile(r"/(contents|git)/")),
+    ("members", re.compile(r"/members")),
+]
+
+RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+
+_background = contextvars.ContextVar("github_background_request", default=False)
+
+
+@contextlib.contextmanager
+def background_requests():
+    """
+    Mark GitHub requests made inside this block (and tasks it spawns) as background work.
+
+    Background requests are shed immediately while their circuit breaker is open,
+    whereas interactive requests still get a single attempt.
+    """
+    token = _background.set(True)
+    try:
+        yield
+    finally:
+        _background.reset(token)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is shed because its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one class of GitHub endpoints.
+
+    After `failure_threshold` consecutive failures the breaker opens for
+    `recovery_timeout` seconds, then lets a single probe through (half-open).
+    A successful probe closes it again; a failed one re-opens it. A probe that
+    ends without either, e.g. because it was cancelled, is released so the
+    next request probes instead.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._probe_in_flight = False
+        github_breaker_state.set(0, endpoint_class=name)
+
+    @property
+    def state(self) -> str:
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self.opened_at >= self.recovery_timeout
+        ):
+            self._set_state(self.HALF_OPEN)
+        return self._state
+
+    def allow_request(self) -> Tuple[bool, bool]:
+        """
+        Check whether a request may be sent, reserving the half-open probe.
+
+        Returns:
+            Tuple[bool, bool]: Whether the request is allowed, and whether this call
+            reserved the probe, which the caller must release if it records no
+            outcome.
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True, False
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True, True
+        return False, False
+
+    def release_probe(self):
+        """Let another request probe after one that recorded no outcome."""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self._probe_in_flight = False
+        if self._state != self.CLOSED:
+            logger.info(f"GitHub circuit breaker '{self.name}' closed")
+            self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                logger.warning(
+                    f"GitHub circuit breaker '{self.name}' opened after {self.failures} failures"
+                )
+            self.opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
+    def _set_state(self, state: str):
+        self._state = state
+        github_breaker_state.set(self._STATE_VALUES[state], endpoint_class=self.name)
+
+
+class GitHubClient:
+    """
+    Shared HTTP client for the GitHub API with retries and circuit breaking.
+
+    Features:
+    - One pooled httpx.AsyncClient with explicit timeouts for the whole process
+    - Jittered exponential backoff for 5xx, 429 and secondary rate limits
+    - Honors `Retry-After` and `X-RateLimit-Reset` when GitHub sends them
+    - Per-endpoint-class circuit breakers that shed background work while open
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        timeout: float = 30.0,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = httpx.Timeout(timeout, connect=min(timeout, 10.0))
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def classify(self, url: str) -> str:
+        """Return the endpoint class used to pick a circuit breaker for a URL."""
+        path = httpx.URL(url).path
+        for name, pattern in ENDPOINT_CLASSES:
+            if pattern.search(path):
+                return name
+        return "default"
+
+    def breaker(self, endpoint_class: str) -> CircuitBreaker:
+        if endpoint_class not in self.breakers:
+            self.breakers[endpoint_class] = CircuitBreaker(
+                endpoint_class, self.failure_threshold, self.recovery_timeout
+            )
+        return self.breakers[endpoint_class]
+
+    def breaker_states(self) -> Dict[str, str]:
+        return {name: breaker.state for name, breaker in self.breakers.items()}
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request to GitHub, retrying transient failures.
+
+        The final response is returned as-is (including error statuses), so callers
+        keep their existing status handling.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Absolute request URL.
+            **kwargs: Passed through to httpx (headers, params, follow_redirects...).
+
+        Returns:
+            httpx.Response: The last response received.
+
+        Raises:
+            CircuitOpenError: If background work is shed by an open breaker.
+            httpx.TransportError: If the last attempt failed at the transport level.
+        """
+        endpoint_class = self.classify(url)
+        breaker = self.breaker(endpoint_class)
+        background = _background.get()
+
+        allowed, probing = breaker.allow_request()
+        if not allowed:
+            if background:
+                github_shed.inc(endpoint_class=endpoint_class)
+                raise CircuitOpenError(
+                    f"GitHub circuit breaker '{endpoint_class}' is open"
+                )
+            # Interactive requests still get one attempt so users see the real error
+            max_attempts = 1
+        else:
+            max_attempts = self.max_retries + 1
+
+        try:
+            return await self._send(method, url, endpoint_class, max_attempts, **kwargs)
+        finally:
+            # A cancelled or unexpectedly failing probe must not block the breaker
+            if probing:
+                breaker.release_probe()
+
+    async def _send(
+        self, method: str, url: str, endpoint_class: str, max_attempts: int, **kwargs
+    ) -> httpx.Response:
+        """Send a request with up to `max_attempts` attempts, updating its breaker."""
+        breaker = self.breaker(endpoint_class)
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                breaker.record_failure()
+                if attempt >= max_attempts or breaker.state == CircuitBreaker.OPEN:
+                    raise
+                github_retries.inc(endpoint_class=endpoint_class, reason="transport")
+                delay = self._backoff(attempt)
+                logger.warning(
+                    f"GitHub {method} {endpoint_class} failed ({type(e).__name__}), "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            github_requests.inc(
+                endpoint_class=endpoint_class, status=str(response.status_code)
+            )
+
+            reason = self._retry_reason(response)
+            if reason is None:
+                breaker.record_success()
+                return response
+
+            breaker.record_failure()
+            delay = self._retry_delay(response, attempt)
+            if (
+                attempt >= max_attempts
+                or delay is None
+                or breaker.state == CircuitBreaker.OPEN
+            ):
+                return response
+
+            github_retries.inc(endpoint_class=endpoint_class, reason=reason)
+            logger.warning(
+                f"GitHub {method} {endpoint_class} returned {response.status_code} "
+                f"({reason}), retrying in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+
+    def _retry_reason(self, response: httpx.Response) -> Optional[str]:
+        """Return why a response should be retried, or None if it should not."""
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            return "server_error"
+        if response.status_code == 429:
+            return "rate_limit"
+        if response.status_code == 403 and (
+            "Retry-After" in response.headers
+            or response.headers.get("X-RateLimit-Remaining") == "0"
+            or "secondary rate limit" in response.text.lower()
+        ):
+            return "rate_limit"
+        return None
+
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> Optional[float]:
+        """
+        Compute how long to wait before retrying a response.
+
+        Returns None when GitHub asks us to wait longer than `max_delay`, in which
+        case the response is returned to the caller instead of blocking.
+        """
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                delay = None
+            if delay is not None:
+                return delay if delay <= self.max_delay else None
+
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = response.headers.get("X-RateLimit-Reset")
+            if reset and reset.isdigit():
+                delay = max(0.0, int(reset) - time.time())
+                return delay if delay <= self.max_delay else None
+
+        return self._backoff(attempt)
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff."""
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        )
+
+
+github_client = GitHubClient(
+    max_retries=settings.GITHUB_MAX_RETRIES,
+    timeout=settings.GITHUB_REQUEST_TIMEOUT,
+)
@@ -1,13 +1,15 @@
 # backend/app/services/github_service.py
+import asyncio
 import datetime
 import jwt
+import math
 import time
 import httpx
-import yaml
 import base64
+import urllib.parse
 
 from fastapi import HTTPException
-from typing import Dict, Any, List
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 import logging
 
 from app.core.config import settings
@@ -20,10 +22,54 @@ from app.db.models.account import (
     Organization,
 )
 from app.db.models.user_preferences import UserPreference
+from app.services.github_client import github_client
+from app.services.workflow_parser import describe_workflow, get_workflow_summary
+from app.utils.singleflight import SingleFlight
 
 
 logger = logging.getLogger(__name__)
 
+# Shared by every GitHubService instance so concurrent requests coalesce
+github_singleflight = SingleFlight("github")
+
+# Installation tokens are valid for an hour; reuse them until shortly before expiry
+INSTALLATION_TOKEN_MARGIN = 5 * 60
+_installation_tokens: Dict[int, Tuple[str, float]] = {}
+
+
+class InstallationAuth(httpx.Auth):
+    """
+    Authenticate requests as a GitHub App installation.
+
+    Installation tokens are cached until shortly before they expire, but GitHub
+    can revoke them earlier, e.g. when the app is reinstalled. A 401 evicts the
+    rejected token and the request is sent once more with a new one.
+    """
+
+    def __init__(self, github_service: "GitHubService", installation_id: int):
+        self.github_service = github_service
+        self.installation_id = installation_id
+
+    async def async_auth_flow(self, request: httpx.Request):
+        token = await self.github_service.get_installation_token(self.installation_id)
+        request.headers["Authorization"] = f"token {token}"
+        response = yield request
+
+        if response.status_code == 401:
+            cached = _installation_tokens.get(self.installation_id)
+            # Concurrent requests may have replaced it already
+            if cached and cached[0] == token:
+                del _installation_tokens[self.installation_id]
+            logger.warning(
+                f"GitHub rejected the token of installation {self.installation_id}, "
+                "retrying with a new one"
+            )
+            token = await self.github_service.get_installation_token(
+                self.installation_id
+            )
+            request.headers["Authorization"] = f"token {token}"
+            yield request
+
 
 class GitHubService:
     def __init__(self, db):
@@ -108,23 +154,43 @@ class GitHubService:
         Raises:
             HTTPException: If the token retrieval fails.
         """
+        cached = _installation_tokens.get(installation_id)
+        if cached and cached[1] - INSTALLATION_TOKEN_MARGIN > time.time():
+            return cached[0]
+
+        # Tokens are never shared through Redis, only between local callers
+        return await github_singleflight.do(
+            f"installation_token:{installation_id}",
+            lambda: self._create_installation_token(installation_id),
+            distributed=False,
+        )
+
+    def installation_auth(self, installation_id: int) -> InstallationAuth:
+        """Return httpx auth that sends the installation's access token."""
+        return InstallationAuth(self, installation_id)
+
+    async def _create_installation_token(self, installation_id: int) -> str:
+        """Mint a new installation access token from GitHub."""
         token = await self.jwt_token
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.api_url}/app/installations/{installation_id}/access_tokens",
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Accept": "application/vnd.github.v3+json",
-                },
-            )
+        response = await github_client.post(
+            f"{self.api_url}/app/installations/{installation_id}/access_tokens",
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.github.v3+json",
+            },
+        )
 
-            if response.status_code != 201:
-                logger.error(f"Failed to get installation token: {response.text}")
-                response.raise_for_status()
+        if response.status_code != 201:
+            logger.error(f"Failed to get installation token: {response.text}")
+            response.raise_for_status()
 
-            data = response.json()
-            return data["token"]
+        data = response.json()
+        expires_at = datetime.datetime.strptime(
+            data["expires_at"], "%Y-%m-%dT%H:%M:%SZ"
+        ).replace(tzinfo=datetime.timezone.utc)
+        _installation_tokens[installation_id] = (data["token"], expires_at.timestamp())
+        return data["token"]
 
     async def get_app_installations(self) -> List[Dict[str, Any]]:
         """
@@ -138,20 +204,19 @@ class GitHubService:
         """
         token = await self.jwt_token
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.api_url}/app/installations",
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Accept": "application/vnd.github.v3+json",
-                },
-            )
+        response = await github_client.get(
+            f"{self.api_url}/app/installations",
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.github.v3+json",
+            },
+        )
 
-            if response.status_code != 200:
-                logger.error(f"Failed to get app installations: {response.text}")
-                response.raise_for_status()
+        if response.status_code != 200:
+            logger.error(f"Failed to get app installations: {response.text}")
+            response.raise_for_status()
 
-            return response.json()
+        return response.json()
 
     # TODO: Fix the issue if the orgnaization already exists its creating another row instead of updating the active column
     async def handle_installation_event(self, payload: dict):
@@ -439,33 +504,143 @@ class GitHubService:
         self, organization_name: str, installation_id: int
     ):
         """Get runners for a specific organization"""
-        token = await self.get_installation_token(installation_id)
+        installation = (
+            self.db.query(Installation)
+            .filter(Installation.installation_id == installation_id)
+            .first()
+        )
 
-        async with httpx.AsyncClient() as client:
-            installation = (
-                self.db.query(Installation)
-                .filter(Installation.installation_id == installation_id)
-                .first()
-            )
+        if not installation:
+            raise HTTPException(status_code=404, detail="Installation not found")
 
-            if not installation:
-                raise HTTPException(status_code=404, detail="Installation not found")
+        return await github_singleflight.do(
+            f"runners:{installation_id}:{organization_name}",
+            lambda: self._fetch_organization_runners(
+                organization_name, installation_id
+            ),
+        )
 
-            url = f"{self.api_url}/orgs/{organization_name}/actions/runners"
+    async def _fetch_organization_runners(
+        self, organization_name: str, installation_id: int
+    ) -> List[Dict[str, Any]]:
+        """Fetch the runner list for an organization from GitHub."""
+        runners = []
+        try:
+            async for page in self.paginate(
+                f"{self.api_url}/orgs/{organization_name}/actions/runners",
+                headers={"Accept": "application/vnd.github.v3+json"},
+                item_key="runners",
+                auth=self.installation_auth(installation_id),
+            ):
+                runners.extend(page)
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Failed to get runners: {e.response.text}")
+            raise
+
+        return runners
+
+    async def paginate(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        item_key: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        per_page: int = 100,
+        max_concurrency: Optional[int] = None,
+        auth: Optional[httpx.Auth] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Fetch every page of a GitHub list endpoint, yielding pages as they arrive.
 
-            response = await client.get(
-                url,
-                headers={
-                    "Authorization": f"token {token}",
-                    "Accept": "application/vnd.github.v3+json",
-                },
-            )
+        The first page is fetched on its own to discover the page count from the
+        `Link` header (or `total_count` for wrapped responses). The remaining pages
+        are then fetched concurrently under a semaphore, so pages after the first
+        are yielded in completion order rather than page order. Endpoints that
+        expose neither are walked sequentially until a short page.
 
-            if response.status_code != 200:
-                logger.error(f"Failed to get runners: {response.text}")
-                response.raise_for_status()
+        Args:
+            url (str): The list endpoint URL.
+            headers (Dict[str, str]): Request headers.
+            item_key (Optional[str]): Key holding the items for wrapped responses
+                (e.g. "runners"); None for endpoints returning a bare list.
+            params (Optional[Dict[str, Any]]): Extra query parameters.
+            per_page (int): Page size to request (GitHub allows up to 100).
+            max_concurrency (Optional[int]): Maximum pages fetched at once.
+            auth (Optional[httpx.Auth]): Authentication for every page request, e.g.
+                from `installation_auth`.
+
+        Yields:
+            List[Dict[str, Any]]: The items of one page.
+
+        Raises:
+            httpx.HTTPStatusError: If any page request fails.
+        """
+        max_concurrency = max_concurrency or settings.GITHUB_PAGINATION_CONCURRENCY
+        base_params = {**(params or {}), "per_page": per_page}
 
-            return response.json()["runners"]
+        async def fetch_page(page: int):
+            response = await github_client.get(
+                url, headers=headers, params={**base_params, "page": page}, auth=auth
+            )
+            response.raise_for_status()
+            body = response.json()
+            items = body.get(item_key, []) if item_key else body
+            return response, body, items
+
+        response, body, items = await fetch_page(1)
+        yield items
+
+        last_page = self._get_last_page(response, body, item_key, per_page)
+
+        if last_page is None:
+            page = 1
+            while len(items) >= per_page:
+                page += 1
+                _, _, items = await fetch_page(page)
+                if items:
+                    yield items
+            return
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch_page_bounded(page: int):
+            async with semaphore:
+                return await fetch_page(page)
+
+        tasks = [
+            asyncio.ensure_future(fetch_page_bounded(page))
+            for page in range(2, last_page + 1)
+        ]
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                _, _, items = await next_page
+                yield items
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _get_last_page(
+        self,
+        response: httpx.Response,
+        body: Any,
+        item_key: Optional[str],
+        per_page: int,
+    ) -> Optional[int]:
+        """Determine the last page number from a first-page response."""
+        last_url = response.links.get("last", {}).get("url")
+        if last_url:
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(last_url).query)
+            if query.get("page"):
+                return int(query["page"][0])
+
+        if item_key and isinstance(body, dict) and "total_count" in body:
+            return max(1, math.ceil(body["total_count"] / per_page))
+
+        if "next" in response.links:
+            # Paginated, but the page count is unknown
+            return None
+
+        return 1
 
     # async def sync_organization_from_github(
     #     self, github_org_login: str
@@ -566,29 +741,26 @@ class GitHubService:
         Raises:
             HTTPException: If the request to GitHub fails or logs are not available.
         """
-        token = await self.get_installation_token(installation_id)
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            response = await client.get(
-                f"{self.api_url}/repos/{repository_full_name}/actions/jobs/{job_id}/logs",
-                headers={
-                    "Authorization": f"token {token}",
-                    "Accept": "application/vnd.github.v3+json",
-                },
-            )
+        response = await github_client.get(
+            f"{self.api_url}/repos/{repository_full_name}/actions/jobs/{job_id}/logs",
+            headers={"Accept": "application/vnd.github.v3+json"},
+            auth=self.installation_auth(installation_id),
+            follow_redirects=True,
+        )
 
-            if response.status_code == 404:
-                logger.warning(f"Logs not found for job {job_id}")
-                return ""
-            elif response.status_code != 200:
-                logger.error(
-                    f"Failed to fetch logs for job {job_id}: {response.status_code}"
-                )
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Failed to fetch job logs: {response.text}",
-                )
+        if response.status_code == 404:
+            logger.warning(f"Logs not found for job {job_id}")
+            return ""
+        elif response.status_code != 200:
+            logger.error(
+                f"Failed to fetch logs for job {job_id}: {response.status_code}"
+            )
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Failed to fetch job logs: {response.text}",
+            )
 
-            return response.text
+        return response.text
 
     # TODO: Fix issue with retrieving the content of the workflow (yaml)
     async def fetch_workflow_content(
@@ -608,36 +780,42 @@ class GitHubService:
         Raises:
             HTTPException: If the request to GitHub fails.
         """
-        token = await self.get_installation_token(installation_id)
-
-        async with httpx.AsyncClient() as client:
-            # Get the workflow file content
-            response = await client.get(
-                f"{self.api_url}/repos/{repository_full_name}/contents/{workflow_path}",
-                headers={
-                    "Authorization": f"token {token}",
-                    "Accept": "application/vnd.github.v3+json",
-                },
-            )
+        return await github_singleflight.do(
+            f"workflow_content:{installation_id}:{repository_full_name}:{workflow_path}",
+            lambda: self._fetch_workflow_content(
+                installation_id, repository_full_name, workflow_path
+            ),
+        )
+
+    async def _fetch_workflow_content(
+        self, installation_id: int, repository_full_name: str, workflow_path: str
+    ) -> Dict[str, Any]:
+        """Fetch and decode a workflow file from the GitHub contents API."""
+        # Get the workflow file content
+        response = await github_client.get(
+            f"{self.api_url}/repos/{repository_full_name}/contents/{workflow_path}",
+            headers={"Accept": "application/vnd.github.v3+json"},
+            auth=self.installation_auth(installation_id),
+        )
 
-            if response.status_code != 200:
-                logger.error(f"Failed to fetch workflow content: {response.text}")
-                response.raise_for_status()
+        if response.status_code != 200:
+            logger.error(f"Failed to fetch workflow content: {response.text}")
+            response.raise_for_status()
 
-            content_data = response.json()
+        content_data = response.json()
 
-            workflow_content = base64.b64decode(content_data["content"]).decode("utf-8")
+        workflow_content = base64.b64decode(content_data["content"]).decode("utf-8")
 
-            description = self._extract_workflow_description(workflow_content)
+        description = self._extract_workflow_description(workflow_content)
 
-            # Generate badge URL
-            badge_url = f"https://github.com/{repository_full_name}/actions/workflows/{workflow_path.split('/')[-1]}/badge.svg"
+        # Generate badge URL
+        badge_url = f"https://github.com/{repository_full_name}/actions/workflows/{workflow_path.split('/')[-1]}/badge.svg"
 
-            return {
-                "content": workflow_content,
-                "description": description,
-                "badge_url": badge_url,
-            }
+        return {
+            "content": workflow_content,
+            "description": description,
+            "badge_url": badge_url,
+        }
 
     def _extract_workflow_description(self, workflow_content: str) -> str:
         """
@@ -649,29 +827,20 @@ class GitHubService:
         Returns:
             str: The extracted description or a default description.
         """
-        try:
-            workflow_yaml = yaml.safe_load(workflow_content)
-
-            if isinstance(workflow_yaml, dict):
-                if "name" in workflow_yaml:
-                    return workflow_yaml["name"]
+        summary = get_workflow_summary(workflow_content)
 
-                if "description" in workflow_yaml:
-                    return workflow_yaml["description"]
+        if summary["error"]:
+            logger.warning(f"Failed to parse workflow YAML: {summary['error']}")
+            return "GitHub Actions workflow"
 
-                if "on" in workflow_yaml:
-                    triggers = (
-                        list(workflow_yaml["on"].keys())
-                        if isinstance(workflow_yaml["on"], dict)
-                        else [workflow_yaml["on"]]
-                    )
-                    return f"Workflow triggered by: {', '.join(triggers)}"
+        description = describe_workflow(summary)
+        if description:
+            return description
 
-            return "GitHub Actions workflow"
+        if summary["triggers"]:
+            return f"Workflow triggered by: {', '.join(summary['triggers'])}"
 
-        except Exception as e:
-            logger.warning(f"Failed to parse workflow YAML: {e}")
-            return "GitHub Actions workflow"
+        return "GitHub Actions workflow"
 
     async def get_user_organizations_from_github(
         self, access_token: str
@@ -688,20 +857,19 @@ class GitHubService:
         Raises:
             HTTPException: If the request to GitHub fails.
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.api_url}/user/orgs",
-                headers={
-                    "Authorization": f"token {access_token}",
-                    "Accept": "application/vnd.github.v3+json",
-                },
-            )
+        response = await github_client.get(
+            f"{self.api_url}/user/orgs",
+            headers={
+                "Authorization": f"token {access_token}",
+                "Accept": "application/vnd.github.v3+json",
+            },
+        )
 
-            if response.status_code != 200:
-                logger.error(f"Failed to get user organizations: {response.text}")
-                response.raise_for_status()
+        if response.status_code != 200:
+            logger.error(f"Failed to get user organizations: {response.text}")
+            response.raise_for_status()
 
-            return response.json()
+        return response.json()
 
     async def process_automatic_membership_on_signup(
         self, user_id: str, github_access_token: str
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+leader_election_is_leader = registry.gauge(
+    "leader_election_is_leader",
+    "Whether this worker currently holds the leader lease (1) or not (0)",
+    ["name"],
+)
+leader_election_transitions = registry.counter(
+    "leader_election_transitions_total",
+    "Leadership changes of this worker",
+    ["name", "event"],
+)
+
+# Extend the lease only if this worker still owns it
+RENEW_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Delete the lease only if this worker still owns it
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+Callback = Callable[[], Awaitable[None]]
+
+
+class LeaderElection:
+    """
+    Elect a single leader among workers through a Redis lease.
+
+    Every worker tries to `SET key identity NX PX ttl`; the one that succeeds is the
+    leader and renews the lease every `renew_interval` seconds. If a renewal fails
+    or finds another owner, leadership is dropped immediately. A leader that shuts
+    down releases the lease, so another worker takes over on its next attempt;
+    a leader that crashes is replaced once the lease expires.
+
+    Without Redis there is nothing to coordinate with and the worker leads
+    unconditionally, which is only correct for single-worker deployments.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        redis_client=None,
+        ttl: float = 15.0,
+        renew_interval: Optional[float] = None,
+        on_elected: Optional[Callback] = None,
+        on_revoked: Optional[Callback] = None,
+    ):
+        self.name = name
+        self.redis = redis_client
+        self.ttl = ttl
+        self.renew_interval = renew_interval or ttl / 3
+        self.on_elected = on_elected
+        self.on_revoked = on_revoked
+        self.key = f"leader:{name}"
+        self.identity = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self.leader_since: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start campaigning for leadership in the background."""
+        if self._task and not self._task.done():
+            return
+
+        if not self.redis:
+            logger.warning(
+                f"No Redis configured, {self.identity} leads {self.name} unconditionally"
+            )
+
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop campaigning and release the lease if this worker holds it."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self.is_leader:
+            await self._set_leader(False)
+            if self.redis:
+                try:
+                    await self.redis.eval(RELEASE_SCRIPT, 1, self.key, self.identity)
+                except Exception as e:
+                    logger.debug(f"Failed to release {self.key}: {e}")
+
+    async def get_leader(self) -> Optional[dict]:
+        """
+        Return the current lease holder, as seen from Redis.
+
+        Returns:
+            Optional[dict]: `identity` and remaining `ttl_seconds` of the leader, or
+            None if nobody holds the lease.
+        """
+        if not self.redis:
+            if not self.is_leader:
+                return None
+            return {"identity": self.identity, "ttl_seconds": None}
+
+        identity, ttl_ms = await asyncio.gather(
+            self.redis.get(self.key), self.redis.pttl(self.key)
+        )
+        if identity is None:
+            return None
+        return {"identity": identity, "ttl_seconds": round(max(ttl_ms, 0) / 1000, 1)}
+
+    async def _run(self):
+        while True:
+            try:
+                held = await self._hold_lease()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # If Redis is unreachable we can't prove we still hold the lease
+                logger.warning(f"Leader election for {self.name} failed: {e}")
+                held = False
+
+            if held != self.is_leader:
+                await self._set_leader(held)
+
+            await asyncio.sleep(self.renew_interval)
+
+    async def _hold_lease(self) -> bool:
+        """Renew the lease if this worker owns it, otherwise try to acquire it."""
+        if not self.redis:
+            return True
+
+        ttl_ms = int(self.ttl * 1000)
+        # Renewing first also recovers a lease still held after a failed renewal
+        if await self.redis.eval(RENEW_SCRIPT, 1, self.key, self.identity, ttl_ms):
+            return True
+        return bool(await self.redis.set(self.key, self.identity, nx=True, px=ttl_ms))
+
+    async def _set_leader(self, leader: bool):
+        self.is_leader = leader
+        self.leader_since = time.time() if leader else None
+        leader_election_is_leader.set(int(leader), name=self.name)
+        leader_election_transitions.inc(
+            name=self.name, event="elected" if leader else "revoked"
+        )
+        logger.info(
+            f"{self.identity} {'became' if leader else 'is no longer'} leader of {self.name}"
+        )
+
+        callback = self.on_elected if leader else self.on_revoked
+        if callback:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"Leadership callback for {self.name} failed: {e}")
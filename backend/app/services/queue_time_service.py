@@ -0,0 +1,344 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.models.job import Job, JobQueueRollup
+from app.services.runner_utilization_service import floor_time
+from app.utils.labels import label_pool_key
+from app.utils.metrics import registry
+
+HOUR = timedelta(hours=1)
+HOURS_PER_WEEK = 7 * 24
+
+# Upper bounds in seconds of the queue time histogram buckets
+QUEUE_TIME_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+job_queue_seconds = registry.histogram(
+    "job_queue_seconds",
+    "How long jobs waited for a runner, by runs-on label pool",
+    ["pool"],
+    buckets=QUEUE_TIME_BUCKETS,
+)
+
+
+def update_job_queue_time(job: Job, labels: Optional[List[str]]):
+    """
+    Set the runner pool and queue time of a job, and observe the queue time metric.
+
+    The queue time is known once the job is running: `queued_at` is GitHub's
+    `created_at`, and queued events carry a provisional `started_at`. It is
+    computed and observed only once.
+
+    Args:
+        job (Job): The job, with timestamps already set from the payload.
+        labels (Optional[List[str]]): The `runs-on` labels of the job.
+    """
+    if labels:
+        job.runner_pool = label_pool_key(labels)
+
+    if (
+        job.queue_seconds is None
+        and job.status in ("in_progress", "completed")
+        and job.queued_at
+        and job.started_at
+    ):
+        job.queue_seconds = _queue_seconds(job)
+        job_queue_seconds.observe(job.queue_seconds, pool=job.runner_pool or "")
+
+
+def _utc(moment: datetime) -> datetime:
+    """Return a naive UTC datetime, as stored, for naive or aware input."""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _queue_seconds(job: Job) -> float:
+    return max((_utc(job.started_at) - _utc(job.queued_at)).total_seconds(), 0.0)
+
+
+def split_by_hour(since: datetime, until: datetime) -> Iterator[Tuple[datetime, float]]:
+    """Yield each hour overlapping `[since, until)` with the seconds of overlap."""
+    hour = floor_time(since, HOUR)
+    while hour < until:
+        yield hour, (min(until, hour + HOUR) - max(since, hour)).total_seconds()
+        hour += HOUR
+
+
+def record_completed_job(db: Session, job: Job) -> bool:
+    """
+    Add a completed job to the hourly queue rollups of its pool, without committing.
+
+    Call once per job, when it first completes. Missing rows are created, then
+    the touched rows are locked and incremented, so concurrent webhook handlers
+    can't lose each other's updates.
+
+    Args:
+        db (Session): The database session.
+        job (Job): The completed job.
+
+    Returns:
+        bool: Whether the job had the timestamps needed to be recorded.
+    """
+    if not (job.queued_at and job.started_at and job.completed_at):
+        return False
+    queued_at, started_at, completed_at = (
+        _utc(job.queued_at),
+        _utc(job.started_at),
+        _utc(job.completed_at),
+    )
+
+    increments: Dict[datetime, Dict] = defaultdict(
+        lambda: {"demand_seconds": 0.0, "run_seconds": 0.0}
+    )
+    queued_hour = floor_time(queued_at, HOUR)
+    increments[queued_hour]
+    for hour, seconds in split_by_hour(queued_at, completed_at):
+        increments[hour]["demand_seconds"] += seconds
+    for hour, seconds in split_by_hour(started_at, completed_at):
+        increments[hour]["run_seconds"] += seconds
+
+    pool = job.runner_pool or ""
+    db.execute(
+        insert(JobQueueRollup)
+        .values(
+            [
+                {
+                    "installation_id": job.installation_id,
+                    "pool": pool,
+                    "bucket_start": hour,
+                    "jobs": 0,
+                    "queue_seconds_total": 0,
+                    "queue_seconds_max": 0,
+                    "queue_histogram": [0] * (len(QUEUE_TIME_BUCKETS) + 1),
+                    "demand_seconds": 0,
+                    "run_seconds": 0,
+                }
+                for hour in increments
+            ]
+        )
+        .on_conflict_do_nothing(constraint="unique_job_queue_bucket")
+    )
+
+    rollups = (
+        db.query(JobQueueRollup)
+        .filter(
+            JobQueueRollup.installation_id == job.installation_id,
+            JobQueueRollup.pool == pool,
+            JobQueueRollup.bucket_start.in_(list(increments)),
+        )
+        # A consistent lock order keeps concurrent jobs from deadlocking
+        .order_by(JobQueueRollup.bucket_start)
+        .with_for_update()
+        .all()
+    )
+
+    queue_seconds = _queue_seconds(job)
+    for rollup in rollups:
+        increment = increments[rollup.bucket_start]
+        rollup.demand_seconds += increment["demand_seconds"]
+        rollup.run_seconds += increment["run_seconds"]
+
+        if rollup.bucket_start == queued_hour:
+            rollup.jobs += 1
+            rollup.queue_seconds_total += queue_seconds
+            rollup.queue_seconds_max = max(rollup.queue_seconds_max, queue_seconds)
+            histogram = list(rollup.queue_histogram)
+            histogram[_bucket_index(queue_seconds)] += 1
+            rollup.queue_histogram = histogram
+
+    return True
+
+
+def _bucket_index(seconds: float) -> int:
+    for index, bound in enumerate(QUEUE_TIME_BUCKETS):
+        if seconds <= bound:
+            return index
+    return len(QUEUE_TIME_BUCKETS)
+
+
+def histogram_percentile(
+    histogram: Sequence[int], percentile: float
+) -> Optional[float]:
+    """
+    Estimate a percentile from `QUEUE_TIME_BUCKETS` counts.
+
+    Interpolates linearly inside the bucket holding the percentile, like
+    Prometheus' `histogram_quantile`. Waits past the last bound are reported as
+    that bound.
+
+    Args:
+        histogram (Sequence[int]): Counts per bucket, as in `queue_histogram`.
+        percentile (float): The percentile, between 0 and 100.
+
+    Returns:
+        Optional[float]: The estimated queue time in seconds, or None without jobs.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+
+    rank = total * percentile / 100
+    cumulative = 0
+    lower = 0.0
+    for count, upper in zip(histogram, QUEUE_TIME_BUCKETS):
+        if count and cumulative + count >= rank:
+            return lower + (upper - lower) * (rank - cumulative) / count
+        cumulative += count
+        lower = upper
+    return float(QUEUE_TIME_BUCKETS[-1])
+
+
+def _merge_histograms(histograms) -> List[int]:
+    merged = [0] * (len(QUEUE_TIME_BUCKETS) + 1)
+    for histogram in histograms:
+        for index, count in enumerate(histogram):
+            merged[index] += count
+    return merged
+
+
+def _rollups(db: Session, installation_id: int, since: datetime, pool: Optional[str]):
+    query = db.query(JobQueueRollup).filter(
+        JobQueueRollup.installation_id == installation_id,
+        JobQueueRollup.bucket_start >= since,
+    )
+    if pool is not None:
+        query = query.filter(JobQueueRollup.pool == label_pool_key(pool.split(",")))
+    return query.order_by(JobQueueRollup.pool, JobQueueRollup.bucket_start).all()
+
+
+def get_queue_time_stats(
+    db: Session, installation_id: int, since: datetime, pool: Optional[str] = None
+) -> List[Dict]:
+    """
+    Summarize the queue times and runner demand of each pool since a time.
+
+    Args:
+        db (Session): The database session.
+        installation_id (int): The installation to report on.
+        since (datetime): Start of the period.
+        pool (Optional[str]): Only report this pool, as labels separated by commas.
+
+    Returns:
+        List[Dict]: Per pool, the job count, mean and max queue time, p50/p90/p95
+        queue time estimates, and the average and busiest-hour concurrent demand.
+    """
+    by_pool: Dict[str, List[JobQueueRollup]] = defaultdict(list)
+    for rollup in _rollups(db, installation_id, since, pool):
+        by_pool[rollup.pool].append(rollup)
+
+    stats = []
+    for key, rollups in by_pool.items():
+        jobs = sum(rollup.jobs for rollup in rollups)
+        histogram = _merge_histograms(rollup.queue_histogram for rollup in rollups)
+        hours = max((datetime.utcnow() - since) / HOUR, 1)
+        stats.append(
+            {
+                "pool": key,
+                "jobs": jobs,
+                "mean_queue_seconds": (
+                    round(sum(r.queue_seconds_total for r in rollups) / jobs, 1)
+                    if jobs
+                    else None
+                ),
+                "max_queue_seconds": max(r.queue_seconds_max for r in rollups),
+                "p50_queue_seconds": histogram_percentile(histogram, 50),
+                "p90_queue_seconds": histogram_percentile(histogram, 90),
+                "p95_queue_seconds": histogram_percentile(histogram, 95),
+                "average_demand": round(
+                    sum(r.demand_seconds for r in rollups) / 3600 / hours, 2
+                ),
+                "peak_hour_demand": round(
+                    max(r.demand_seconds for r in rollups) / 3600, 2
+                ),
+            }
+        )
+    return stats
+
+
+def forecast_runner_demand(
+    db: Session,
+    installation_id: int,
+    weeks: int = 4,
+    percentile: float = 90,
+    headroom: float = 0.2,
+    pool: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> List[Dict]:
+    """
+    Predict the runners each pool needs for every hour of the week.
+
+    For each hour of the week, the average number of jobs waiting or running at
+    once is taken from the same hour of each of the last `weeks` complete weeks
+    (weeks without jobs count as zero). Queued time counts because jobs only run
+    as fast as the pool allows, so a saturated pool would otherwise forecast the
+    runners it already has. The forecast is that value's `percentile` across
+    weeks, scaled up by `headroom` for bursts within the hour.
+
+    Args:
+        db (Session): The database session.
+        installation_id (int): The installation to forecast for.
+        weeks (int): Complete weeks of history to use.
+        percentile (float): Percentile of the weekly values to plan for.
+        headroom (float): Extra capacity as a fraction of the forecast demand.
+        pool (Optional[str]): Only forecast this pool, as labels separated by commas.
+        now (Optional[datetime]): The current time, for tests.
+
+    Returns:
+        List[Dict]: Per pool, 168 `hours` (0 is Monday 00:00 UTC) with the
+        forecast `demand`, `required_runners` and the slot's p90 queue time.
+    """
+    now = now or datetime.utcnow()
+    this_week = floor_time(now, timedelta(days=1)) - timedelta(days=now.weekday())
+    since = this_week - timedelta(weeks=weeks)
+
+    demand: Dict[str, List[List[float]]] = defaultdict(
+        lambda: [[0.0] * weeks for _ in range(HOURS_PER_WEEK)]
+    )
+    histograms: Dict[str, List[List[List[int]]]] = defaultdict(
+        lambda: [[] for _ in range(HOURS_PER_WEEK)]
+    )
+    for rollup in _rollups(db, installation_id, since, pool):
+        if rollup.bucket_start >= this_week:
+            continue
+        slot = rollup.bucket_start.weekday() * 24 + rollup.bucket_start.hour
+        week = (rollup.bucket_start - since) // timedelta(weeks=1)
+        demand[rollup.pool][slot][week] += rollup.demand_seconds / 3600
+        histograms[rollup.pool][slot].append(rollup.queue_histogram)
+
+    forecasts = []
+    for key, slots in demand.items():
+        hours = []
+        for slot, values in enumerate(slots):
+            forecast = _percentile(values, percentile)
+            hours.append(
+                {
+                    "hour_of_week": slot,
+                    "demand": round(forecast, 2),
+                    "required_runners": math.ceil(round(forecast * (1 + headroom), 6)),
+                    "p90_queue_seconds": histogram_percentile(
+                        _merge_histograms(histograms[key][slot]), 90
+                    ),
+                }
+            )
+        forecasts.append(
+            {
+                "pool": key,
+                "peak_required_runners": max(h["required_runners"] for h in hours),
+                "hours": hours,
+            }
+        )
+    return forecasts
+
+
+def _percentile(values: Sequence[float], percentile: float) -> float:
+    """Linearly interpolated percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * percentile / 100
+    lower = math.floor(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
@@ -1,26 +1,197 @@
 import asyncio
+import heapq
 import json
 import logging
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-
-import redis
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import (
+    String,
+    all_,
+    and_,
+    bindparam,
+    case,
+    literal_column,
+    or_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 
 from app.core.config import settings
+from app.core.redis import get_redis
 
 
 from app.db.models.installation import Installation
 from app.db.models.runner import Runner
 from app.db.models.account import Organization
+from app.services.github_client import background_requests
 from app.services.github_service import GitHubService
+from app.services.leader_election import LeaderElection
+from app.services.runner_utilization_service import (
+    prune_runner_history,
+    record_state_changes,
+    run_rollups,
+    runner_state,
+)
 from app.db.session import SessionLocal
+from app.utils.labels import label_names
+from app.utils.metrics import registry
 
 
 logger = logging.getLogger(__name__)
 
+# Rows per upsert statement, well below PostgreSQL's 65535 bind parameter limit
+UPSERT_BATCH_SIZE = 1000
+
+# Seconds between deletions of runner utilization history past its retention
+PRUNE_INTERVAL = 3600
+
+runner_sync_cycle_seconds = registry.histogram(
+    "runner_sync_cycle_seconds",
+    "Duration of a full runner sync cycle across all installations",
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+
+
+class ApiCallBudget:
+    """
+    Hourly GitHub API call budget, tracked per installation.
+
+    GitHub rate limits each installation token separately, so one busy
+    installation must not stop the others from syncing.
+    """
+
+    def __init__(self, max_calls_per_hour: int = 4000, threshold: float = 0.8):
+        self.max_calls_per_hour = max_calls_per_hour
+        self.threshold = threshold
+        self._windows: Dict[int, List] = {}  # installation -> [calls, reset time]
+
+    def _window(self, installation_id: int) -> List:
+        now = datetime.utcnow()
+        window = self._windows.get(installation_id)
+        if window is None or now > window[1]:
+            window = [0, now + timedelta(hours=1)]
+            self._windows[installation_id] = window
+        return window
+
+    def exhausted(self, installation_id: int) -> bool:
+        """Return whether the installation has used its share of the hourly budget."""
+        calls = self._window(installation_id)[0]
+        return calls >= self.max_calls_per_hour * self.threshold
+
+    def spend(self, installation_id: int, calls: int = 1):
+        self._window(installation_id)[0] += calls
+
+
+# Shared across sync cycles, which each create their own RunnerService
+api_call_budget = ApiCallBudget()
+
+
+class RunnerIdCache:
+    """LRU of runner record ids keyed by installation and GitHub runner ID."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[tuple, int]" = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[int]:
+        runner_pk = self._items.get(key)
+        if runner_pk is not None:
+            self._items.move_to_end(key)
+        return runner_pk
+
+    def put(self, key: tuple, runner_pk: int):
+        self._items[key] = runner_pk
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def discard(self, key: tuple) -> bool:
+        return self._items.pop(key, None) is not None
+
+    def clear(self):
+        self._items.clear()
+
+
+runner_id_cache = RunnerIdCache()
+
+
+def forget_runner_id(
+    installation_id: int,
+    github_runner_id: Optional[int] = None,
+    runner_name: Optional[str] = None,
+) -> bool:
+    """
+    Drop the cached record ids of a runner, so the next lookup reads the database.
+
+    Args:
+        installation_id (int): The installation the runner belongs to.
+        github_runner_id (Optional[int]): The GitHub runner ID.
+        runner_name (Optional[str]): The runner name.
+
+    Returns:
+        bool: Whether anything was cached.
+    """
+    forgotten = False
+    if github_runner_id:
+        forgotten |= runner_id_cache.discard(
+            (installation_id, "id", str(github_runner_id))
+        )
+    if runner_name:
+        forgotten |= runner_id_cache.discard((installation_id, "name", runner_name))
+    return forgotten
+
+
+def resolve_runner_id(
+    db: Session,
+    installation_id: int,
+    github_runner_id: Optional[int],
+    runner_name: Optional[str] = None,
+) -> Optional[int]:
+    """
+    Return the record id of the runner that ran a job.
+
+    Found runners are cached, so the lookup costs one indexed query per runner
+    rather than per job event. Misses are not cached, as the runner may only be
+    stored by the next sync.
+
+    Args:
+        db (Session): The database session.
+        installation_id (int): The installation the job belongs to.
+        github_runner_id (Optional[int]): The `runner_id` of the workflow job.
+        runner_name (Optional[str]): The `runner_name` of the workflow job, used
+            when the job has no runner ID.
+
+    Returns:
+        Optional[int]: The `Runner.id`, or None for unknown and GitHub-hosted runners.
+    """
+    if github_runner_id:
+        key = (installation_id, "id", str(github_runner_id))
+        condition = Runner.runner_id == str(github_runner_id)
+    elif runner_name:
+        key = (installation_id, "name", runner_name)
+        condition = Runner.name == runner_name
+    else:
+        return None
+
+    runner_pk = runner_id_cache.get(key)
+    if runner_pk is not None:
+        return runner_pk
+
+    runner_pk = (
+        db.query(Runner.id)
+        .filter(Runner.installation_id == installation_id, condition)
+        .order_by(Runner.id.desc())
+        .limit(1)
+        .scalar()
+    )
+    if runner_pk is not None:
+        runner_id_cache.put(key, runner_pk)
+    return runner_pk
+
 
 class RunnerService:
     """
@@ -37,21 +208,7 @@ class RunnerService:
         self.db = db
         self.redis_client = redis_client
         self.github_service = GitHubService(db)
-
-        self.active_runner_ttl = 300  # 5 minutes for active runners
-        self.inactive_runner_ttl = 1800  # 30 minutes for inactive runners
-        self.max_api_calls_per_hour = 4000  # Conservative limit
-
-        self.api_call_count = 0
-        self.api_reset_time = datetime.utcnow() + timedelta(hours=1)
-
-    def _get_cache_key(self, installation_id: int) -> str:
-        """Generate cache key for runner data."""
-        return f"runners:installation:{installation_id}"
-
-    def _get_runner_activity_key(self, installation_id: int) -> str:
-        """Generate cache key for runner activity tracking."""
-        return f"runner_activity:installation:{installation_id}"
+        self.api_budget = api_call_budget
 
     async def extract_runner_from_job_webhook(
         self, installation_id: int, workflow_job: Dict, action: str
@@ -93,8 +250,6 @@ class RunnerService:
 
             await self._update_runner_from_webhook(installation_id, runner_data)
 
-            await self._mark_installation_active(installation_id)
-
             logger.info(
                 f"Extracted runner {runner_name} from job webhook for installation {installation_id}"
             )
@@ -123,6 +278,10 @@ class RunnerService:
             )
 
             if existing_runner:
+                previous = _runner_change(existing_runner)
+                previous_state = runner_state(
+                    existing_runner.status, existing_runner.busy
+                )
                 existing_runner.name = runner_data.get("name", existing_runner.name)
                 existing_runner.status = runner_data.get(
                     "status", existing_runner.status
@@ -130,13 +289,16 @@ class RunnerService:
                 existing_runner.busy = bool(
                     runner_data.get("busy", existing_runner.busy)
                 )
-                existing_runner.labels = runner_data.get(
-                    "labels", existing_runner.labels
-                )
+                # A job's labels are only the subset it asked for, so the runner
+                # keeps the full labels from the last sync, which also decide
+                # the pool its state changes are attributed to
                 existing_runner.last_seen = datetime.utcnow()
                 existing_runner.last_check = datetime.utcnow()
                 self.db.add(existing_runner)
+                runner = existing_runner
             else:
+                # Until the next sync, the job's labels are all that is known
+                previous = previous_state = None
                 new_runner = Runner(
                     installation_id=installation_id,
                     runner_id=runner_id,
@@ -144,6 +306,7 @@ class RunnerService:
                     status=runner_data.get("status", "online"),
                     busy=bool(runner_data.get("busy", False)),
                     labels=runner_data.get("labels", []),
+                    label_names=label_names(runner_data.get("labels")),
                     os=None,
                     architecture=None,
                     ephemeral=False,
@@ -151,320 +314,519 @@ class RunnerService:
                     last_check=datetime.utcnow(),
                 )
                 self.db.add(new_runner)
+                runner = new_runner
+                # Ephemeral runners reuse names, so the name now means this record
+                forget_runner_id(installation_id, runner_name=new_runner.name)
+
+            if runner_state(runner.status, runner.busy) != previous_state:
+                record_state_changes(
+                    self.db,
+                    installation_id,
+                    [
+                        {
+                            "runner_id": runner_id,
+                            "status": runner.status,
+                            "busy": runner.busy,
+                            "labels": runner.labels,
+                        }
+                    ],
+                )
 
+            change = _runner_diff(previous, _runner_change(runner))
             self.db.commit()
 
-            if self.redis_client:
-                cache_key = self._get_cache_key(installation_id)
-                self.redis_client.delete(cache_key)
+            if change:
+                organization_id = (
+                    self.db.query(Installation.organization_id)
+                    .filter(Installation.installation_id == installation_id)
+                    .scalar()
+                )
+                if organization_id:
+                    self._publish_runner_changes(organization_id, [change])
 
         except Exception as e:
             self.db.rollback()
             logger.error(f"Error updating runner from webhook: {e}")
 
-    async def _mark_installation_active(self, installation_id: int):
-        """Mark installation as having recent runner activity."""
-        if not self.redis_client:
-            return
-
-        try:
-            activity_key = self._get_runner_activity_key(installation_id)
-            self.redis_client.setex(
-                activity_key, 3600, datetime.utcnow().isoformat()
-            )  # 1 hour
-        except Exception as e:
-            logger.debug(f"Failed to mark installation active: {e}")
+    def get_installations(self) -> List[Tuple[int, str, Optional[str]]]:
+        """Return the ID, organization ID and organization login of every installation."""
+        return (
+            self.db.query(
+                Installation.installation_id,
+                Installation.organization_id,
+                Organization.login,
+            )
+            .outerjoin(Organization, Organization.id == Installation.organization_id)
+            .all()
+        )
 
-    async def _is_installation_active(self, installation_id: int) -> bool:
-        """Check if installation has recent runner activity."""
-        if not self.redis_client:
-            return True  # Default to active if no Redis
+    async def smart_sync_runners(
+        self, installations: Optional[List[Tuple[int, str, Optional[str]]]] = None
+    ) -> Tuple[Dict[str, int], Dict[int, Dict]]:
+        """
+        Sync the runners of installations, all of them by default.
 
-        try:
-            activity_key = self._get_runner_activity_key(installation_id)
-            return self.redis_client.exists(activity_key)
-        except Exception as e:
-            logger.debug(f"Failed to check installation activity: {e}")
-            return True
+        Installations are synced concurrently, at most `RUNNER_SYNC_CONCURRENCY` at a
+        time. Database writes never yield to the event loop, so the shared session is
+        only used by one installation at a time.
 
-    async def smart_sync_runners(self) -> Dict[str, int]:
-        """
-        Intelligent runner synchronization that minimizes API calls.
+        Args:
+            installations (Optional[List[Tuple[int, str, Optional[str]]]]): The
+                installations to sync, as returned by `get_installations`.
 
         Returns:
-            Dict with sync statistics
+            Tuple[Dict[str, int], Dict[int, Dict]]: Sync statistics, and the result
+            of each installation: `runners_updated`, `api_calls` and whether it was
+            `throttled` or `failed`.
         """
         stats = {
             "installations_checked": 0,
             "installations_synced": 0,
             "runners_updated": 0,
             "api_calls_made": 0,
-            "skipped_inactive": 0,
             "skipped_rate_limit": 0,
         }
+        results: Dict[int, Dict] = {}
+        started = time.monotonic()
 
         try:
-            if self._should_throttle_api_calls():
-                logger.warning("Throttling API calls due to rate limit")
-                stats["skipped_rate_limit"] = -1
-                return stats
-
-            installations = self.db.query(Installation).all()
+            if installations is None:
+                installations = self.get_installations()
             stats["installations_checked"] = len(installations)
 
-            for installation in installations:
+            semaphore = asyncio.Semaphore(settings.RUNNER_SYNC_CONCURRENCY)
+
+            async def sync_installation(
+                installation_id: int, organization_id: str, login: Optional[str]
+            ):
+                result = results[installation_id] = {
+                    "runners_updated": 0,
+                    "api_calls": 0,
+                    "throttled": False,
+                    "failed": False,
+                }
                 try:
-                    if not await self._is_installation_active(
-                        installation.installation_id
-                    ):
-                        if not await self._should_sync_inactive_installation(
-                            installation.installation_id
-                        ):
-                            stats["skipped_inactive"] += 1
-                            continue
-
-                    organization = (
-                        self.db.query(Organization)
-                        .filter(Organization.id == installation.organization_id)
-                        .first()
-                    )
-
-                    if not organization:
+                    if not login:
                         logger.warning(
-                            f"No organization found for installation {installation.installation_id}"
+                            f"No organization found for installation {installation_id}"
                         )
-                        continue
+                        result["failed"] = True
+                        return
+
+                    async with semaphore:
+                        # Checked once a slot is free so it counts calls made by earlier syncs
+                        if self._should_throttle_api_calls(installation_id):
+                            logger.warning(
+                                f"Throttling API calls for installation {installation_id} due to rate limit"
+                            )
+                            stats["skipped_rate_limit"] += 1
+                            result["throttled"] = True
+                            return
 
-                    sync_result = await self._smart_sync_installation_runners(
-                        installation.installation_id, organization.login
-                    )
+                        result.update(
+                            await self._smart_sync_installation_runners(
+                                installation_id, login, organization_id
+                            )
+                        )
 
                     stats["installations_synced"] += 1
-                    stats["runners_updated"] += sync_result.get("runners_updated", 0)
-                    stats["api_calls_made"] += sync_result.get("api_calls", 0)
+                    stats["runners_updated"] += result["runners_updated"]
+                    stats["api_calls_made"] += result["api_calls"]
 
                 except Exception as e:
-                    logger.error(
-                        f"Error syncing installation {installation.installation_id}: {e}"
-                    )
-                    continue
+                    result["failed"] = True
+                    logger.error(f"Error syncing installation {installation_id}: {e}")
+
+            await asyncio.gather(
+                *(
+                    sync_installation(installation_id, organization_id, login)
+                    for installation_id, organization_id, login in installations
+                )
+            )
 
             logger.info(f"Smart sync completed: {stats}")
-            return stats
+            return stats, results
 
         except Exception as e:
             logger.error(f"Error in smart_sync_runners: {e}")
-            return stats
-
-    def _should_throttle_api_calls(self) -> bool:
-        """Check if we should throttle API calls due to rate limiting."""
-        now = datetime.utcnow()
-
-        if now > self.api_reset_time:
-            self.api_call_count = 0
-            self.api_reset_time = now + timedelta(hours=1)
+            return stats, results
 
-        return self.api_call_count >= self.max_api_calls_per_hour * 0.8  # 80% threshold
+        finally:
+            runner_sync_cycle_seconds.observe(time.monotonic() - started)
 
-    async def _should_sync_inactive_installation(self, installation_id: int) -> bool:
-        """Check if an inactive installation should be synced."""
-        if not self.redis_client:
-            return True
-
-        try:
-            last_sync_key = f"last_inactive_sync:installation:{installation_id}"
-            last_sync = self.redis_client.get(last_sync_key)
-
-            if not last_sync:
-                self.redis_client.setex(
-                    last_sync_key, 1800, datetime.utcnow().isoformat()
-                )  # 30 min
-                return True
-
-            last_sync_time = datetime.fromisoformat(last_sync.decode())
-            return datetime.utcnow() - last_sync_time > timedelta(minutes=30)
-
-        except Exception as e:
-            logger.debug(f"Error checking inactive sync: {e}")
-            return True
+    def _should_throttle_api_calls(self, installation_id: int) -> bool:
+        """Check if we should throttle API calls due to rate limiting."""
+        return self.api_budget.exhausted(installation_id)
 
     async def _smart_sync_installation_runners(
-        self, installation_id: int, organization_name: str
+        self,
+        installation_id: int,
+        organization_name: str,
+        organization_id: Optional[str] = None,
     ) -> Dict[str, int]:
         """
         Smart sync for a single installation that minimizes API calls.
+
+        Runners that changed are published to the organization over SSE. How often
+        this runs is decided by the installation's schedule in `SmartRunnerScheduler`.
         """
-        result = {"runners_updated": 0, "api_calls": 0}
+        result = {"runners_updated": 0, "api_calls": 0, "failed": False}
 
         try:
-            cached_runners = await self._get_cached_runners(installation_id)
-            if cached_runners and await self._is_cache_valid(installation_id):
-                logger.debug(
-                    f"Using cached runner data for installation {installation_id}"
-                )
-                return result
-
             runners_data = await self.github_service.get_organization_runners(
                 organization_name=organization_name, installation_id=installation_id
             )
-            result["api_calls"] = 1
-            self.api_call_count += 1
+            # One call per page of 100 runners
+            result["api_calls"] = max(1, -(-len(runners_data) // 100))
+            self.api_budget.spend(installation_id, result["api_calls"])
 
-            updated_count = await self._update_runners(installation_id, runners_data)
-            result["runners_updated"] = updated_count
+            changes = await self._update_runners(installation_id, runners_data)
+            result["runners_updated"] = len(changes)
 
-            await self._cache_runners(installation_id, runners_data)
+            if changes and organization_id:
+                self._publish_runner_changes(organization_id, changes)
 
             logger.info(
                 f"Smart sync completed for installation {installation_id}: {result}"
             )
 
         except Exception as e:
+            result["failed"] = True
             logger.error(f"Error in smart sync for installation {installation_id}: {e}")
 
         return result
 
-    async def _get_cached_runners(self, installation_id: int) -> Optional[List[Dict]]:
-        """Get cached runner data."""
-        if not self.redis_client:
-            return None
+    async def _update_runners(
+        self, installation_id: int, runners_data: List[Dict]
+    ) -> List[Dict]:
+        """
+        Reconcile the stored runners of an installation with the list from GitHub.
+
+        The fetched runners are upserted in batches with one `INSERT ... ON CONFLICT
+        DO UPDATE` each, which only touches rows whose fields actually differ. A
+        single `UPDATE` then marks runners that disappeared as offline. Both return
+        the rows they changed, so unchanged runners never leave the database.
+
+        Returns:
+            List[Dict]: The changed runners, each with a `change` of "created",
+            "updated" or "offline".
+        """
+        if not runners_data:
+            return []
+
+        now = datetime.utcnow()
+        # ON CONFLICT can't update the same row twice in one statement
+        rows = {
+            str(runner["id"]): {
+                "installation_id": installation_id,
+                "runner_id": str(runner["id"]),
+                "name": runner["name"],
+                "os": runner.get("os"),
+                "status": runner.get("status"),
+                "busy": bool(runner.get("busy", False)),
+                "labels": runner.get("labels", []),
+                "label_names": label_names(runner.get("labels")),
+                "ephemeral": bool(runner.get("ephemeral", False)),
+                "architecture": runner.get("architecture"),
+                "last_seen": now,
+                "last_check": now,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for runner in runners_data
+        }
+        rows = list(rows.values())
+
+        returned_columns = (
+            Runner.runner_id,
+            Runner.name,
+            Runner.status,
+            Runner.busy,
+            Runner.labels,
+        )
 
         try:
-            cache_key = self._get_cache_key(installation_id)
-            cached_data = self.redis_client.get(cache_key)
-            if cached_data:
-                return json.loads(cached_data)
+            changes = []
+
+            for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+                stmt = insert(Runner).values(rows[start : start + UPSERT_BATCH_SIZE])
+                excluded = stmt.excluded
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Runner.runner_id],
+                    set_={
+                        "installation_id": excluded.installation_id,
+                        "name": excluded.name,
+                        "os": excluded.os,
+                        "status": excluded.status,
+                        "busy": excluded.busy,
+                        "labels": excluded.labels,
+                        "label_names": excluded.label_names,
+                        "last_check": excluded.last_check,
+                        "updated_at": excluded.updated_at,
+                        "last_seen": case(
+                            (
+                                excluded.status.in_(["online", "busy"]),
+                                excluded.last_seen,
+                            ),
+                            else_=Runner.last_seen,
+                        ),
+                    },
+                    where=or_(
+                        Runner.installation_id.is_distinct_from(
+                            excluded.installation_id
+                        ),
+                        Runner.name.is_distinct_from(excluded.name),
+                        Runner.os.is_distinct_from(excluded.os),
+                        Runner.status.is_distinct_from(excluded.status),
+                        Runner.busy.is_distinct_from(excluded.busy),
+                        Runner.labels.is_distinct_from(excluded.labels),
+                        # Also fills in label names of rows stored before they existed
+                        Runner.label_names.is_distinct_from(excluded.label_names),
+                    ),
+                ).returning(
+                    *returned_columns,
+                    # xmax is 0 for rows inserted by this statement
+                    literal_column("xmax = 0").label("created"),
+                )
+
+                for row in self.db.execute(stmt):
+                    changes.append(
+                        {
+                            **_runner_change(row),
+                            "change": "created" if row.created else "updated",
+                        }
+                    )
+
+            seen_runner_ids = bindparam(
+                "seen_runner_ids", [row["runner_id"] for row in rows], ARRAY(String)
+            )
+            disappeared = self.db.execute(
+                update(Runner)
+                .where(
+                    Runner.installation_id == installation_id,
+                    Runner.status != "offline",
+                    Runner.runner_id != all_(seen_runner_ids),
+                )
+                .values(status="offline", busy=False, last_check=now, updated_at=now)
+                .returning(*returned_columns)
+            )
+            changes.extend(
+                {**_runner_change(row), "change": "offline"} for row in disappeared
+            )
+
+            # Changes that don't touch the state (a rename) add a harmless repeat
+            record_state_changes(self.db, installation_id, changes, now)
+
+            self.db.commit()
+
+            # Ephemeral runners reuse names, so the name now means the new record
+            for change in changes:
+                if change["change"] == "created":
+                    forget_runner_id(installation_id, runner_name=change["name"])
+
+            return changes
+
         except Exception as e:
-            logger.debug(f"Cache read error: {e}")
+            self.db.rollback()
+            logger.error(f"Error updating runners efficiently: {e}")
+            return []
+
+    def _publish_runner_changes(self, organization_id: str, changes: List[Dict]):
+        """Queue changed runners for the organization's SSE clients."""
+        runner_event_coalescer.add(
+            organization_id,
+            [
+                # Clients only need the new state of runners that went away
+                (
+                    {key: change[key] for key in OFFLINE_CHANGE_FIELDS}
+                    if change["change"] == "offline"
+                    else change
+                )
+                for change in changes
+            ],
+        )
+
+
+# Fields sent for runners the sync found missing from GitHub
+OFFLINE_CHANGE_FIELDS = ("runner_id", "status", "busy", "change")
+
+
+def _runner_change(row) -> Dict:
+    return {
+        "runner_id": row.runner_id,
+        "name": row.name,
+        "status": row.status,
+        "busy": row.busy,
+        "labels": row.labels,
+    }
 
+
+def _runner_diff(previous: Optional[Dict], current: Dict) -> Optional[Dict]:
+    """
+    Return the fields of a runner that differ from a previous `_runner_change`.
+
+    Labels count as changed only when their names do, since webhooks carry plain
+    label names where the runners API has label objects.
+
+    Returns:
+        Optional[Dict]: The runner ID, the changed fields and the `change`, or None
+        if nothing visible changed.
+    """
+    if previous is None:
+        return {**current, "change": "created"}
+
+    diff = {
+        field: value
+        for field, value in current.items()
+        if field not in ("runner_id", "labels") and value != previous[field]
+    }
+    if label_names(current["labels"]) != label_names(previous["labels"]):
+        diff["labels"] = current["labels"]
+    if not diff:
         return None
+    return {"runner_id": current["runner_id"], **diff, "change": "updated"}
 
-    async def _is_cache_valid(self, installation_id: int) -> bool:
-        """Check if cached data is still valid."""
-        if not self.redis_client:
-            return False
 
-        try:
-            cache_key = self._get_cache_key(installation_id)
-            ttl = self.redis_client.ttl(cache_key)
-            return ttl > 0
-        except Exception as e:
-            logger.debug(f"Cache validation error: {e}")
-            return False
+class RunnerEventCoalescer:
+    """
+    Batches runner changes into one `runners_updated` SSE event per organization.
 
-    async def _cache_runners(self, installation_id: int, runners_data: List[Dict]):
-        """Cache runner data with appropriate TTL."""
-        if not self.redis_client:
-            return
+    The first change for an organization starts a `window` second timer; changes
+    arriving meanwhile are merged by runner, so a runner that flips busy and idle
+    again within the window is sent once with its latest state.
+    """
 
-        try:
-            cache_key = self._get_cache_key(installation_id)
+    def __init__(self, window: float = 1.0):
+        self.window = window
+        self._pending: Dict[str, Dict[str, Dict]] = {}
+        self._flushes: Dict[str, asyncio.Task] = {}
 
-            ttl = (
-                self.active_runner_ttl
-                if await self._is_installation_active(installation_id)
-                else self.inactive_runner_ttl
-            )
+    def add(self, organization_id: str, changes: List[Dict]):
+        """
+        Queue runner changes for an organization.
 
-            self.redis_client.setex(
-                cache_key, ttl, json.dumps(runners_data, default=str)
+        Args:
+            organization_id (str): The organization the runners belong to.
+            changes (List[Dict]): Changes with at least `runner_id` and `change`.
+        """
+        pending = self._pending.setdefault(organization_id, {})
+        for change in changes:
+            runner_id = str(change["runner_id"])
+            queued = pending.get(runner_id)
+            if queued is None:
+                pending[runner_id] = dict(change)
+                continue
+            created = queued["change"] == "created"
+            queued.update(change)
+            # Clients haven't seen a runner created earlier in the window
+            if created:
+                queued["change"] = "created"
+
+        if organization_id not in self._flushes:
+            self._flushes[organization_id] = asyncio.create_task(
+                self._flush_later(organization_id)
             )
-        except Exception as e:
-            logger.debug(f"Cache write error: {e}")
 
-    async def _update_runners(
-        self, installation_id: int, runners_data: List[Dict]
-    ) -> int:
-        """Efficiently update runners with minimal database operations."""
-        if not runners_data:
-            return 0
+    async def flush(self, organization_id: str):
+        """Broadcast the queued changes of an organization right away."""
+        from app.api.endpoints.sse import broadcast_event
 
+        changes = self._pending.pop(organization_id, None)
+        if not changes:
+            return
         try:
-            existing_runners = (
-                self.db.query(Runner)
-                .filter(Runner.installation_id == installation_id)
-                .all()
+            await broadcast_event(
+                organization_id, "runners_updated", {"runners": list(changes.values())}
             )
+        except Exception as e:
+            logger.debug(f"Failed to broadcast runner changes: {e}")
 
-            existing_runner_map = {r.runner_id: r for r in existing_runners}
-            processed_runner_ids = set()
-            updated_count = 0
-
-            for runner in runners_data:
-                runner_id = str(runner["id"])
-                processed_runner_ids.add(runner_id)
-
-                if runner_id in existing_runner_map:
-                    existing_runner = existing_runner_map[runner_id]
-                    changes_made = False
-
-                    if existing_runner.name != runner["name"]:
-                        existing_runner.name = runner["name"]
-                        changes_made = True
-
-                    if existing_runner.status != runner.get("status"):
-                        existing_runner.status = runner.get("status")
-                        changes_made = True
-
-                    new_busy_value = bool(runner.get("busy", False))
-                    if existing_runner.busy != new_busy_value:
-                        existing_runner.busy = new_busy_value
-                        changes_made = True
-
-                    if changes_made:
-                        existing_runner.last_check = datetime.utcnow()
-                        if existing_runner.status in ["online", "busy"]:
-                            existing_runner.last_seen = datetime.utcnow()
-                        self.db.add(existing_runner)
-                        updated_count += 1
-
-                else:
-                    new_runner = Runner(
-                        installation_id=installation_id,
-                        runner_id=runner_id,
-                        name=runner["name"],
-                        os=runner.get("os"),
-                        status=runner.get("status"),
-                        busy=bool(runner.get("busy", False)),
-                        labels=runner.get("labels", []),
-                        ephemeral=bool(runner.get("ephemeral", False)),
-                        architecture=runner.get("architecture"),
-                        last_seen=datetime.utcnow(),
-                        last_check=datetime.utcnow(),
-                    )
-                    self.db.add(new_runner)
-                    updated_count += 1
+    async def _flush_later(self, organization_id: str):
+        await asyncio.sleep(self.window)
+        self._flushes.pop(organization_id, None)
+        await self.flush(organization_id)
 
-            for runner_id, runner in existing_runner_map.items():
-                if runner_id not in processed_runner_ids and runner.status != "offline":
-                    runner.status = "offline"
-                    runner.busy = False
-                    runner.last_check = datetime.utcnow()
-                    self.db.add(runner)
-                    updated_count += 1
 
-            self.db.commit()
-            return updated_count
+runner_event_coalescer = RunnerEventCoalescer(settings.RUNNER_EVENT_COALESCE_SECONDS)
 
-        except Exception as e:
-            self.db.rollback()
-            logger.error(f"Error updating runners efficiently: {e}")
-            return 0
+
+def runner_activity_key(installation_id: int) -> str:
+    """Redis key marking an installation as having recent job activity."""
+    return f"runner_activity:installation:{installation_id}"
+
+
+class InstallationSchedule:
+    """Polling state of one installation in the `SmartRunnerScheduler` heap."""
+
+    __slots__ = (
+        "installation_id",
+        "organization_id",
+        "login",
+        "interval",
+        "due_at",
+        "quiet_syncs",
+    )
+
+    def __init__(
+        self,
+        installation_id: int,
+        organization_id: str,
+        login: Optional[str],
+        interval: float,
+        due_at: float,
+    ):
+        self.installation_id = installation_id
+        self.organization_id = organization_id
+        self.login = login
+        self.interval = interval
+        self.due_at = due_at
+        self.quiet_syncs = 0
 
 
 class SmartRunnerScheduler:
     """
-    Replacement for the current RunnerSyncScheduler with intelligent scheduling.
+    Polls each installation's runners on its own adaptive schedule.
+
+    Schedules are kept in a heap ordered by due time, and the loop sleeps until
+    the next one is due. An installation polls faster after syncs that found
+    changes and while it has recent job webhooks, and slower after several quiet
+    syncs, up to `inactive_interval` for installations without recent activity.
+
+    Only the worker elected leader runs the sync loop (see `runner_scheduler_election`).
     """
 
+    LAST_SYNC_KEY = "runner_scheduler:last_sync"
+
+    # Seconds a job webhook keeps an installation polling at `active_interval`
+    ACTIVITY_TTL = 3600
+
+    # Seconds between reloads of the installation list
+    INSTALLATION_REFRESH_INTERVAL = 60
+
+    # Seconds between downsampling passes of runner utilization
+    ROLLUP_INTERVAL = 60
+
     def __init__(self, redis_client=None):
         self.running = False
         self.redis_client = redis_client
-
-        # Dynamic intervals based on activity
-        self.min_interval = 30  # 30 seconds for very active installations
-        self.max_interval = 300  # 5 minutes for inactive installations
-        self.current_interval = 60  # Start with 1 minute
+        self.last_sync: Optional[Dict] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_prune: Optional[float] = None
+        self._last_rollup: Optional[float] = None
+
+        # Per-installation intervals adapt between these bounds
+        self.min_interval = 30  # 30 seconds right after changes
+        self.active_interval = 60  # Upper bound while jobs are running
+        self.max_interval = 300  # Upper bound for installations with recent jobs
+        self.inactive_interval = 1800  # Upper bound without recent jobs
+        self.initial_interval = 60
+
+        self.schedules: Dict[int, InstallationSchedule] = {}
+        self._heap: List[Tuple[float, int]] = []
+        self._next_refresh = 0.0
+        self._wake = asyncio.Event()
+        # Job activity by installation, used instead of Redis when it is unavailable
+        self._activity: Dict[int, float] = {}
 
     async def start(self):
         """Start the smart scheduler."""
@@ -472,74 +834,293 @@ class SmartRunnerScheduler:
             return
 
         self.running = True
-        asyncio.create_task(self._run_smart_sync_loop())
+        self.schedules.clear()
+        self._heap.clear()
+        self._next_refresh = 0.0
+        # Scheduled syncs are background work and are shed while GitHub is failing
+        with background_requests():
+            self._task = asyncio.create_task(self._run_smart_sync_loop())
         logger.info("Smart runner scheduler started")
 
     async def stop(self):
-        """Stop the scheduler."""
+        """Stop the scheduler, interrupting a sync in progress."""
         self.running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
         logger.info("Smart runner scheduler stopped")
 
-    async def _run_smart_sync_loop(self):
-        """Intelligent sync loop that adapts to activity."""
-        consecutive_no_updates = 0
+    async def record_activity(self, installation_id: int):
+        """
+        Note job activity on an installation, so its runners are polled sooner.
+
+        The mark is shared through Redis with the leader, which caps the
+        installation's interval at `active_interval` when it next reschedules it.
+        On the leader itself the installation is also pulled forward right away.
+        """
+        if self.redis_client:
+            try:
+                await self.redis_client.setex(
+                    runner_activity_key(installation_id),
+                    self.ACTIVITY_TTL,
+                    datetime.utcnow().isoformat(),
+                )
+            except Exception as e:
+                logger.debug(f"Failed to mark installation active: {e}")
+        else:
+            self._activity[installation_id] = time.monotonic()
+
+        schedule = self.schedules.get(installation_id)
+        if self.running and schedule:
+            due_at = time.monotonic() + self.min_interval
+            if due_at < schedule.due_at:
+                schedule.interval = min(schedule.interval, self.active_interval)
+                self._push(schedule, due_at)
+                self._wake.set()
+
+    async def get_last_sync(self) -> Optional[Dict]:
+        """Return the stats of the latest sync, run by whichever worker was leader."""
+        if self.redis_client:
+            try:
+                cached = await self.redis_client.get(self.LAST_SYNC_KEY)
+                if cached:
+                    return json.loads(cached)
+            except Exception as e:
+                logger.debug(f"Failed to read last runner sync: {e}")
+
+        return self.last_sync
+
+    async def _record_sync(self, stats: Dict, started: float):
+        intervals = sorted(schedule.interval for schedule in self.schedules.values())
+        self.last_sync = {
+            "finished_at": datetime.utcnow().isoformat(),
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "next_sync_in_seconds": (
+                round(max(self._heap[0][0] - time.monotonic(), 0), 1)
+                if self._heap
+                else None
+            ),
+            "installations_scheduled": len(intervals),
+            "median_interval_seconds": (
+                round(intervals[len(intervals) // 2], 1) if intervals else None
+            ),
+            "worker": runner_scheduler_election.identity,
+            "stats": stats,
+        }
+
+        if not self.redis_client:
+            return
+
+        try:
+            await self.redis_client.set(
+                self.LAST_SYNC_KEY, json.dumps(self.last_sync), ex=24 * 3600
+            )
+        except Exception as e:
+            logger.debug(f"Failed to publish last runner sync: {e}")
+
+    def _roll_up_utilization(self):
+        """Downsample runner state events, in a thread as catching up can take a while."""
+        db = SessionLocal()
+        try:
+            buckets = run_rollups(db)
+            logger.debug(f"Rolled up {buckets} runner utilization buckets")
+
+            if (
+                self._last_prune is None
+                or time.monotonic() - self._last_prune >= PRUNE_INTERVAL
+            ):
+                pruned = prune_runner_history(db)
+                self._last_prune = time.monotonic()
+                logger.info(f"Pruned runner utilization history: {pruned}")
+        except Exception as e:
+            logger.error(f"Error rolling up runner utilization: {e}")
+        finally:
+            db.close()
+
+    def _push(self, schedule: InstallationSchedule, due_at: float):
+        # Earlier heap entries of the installation become stale and are skipped
+        schedule.due_at = due_at
+        heapq.heappush(self._heap, (due_at, schedule.installation_id))
+
+    def _pop_due(self, now: float) -> List[InstallationSchedule]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, installation_id = heapq.heappop(self._heap)
+            schedule = self.schedules.get(installation_id)
+            if schedule and schedule.due_at == due_at:
+                due.append(schedule)
+        return due
+
+    def _refresh_installations(self, runner_service: RunnerService, now: float):
+        """Add schedules for new installations and drop removed ones."""
+        installations = runner_service.get_installations()
+        seen = set()
+        for installation_id, organization_id, login in installations:
+            seen.add(installation_id)
+            schedule = self.schedules.get(installation_id)
+            if schedule:
+                schedule.organization_id, schedule.login = organization_id, login
+                continue
+
+            schedule = InstallationSchedule(
+                installation_id, organization_id, login, self.initial_interval, now
+            )
+            self.schedules[installation_id] = schedule
+            # Spread first syncs of a large fleet over the initial interval
+            self._push(schedule, now + len(seen) % self.initial_interval)
+
+        for installation_id in set(self.schedules) - seen:
+            del self.schedules[installation_id]
+
+    async def _active_installations(self, installation_ids: List[int]) -> set:
+        """Return which installations had job activity within `ACTIVITY_TTL`."""
+        if not self.redis_client:
+            cutoff = time.monotonic() - self.ACTIVITY_TTL
+            return {
+                installation_id
+                for installation_id in installation_ids
+                if self._activity.get(installation_id, cutoff) > cutoff
+            }
 
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for installation_id in installation_ids:
+                pipe.exists(runner_activity_key(installation_id))
+            flags = await pipe.execute()
+            return {
+                installation_id
+                for installation_id, flag in zip(installation_ids, flags)
+                if flag
+            }
+        except Exception as e:
+            logger.debug(f"Failed to check installation activity: {e}")
+            return set(installation_ids)
+
+    def _next_interval(
+        self, schedule: InstallationSchedule, result: Dict, active: bool
+    ) -> float:
+        """Adapt an installation's interval to the outcome of its latest sync."""
+        ceiling = self.max_interval if active else self.inactive_interval
+
+        if result.get("throttled"):
+            return ceiling
+        if result.get("failed"):
+            return min(schedule.interval * 1.5, ceiling)
+
+        if result.get("runners_updated"):
+            schedule.quiet_syncs = 0
+            interval = max(schedule.interval * 0.5, self.min_interval)
+        else:
+            schedule.quiet_syncs += 1
+            # Slow down only after several quiet syncs in a row
+            interval = (
+                schedule.interval * 1.5
+                if schedule.quiet_syncs >= 3
+                else schedule.interval
+            )
+
+        if active:
+            interval = min(interval, self.active_interval)
+        return min(interval, ceiling)
+
+    async def _run_smart_sync_loop(self):
+        """Sync installations as they come due, then sleep until the next one is."""
         while self.running:
             try:
+                now = time.monotonic()
                 db = SessionLocal()
                 try:
                     runner_service = RunnerService(db, self.redis_client)
-                    stats = await runner_service.smart_sync_runners()
-
-                    # Adjust interval based on activity
-                    if stats["runners_updated"] == 0:
-                        consecutive_no_updates += 1
-                        # Slow down if no updates for multiple cycles
-                        if consecutive_no_updates >= 3:
-                            self.current_interval = min(
-                                self.current_interval * 1.2, self.max_interval
-                            )
-                    else:
-                        consecutive_no_updates = 0
-                        # Speed up if there are updates
-                        self.current_interval = max(
-                            self.current_interval * 0.8, self.min_interval
+
+                    if now >= self._next_refresh:
+                        self._refresh_installations(runner_service, now)
+                        self._next_refresh = now + self.INSTALLATION_REFRESH_INTERVAL
+
+                    due = self._pop_due(now)
+                    if due:
+                        stats, results = await runner_service.smart_sync_runners(
+                            [
+                                (s.installation_id, s.organization_id, s.login)
+                                for s in due
+                            ]
+                        )
+                        active = await self._active_installations(
+                            [s.installation_id for s in due]
                         )
 
-                    logger.debug(
-                        f"Next sync in {self.current_interval} seconds. Stats: {stats}"
-                    )
+                        finished = time.monotonic()
+                        for schedule in due:
+                            schedule.interval = self._next_interval(
+                                schedule,
+                                results.get(schedule.installation_id, {}),
+                                schedule.installation_id in active,
+                            )
+                            self._push(schedule, finished + schedule.interval)
+
+                        logger.debug(f"Synced {len(due)} due installations: {stats}")
+                        await self._record_sync(stats, now)
 
                 finally:
                     db.close()
 
+                if (
+                    self._last_rollup is None
+                    or time.monotonic() - self._last_rollup >= self.ROLLUP_INTERVAL
+                ):
+                    self._last_rollup = time.monotonic()
+                    await asyncio.to_thread(self._roll_up_utilization)
+
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error in smart sync loop: {e}")
-                # Back off on errors
-                self.current_interval = min(
-                    self.current_interval * 1.5, self.max_interval
-                )
 
-            await asyncio.sleep(self.current_interval)
+            await self._sleep_until_due()
+
+    async def _sleep_until_due(self):
+        now = time.monotonic()
+        wake_at = self._next_refresh
+        if self._heap:
+            wake_at = min(wake_at, self._heap[0][0])
+
+        self._wake.clear()
+        try:
+            # Job activity on the leader can pull an installation forward
+            await asyncio.wait_for(self._wake.wait(), timeout=max(wake_at - now, 0.1))
+        except asyncio.TimeoutError:
+            pass
 
 
 # Create singleton instance (optional Redis integration)
-try:
-
-    redis_client = redis.Redis(
-        host=settings.REDIS_HOST,
-        port=int(settings.REDIS_PORT),
-        db=settings.REDIS_DB,
-        password=settings.REDIS_PASSWORD,
-        decode_responses=True,
-    )
-    # Test connection
-    redis_client.ping()
-    logger.info(
-        f"Redis connection established at {settings.REDIS_HOST}:{settings.REDIS_PORT} for runner caching"
-    )
-except Exception as e:
-    redis_client = None
-    logger.info(f"Running without Redis caching: {e}")
+smart_runner_scheduler = SmartRunnerScheduler(get_redis())
 
-smart_runner_scheduler = SmartRunnerScheduler(redis_client)
+# Every worker campaigns, only the leader runs the scheduler
+runner_scheduler_election = LeaderElection(
+    "runner-scheduler",
+    get_redis(),
+    ttl=settings.RUNNER_SCHEDULER_LEASE_TTL,
+    on_elected=smart_runner_scheduler.start,
+    on_revoked=smart_runner_scheduler.stop,
+)
+
+
+def configure_runner_scheduler(redis_available: bool):
+    """
+    Report a scheduler that can't be elected yet because Redis is unreachable.
+
+    The election keeps its Redis client regardless: dropping it would make every
+    worker leader. Instead no worker leads until Redis answers and one of them
+    acquires the lease.
+
+    Args:
+        redis_available (bool): Whether the shared Redis client answered a PING.
+    """
+    if not redis_available and runner_scheduler_election.redis:
+        logger.warning(
+            "Redis is unreachable, so the runner scheduler stays idle until a "
+            "worker acquires the leader lease"
+        )
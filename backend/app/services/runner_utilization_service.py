@@ -0,0 +1,507 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.runner import (
+    RunnerRollupState,
+    RunnerStateEvent,
+    RunnerUtilizationRollup,
+)
+from app.utils.labels import label_pool_key
+
+logger = logging.getLogger(__name__)
+
+MINUTE = timedelta(minutes=1)
+
+# Bucket size of each rollup resolution, and the date_trunc unit that produces it
+RESOLUTIONS = {
+    "1m": (timedelta(minutes=1), "minute"),
+    "1h": (timedelta(hours=1), "hour"),
+    "1d": (timedelta(days=1), "day"),
+}
+
+# Leave the current minute open so events still being recorded land in it
+ROLLUP_DELAY = timedelta(minutes=1)
+
+# The last 1-minute bucket of every rollup pass is marked with an empty pool
+# under this installation id, so the next pass knows where to pick up
+WATERMARK_INSTALLATION_ID = 0
+
+# Bound the work of one rollup pass after downtime; later passes catch up
+MAX_CATCH_UP = timedelta(hours=6)
+
+
+def runner_state(status: Optional[str], busy: Optional[bool]) -> str:
+    """Collapse a runner's status and busy flag into "busy", "idle" or "offline"."""
+    if status == "offline":
+        return "offline"
+    return "busy" if busy else "idle"
+
+
+def record_state_changes(
+    db: Session,
+    installation_id: int,
+    changes: Iterable[Dict],
+    recorded_at: Optional[datetime] = None,
+) -> int:
+    """
+    Append one state event per changed runner, without committing.
+
+    Args:
+        db (Session): The database session.
+        installation_id (int): The installation the runners belong to.
+        changes (Iterable[Dict]): Runners with `runner_id`, `status`, `busy` and
+            `labels`, as returned by `RunnerService._update_runners`.
+        recorded_at (Optional[datetime]): When the states were entered, now by default.
+
+    Returns:
+        int: The number of events recorded.
+    """
+    recorded_at = recorded_at or datetime.utcnow()
+    rows = [
+        {
+            "installation_id": installation_id,
+            "runner_id": str(change["runner_id"]),
+            "pool": label_pool_key(change.get("labels")),
+            "state": runner_state(change.get("status"), change.get("busy")),
+            "recorded_at": recorded_at,
+        }
+        for change in changes
+    ]
+    if rows:
+        db.execute(insert(RunnerStateEvent), rows)
+    return len(rows)
+
+
+def floor_time(moment: datetime, size: timedelta) -> datetime:
+    """Round a naive UTC datetime down to a multiple of `size` since the epoch."""
+    epoch = datetime(1970, 1, 1)
+    return moment - (moment - epoch) % size
+
+
+def integrate_states(
+    initial: Iterable[Tuple],
+    events: Iterable[Tuple],
+    start: datetime,
+    end: datetime,
+) -> Dict[Tuple, Dict]:
+    """
+    Turn runner state events into per-minute busy and idle seconds for each pool.
+
+    Each runner holds a state from one of its events until the next, so its time
+    in the window is split at event boundaries and then at minute boundaries.
+    Offline time is not counted.
+
+    Args:
+        initial (Iterable[Tuple]): `(installation_id, runner_id, pool, state)` of
+            each runner's last event before `start`.
+        events (Iterable[Tuple]): `(installation_id, runner_id, pool, state,
+            recorded_at)` in the window, ordered by `recorded_at`.
+        start (datetime): Start of the window, on a minute boundary.
+        end (datetime): End of the window, on a minute boundary.
+
+    Returns:
+        Dict[Tuple, Dict]: `(installation_id, pool, minute)` to `busy_seconds`,
+        `idle_seconds` and the set of `runners` online during the minute.
+    """
+    buckets: Dict[Tuple, Dict] = defaultdict(
+        lambda: {"busy_seconds": 0.0, "idle_seconds": 0.0, "runners": set()}
+    )
+
+    def add_segment(installation_id, runner_id, pool, state, since, until):
+        if state == "offline" or until <= since:
+            return
+        minute = floor_time(since, MINUTE)
+        while minute < until:
+            seconds = (min(until, minute + MINUTE) - max(since, minute)).total_seconds()
+            bucket = buckets[(installation_id, pool, minute)]
+            bucket[f"{state}_seconds"] += seconds
+            bucket["runners"].add(runner_id)
+            minute += MINUTE
+
+    current = {
+        runner_id: (installation_id, runner_id, pool, state, start)
+        for installation_id, runner_id, pool, state in initial
+    }
+    for installation_id, runner_id, pool, state, recorded_at in events:
+        if runner_id in current:
+            add_segment(*current[runner_id], recorded_at)
+        current[runner_id] = (installation_id, runner_id, pool, state, recorded_at)
+
+    for segment in current.values():
+        add_segment(*segment, end)
+
+    return buckets
+
+
+def _carried_states(db: Session, before: datetime) -> Tuple[List[Tuple], bool]:
+    """
+    Return the state of every runner at the rollup watermark `before`.
+
+    The states are kept in `RunnerRollupState` by each rollup pass. Only when
+    that table is still empty, e.g. on the first pass after an upgrade, are they
+    looked up in the event history.
+
+    Returns:
+        Tuple[List[Tuple], bool]: `(installation_id, runner_id, pool, state,
+        recorded_at)` rows, and whether they came from the event history.
+    """
+    rows = db.execute(
+        select(
+            RunnerRollupState.installation_id,
+            RunnerRollupState.runner_id,
+            RunnerRollupState.pool,
+            RunnerRollupState.state,
+            RunnerRollupState.recorded_at,
+        )
+    ).all()
+    if rows:
+        return [tuple(row) for row in rows], False
+    return _latest_states(db, before), True
+
+
+def _latest_states(db: Session, before: datetime) -> List[Tuple]:
+    """Return the last state event of every runner recorded before a time."""
+    latest = (
+        select(
+            RunnerStateEvent.runner_id,
+            func.max(RunnerStateEvent.recorded_at).label("recorded_at"),
+        )
+        .where(RunnerStateEvent.recorded_at < before)
+        .group_by(RunnerStateEvent.runner_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            RunnerStateEvent.installation_id,
+            RunnerStateEvent.runner_id,
+            RunnerStateEvent.pool,
+            RunnerStateEvent.state,
+            RunnerStateEvent.recorded_at,
+        )
+        .join(
+            latest,
+            and_(
+                RunnerStateEvent.runner_id == latest.c.runner_id,
+                RunnerStateEvent.recorded_at == latest.c.recorded_at,
+            ),
+        )
+        .order_by(RunnerStateEvent.id)
+    )
+    # Later ids win when a runner has several events at the same instant
+    return list({row.runner_id: tuple(row) for row in rows}.values())
+
+
+def _save_carried_states(db: Session, states: Iterable[Tuple]):
+    """Upsert `(installation_id, runner_id, pool, state, recorded_at)` rows."""
+    rows = [
+        {
+            "installation_id": installation_id,
+            "runner_id": runner_id,
+            "pool": pool,
+            "state": state,
+            "recorded_at": recorded_at,
+        }
+        for installation_id, runner_id, pool, state, recorded_at in states
+    ]
+    for offset in range(0, len(rows), 1000):
+        stmt = pg_insert(RunnerRollupState).values(rows[offset : offset + 1000])
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[RunnerRollupState.runner_id],
+                set_={
+                    "installation_id": stmt.excluded.installation_id,
+                    "pool": stmt.excluded.pool,
+                    "state": stmt.excluded.state,
+                    "recorded_at": stmt.excluded.recorded_at,
+                },
+            )
+        )
+
+
+def _reaggregate(db: Session, source: str, target: str, since: datetime):
+    """Rebuild the `target` rollups from `source` rollups starting at `since`."""
+    unit = RESOLUTIONS[target][1]
+    bucket_start = func.date_trunc(unit, RunnerUtilizationRollup.bucket_start)
+    rollups = RunnerUtilizationRollup.__table__
+
+    aggregated = (
+        select(
+            RunnerUtilizationRollup.installation_id,
+            RunnerUtilizationRollup.pool,
+            literal(target).label("resolution"),
+            bucket_start.label("bucket_start"),
+            func.sum(RunnerUtilizationRollup.busy_seconds),
+            func.sum(RunnerUtilizationRollup.idle_seconds),
+            func.max(RunnerUtilizationRollup.max_runners),
+        )
+        .where(
+            RunnerUtilizationRollup.resolution == source,
+            RunnerUtilizationRollup.bucket_start >= since,
+        )
+        .group_by(
+            RunnerUtilizationRollup.installation_id,
+            RunnerUtilizationRollup.pool,
+            bucket_start,
+        )
+    )
+    stmt = pg_insert(rollups).from_select(
+        [
+            "installation_id",
+            "pool",
+            "resolution",
+            "bucket_start",
+            "busy_seconds",
+            "idle_seconds",
+            "max_runners",
+        ],
+        aggregated,
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            constraint="unique_runner_utilization_bucket",
+            set_={
+                "busy_seconds": stmt.excluded.busy_seconds,
+                "idle_seconds": stmt.excluded.idle_seconds,
+                "max_runners": stmt.excluded.max_runners,
+            },
+        )
+    )
+
+
+def run_rollups(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Downsample new state events into 1-minute, 1-hour and 1-day rollups.
+
+    Picks up after the previous pass's watermark, integrates the events of the
+    complete minutes since then, and re-aggregates the hours and days those
+    minutes belong to. Commits on success.
+
+    Args:
+        db (Session): The database session.
+        now (Optional[datetime]): The current time, for backfills and tests.
+
+    Returns:
+        int: The number of 1-minute buckets written.
+    """
+    now = now or datetime.utcnow()
+    end = floor_time(now - ROLLUP_DELAY, MINUTE)
+
+    # Only the marker rows, so the unique index answers this without a scan
+    watermark = (
+        db.query(func.max(RunnerUtilizationRollup.bucket_start))
+        .filter(
+            RunnerUtilizationRollup.installation_id == WATERMARK_INSTALLATION_ID,
+            RunnerUtilizationRollup.resolution == "1m",
+            RunnerUtilizationRollup.pool == "",
+        )
+        .scalar()
+    )
+    start = watermark + MINUTE if watermark else None
+
+    initial, from_history = _carried_states(db, start) if start else ([], False)
+    if not any(row[3] != "offline" for row in initial):
+        # Nothing was online at the watermark, so skip ahead to the next event
+        next_event = db.query(func.min(RunnerStateEvent.recorded_at))
+        if start:
+            next_event = next_event.filter(RunnerStateEvent.recorded_at >= start)
+        next_event = next_event.scalar()
+        if next_event is None:
+            return 0
+        start = max(start or next_event, floor_time(next_event, MINUTE))
+
+    end = min(end, start + MAX_CATCH_UP)
+    if start >= end:
+        return 0
+
+    events = db.execute(
+        select(
+            RunnerStateEvent.installation_id,
+            RunnerStateEvent.runner_id,
+            RunnerStateEvent.pool,
+            RunnerStateEvent.state,
+            RunnerStateEvent.recorded_at,
+        )
+        .where(
+            RunnerStateEvent.recorded_at >= start,
+            RunnerStateEvent.recorded_at < end,
+        )
+        .order_by(RunnerStateEvent.recorded_at, RunnerStateEvent.id)
+    ).all()
+    buckets = integrate_states([row[:4] for row in initial], events, start, end)
+
+    # Each runner's state at `end`, for the next pass
+    carried = {row[1]: row for row in initial} if from_history else {}
+    for event in events:
+        carried[event.runner_id] = tuple(event)
+
+    try:
+        rows = [
+            {
+                "installation_id": installation_id,
+                "pool": pool,
+                "resolution": "1m",
+                "bucket_start": minute,
+                "busy_seconds": round(bucket["busy_seconds"], 3),
+                "idle_seconds": round(bucket["idle_seconds"], 3),
+                "max_runners": len(bucket["runners"]),
+            }
+            for (installation_id, pool, minute), bucket in buckets.items()
+        ]
+        # Marks the window as done even when nothing was online during it
+        rows.append(
+            {
+                "installation_id": WATERMARK_INSTALLATION_ID,
+                "pool": "",
+                "resolution": "1m",
+                "bucket_start": end - MINUTE,
+                "busy_seconds": 0,
+                "idle_seconds": 0,
+                "max_runners": 0,
+            }
+        )
+
+        for offset in range(0, len(rows), 1000):
+            stmt = pg_insert(RunnerUtilizationRollup).values(
+                rows[offset : offset + 1000]
+            )
+            db.execute(
+                stmt.on_conflict_do_update(
+                    constraint="unique_runner_utilization_bucket",
+                    set_={
+                        "busy_seconds": stmt.excluded.busy_seconds,
+                        "idle_seconds": stmt.excluded.idle_seconds,
+                        "max_runners": stmt.excluded.max_runners,
+                    },
+                )
+            )
+
+        _save_carried_states(db, carried.values())
+        _reaggregate(db, "1m", "1h", floor_time(start, RESOLUTIONS["1h"][0]))
+        _reaggregate(db, "1h", "1d", floor_time(start, RESOLUTIONS["1d"][0]))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return len(buckets)
+
+
+def prune_runner_history(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Delete 1-minute rollups and state events past their retention.
+
+    Hourly and daily rollups are kept. The latest event of every runner is kept
+    regardless of age, since rollups need it to know the runner's current state.
+
+    Returns:
+        Dict[str, int]: The number of `rollups` and `events` deleted.
+    """
+    now = now or datetime.utcnow()
+    rollup_cutoff = now - timedelta(
+        days=settings.RUNNER_UTILIZATION_MINUTE_RETENTION_DAYS
+    )
+    event_cutoff = now - timedelta(days=settings.RUNNER_STATE_EVENT_RETENTION_DAYS)
+
+    latest_events = select(func.max(RunnerStateEvent.id)).group_by(
+        RunnerStateEvent.runner_id
+    )
+    try:
+        rollups = db.execute(
+            delete(RunnerUtilizationRollup).where(
+                RunnerUtilizationRollup.resolution == "1m",
+                RunnerUtilizationRollup.bucket_start < rollup_cutoff,
+            )
+        ).rowcount
+        events = db.execute(
+            delete(RunnerStateEvent).where(
+                RunnerStateEvent.recorded_at < event_cutoff,
+                RunnerStateEvent.id.not_in(latest_events),
+            )
+        ).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {"rollups": rollups, "events": events}
+
+
+def pick_resolution(start: datetime, end: datetime) -> str:
+    """Choose the coarsest resolution that still gives a detailed chart."""
+    span = end - start
+    if span <= timedelta(hours=6):
+        return "1m"
+    if span <= timedelta(days=14):
+        return "1h"
+    return "1d"
+
+
+def get_utilization_series(
+    db: Session,
+    installation_id: int,
+    start: datetime,
+    end: datetime,
+    resolution: Optional[str] = None,
+    pool: Optional[str] = None,
+) -> Dict:
+    """
+    Return the utilization of each runner pool of an installation over time.
+
+    Args:
+        db (Session): The database session.
+        installation_id (int): The installation to report on.
+        start (datetime): Start of the range (inclusive).
+        end (datetime): End of the range (exclusive).
+        resolution (Optional[str]): "1m", "1h" or "1d"; picked from the range if None.
+        pool (Optional[str]): Only report this pool, as labels separated by commas.
+
+    Returns:
+        Dict: The `resolution` used and a list of `pools`, each with its `pool`
+        key and `points` ordered by `bucket_start`.
+    """
+    resolution = resolution or pick_resolution(start, end)
+    query = db.query(
+        RunnerUtilizationRollup.pool,
+        RunnerUtilizationRollup.bucket_start,
+        RunnerUtilizationRollup.busy_seconds,
+        RunnerUtilizationRollup.idle_seconds,
+        RunnerUtilizationRollup.max_runners,
+    ).filter(
+        RunnerUtilizationRollup.installation_id == installation_id,
+        RunnerUtilizationRollup.resolution == resolution,
+        RunnerUtilizationRollup.pool != "",
+        RunnerUtilizationRollup.bucket_start
+        >= floor_time(start, RESOLUTIONS[resolution][0]),
+        RunnerUtilizationRollup.bucket_start < end,
+    )
+    if pool is not None:
+        query = query.filter(
+            RunnerUtilizationRollup.pool == label_pool_key(pool.split(","))
+        )
+
+    pools: Dict[str, List[Dict]] = {}
+    for row in query.order_by(
+        RunnerUtilizationRollup.pool, RunnerUtilizationRollup.bucket_start
+    ):
+        online = row.busy_seconds + row.idle_seconds
+        pools.setdefault(row.pool, []).append(
+            {
+                "bucket_start": row.bucket_start,
+                "busy_seconds": row.busy_seconds,
+                "idle_seconds": row.idle_seconds,
+                "utilization": round(row.busy_seconds / online, 4) if online else None,
+                "max_runners": row.max_runners,
+            }
+        )
+
+    return {
+        "resolution": resolution,
+        "pools": [{"pool": key, "points": points} for key, points in pools.items()],
+    }
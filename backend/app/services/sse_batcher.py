@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from itertools import count
+from typing import Awaitable, Callable, Dict
+
+from app.services.sse_connections import event_key
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+sse_events_collapsed = registry.counter(
+    "sse_events_collapsed_total",
+    "SSE events replaced by a newer state of the same run or job before sending",
+)
+sse_batches_sent = registry.counter(
+    "sse_batches_sent_total",
+    "SSE messages sent by the event batcher, by whether they held several events",
+    ["kind"],
+)
+
+
+class SSEEventBatcher:
+    """
+    Collects the SSE events of each organization for a short window and sends
+    them as one message.
+
+    The first event for an organization starts a `window` second timer. Events
+    for a run or job already pending replace it, so a burst of deliveries for a
+    matrix run becomes one message with the latest state of each run and job. A
+    window holding several events is sent as a `batch` event with an `events`
+    list; a single event is sent as is.
+    """
+
+    def __init__(
+        self, send: Callable[[int, str, Dict], Awaitable[None]], window: float = 0.5
+    ):
+        self.send = send
+        self.window = window
+        self._pending: Dict[int, Dict[object, Dict]] = {}
+        self._flushes: Dict[int, asyncio.Task] = {}
+        self._sequence = count()
+
+    def add(self, org_id: int, event_type: str, data: Dict):
+        """
+        Queue an event for an organization's SSE clients.
+
+        Args:
+            org_id (int): The organization to send the event to.
+            event_type (str): The type of event, e.g. 'workflow_job_completed'.
+            data (Dict): The event payload.
+        """
+        event = {"type": event_type, **data}
+        key = event_key(event)
+        pending = self._pending.setdefault(org_id, {})
+        if key is not None and pending.pop(key, None) is not None:
+            sse_events_collapsed.inc()
+        pending[key if key is not None else next(self._sequence)] = event
+
+        if org_id not in self._flushes:
+            self._flushes[org_id] = asyncio.create_task(self._flush_later(org_id))
+
+    async def flush(self, org_id: int):
+        """Send the pending events of an organization right away."""
+        pending = self._pending.pop(org_id, None)
+        if not pending:
+            return
+
+        events = list(pending.values())
+        try:
+            if len(events) == 1:
+                event = dict(events[0])
+                await self.send(org_id, event.pop("type"), event)
+                sse_batches_sent.inc(kind="single")
+            else:
+                await self.send(org_id, "batch", {"events": events})
+                sse_batches_sent.inc(kind="batch")
+        except Exception as e:
+            logger.debug(f"Failed to send SSE events for org {org_id}: {e}")
+
+    async def _flush_later(self, org_id: int):
+        await asyncio.sleep(self.window)
+        self._flushes.pop(org_id, None)
+        await self.flush(org_id)
@@ -0,0 +1,312 @@
+import asyncio
+import json
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from itertools import count
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.utils.metrics import registry
+
+# Policies for a connection queue that is full
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+DISCONNECT = "disconnect"
+QUEUE_POLICIES = (DROP_OLDEST, COALESCE, DISCONNECT)
+
+sse_delivery_lag = registry.histogram(
+    "sse_delivery_lag_seconds",
+    "Time SSE messages waited in a connection queue before being sent",
+    buckets=(0.001, 0.01, 0.1, 0.5, 1, 5, 15, 30, 60),
+)
+sse_messages_dropped = registry.counter(
+    "sse_messages_dropped_total",
+    "SSE messages dropped from full connection queues",
+    ["policy"],
+)
+sse_messages_coalesced = registry.counter(
+    "sse_messages_coalesced_total",
+    "Queued SSE messages replaced by a newer state of the same run or job",
+)
+sse_slow_consumers_disconnected = registry.counter(
+    "sse_slow_consumers_disconnected_total",
+    "SSE connections closed because their queue was full",
+)
+sse_queue_lag_max = registry.gauge(
+    "sse_queue_lag_max_seconds",
+    "Age of the oldest message queued for any SSE connection of this worker",
+)
+sse_worker_connections = registry.gauge(
+    "sse_worker_connections",
+    "SSE connections open on this worker",
+)
+sse_connections_backlogged = registry.gauge(
+    "sse_connections_backlogged",
+    "SSE connections of this worker with a queue at least half full",
+)
+
+
+class SlowConsumerError(Exception):
+    """Raised to a stream whose queue overflowed under the disconnect policy."""
+
+
+def event_key(event: Dict) -> Optional[str]:
+    """
+    Return the key under which an SSE event replaces older ones when coalescing.
+
+    Job events are keyed by job and run events by run, since each carries the
+    latest state. Other events have no key and are never replaced.
+
+    Args:
+        event (Dict): The event payload, including its `type`.
+    """
+    event_type = event.get("type") or ""
+    if event_type.startswith("workflow_job_") and event.get("job_id"):
+        return f"job:{event['job_id']}"
+    if event_type.startswith("workflow_run_") and event.get("run_id"):
+        return f"run:{event['run_id']}"
+    return None
+
+
+def message_key(message: str) -> Optional[str]:
+    """Return the `event_key` of an SSE-formatted message."""
+    try:
+        data = json.loads(message[message.index("data: ") + len("data: ") :])
+    except (ValueError, TypeError):
+        return None
+    return event_key(data) if isinstance(data, dict) else None
+
+
+class ConnectionQueue:
+    """
+    Bounded message queue of one SSE connection.
+
+    Putting never blocks the broadcaster. When the queue is full, `policy`
+    decides what happens: `drop_oldest` discards the oldest message,
+    `coalesce` also replaces queued run and job events with newer states of the
+    same run or job as they arrive, and `disconnect` closes the connection so
+    the browser reconnects and refetches.
+    """
+
+    __slots__ = (
+        "maxsize",
+        "policy",
+        "dropped",
+        "coalesced",
+        "closed",
+        "_messages",
+        "_waiter",
+        "_held",
+    )
+
+    _sequence = count()
+
+    def __init__(self, maxsize: int, policy: str):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown SSE queue policy {policy!r}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        # Keyed by coalescing key, or a unique number for other messages
+        self._messages: "OrderedDict[object, Tuple[float, str]]" = OrderedDict()
+        self._waiter: Optional[asyncio.Future] = None
+        self._held: Optional[List[Tuple[str, Optional[str]]]] = None
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def put(self, message: str, key: Optional[str] = None):
+        """
+        Queue a message, applying the overflow policy if the queue is full.
+
+        Args:
+            message (str): The SSE-formatted message.
+            key (Optional[str]): The message's `message_key`, used by `coalesce`.
+        """
+        if self.closed:
+            return
+        if self._held is not None:
+            self._held.append((message, key))
+            return
+
+        if self.policy != COALESCE:
+            key = None
+        if key is not None and key in self._messages:
+            del self._messages[key]
+            self.coalesced += 1
+            sse_messages_coalesced.inc()
+        elif len(self._messages) >= self.maxsize:
+            if self.policy == DISCONNECT:
+                self.closed = True
+                sse_slow_consumers_disconnected.inc()
+                self._wake()
+                return
+            self._messages.popitem(last=False)
+            self.dropped += 1
+            sse_messages_dropped.inc(policy=self.policy)
+
+        self._messages[key if key is not None else next(self._sequence)] = (
+            time.monotonic(),
+            message,
+        )
+        self._wake()
+
+    async def get(self, timeout: float) -> Optional[str]:
+        """
+        Wait for the next message.
+
+        Returns:
+            Optional[str]: The message, or None if none arrived within `timeout`.
+
+        Raises:
+            SlowConsumerError: If the queue was closed for falling behind.
+        """
+        if not self._messages and not self.closed:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.wait_for(self._waiter, timeout)
+            except asyncio.TimeoutError:
+                return None
+            finally:
+                self._waiter = None
+
+        if self.closed:
+            raise SlowConsumerError()
+
+        _, (queued_at, message) = self._messages.popitem(last=False)
+        sse_delivery_lag.observe(time.monotonic() - queued_at)
+        return message
+
+    def hold(self):
+        """Keep messages put from now on aside until `release`, e.g. during a replay."""
+        self._held = []
+
+    def release(self, messages: Iterable[str] = ()):
+        """Queue `messages`, then the messages held since `hold`."""
+        held, self._held = self._held or [], None
+        for message in messages:
+            self.put(message, message_key(message))
+        for message, key in held:
+            self.put(message, key)
+
+    def lag(self) -> float:
+        """Seconds the oldest queued message has been waiting."""
+        if not self._messages:
+            return 0.0
+        queued_at, _ = next(iter(self._messages.values()))
+        return time.monotonic() - queued_at
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+
+class SSEConnection:
+    """One open SSE stream. A user has one per browser tab."""
+
+    __slots__ = ("connection_id", "user_id", "org_id", "queue")
+
+    def __init__(self, user_id: str, org_id: str):
+        self.connection_id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.org_id = org_id
+        self.queue = ConnectionQueue(
+            settings.SSE_QUEUE_MAXSIZE, settings.SSE_QUEUE_POLICY
+        )
+
+
+# Every registry in the process, for the queue gauges
+_registries: "weakref.WeakSet[ConnectionRegistry]" = weakref.WeakSet()
+
+
+class ConnectionRegistry:
+    """
+    The SSE connections of this worker, indexed by connection, user and organization.
+
+    Organization IDs are stored as strings, so IDs from the database and from
+    Redis channel names match.
+    """
+
+    def __init__(self):
+        self.connections: Dict[str, SSEConnection] = {}
+        self.by_user: Dict[str, Set[str]] = {}
+        self.by_org: Dict[str, Set[str]] = {}
+        _registries.add(self)
+
+    def __len__(self) -> int:
+        return len(self.connections)
+
+    def add(self, user_id: str, org_id) -> SSEConnection:
+        """Create and index a connection for a user."""
+        connection = SSEConnection(user_id, str(org_id))
+        self.connections[connection.connection_id] = connection
+        self.by_user.setdefault(user_id, set()).add(connection.connection_id)
+        self.by_org.setdefault(connection.org_id, set()).add(connection.connection_id)
+        return connection
+
+    def remove(self, connection_id: str) -> Optional[SSEConnection]:
+        """Drop a connection from every index, returning it if it was registered."""
+        connection = self.connections.pop(connection_id, None)
+        if connection is None:
+            return None
+        _discard(self.by_user, connection.user_id, connection_id)
+        _discard(self.by_org, connection.org_id, connection_id)
+        return connection
+
+    def has_org(self, org_id) -> bool:
+        return str(org_id) in self.by_org
+
+    def for_org(self, org_id) -> List[SSEConnection]:
+        return [self.connections[cid] for cid in self.by_org.get(str(org_id), ())]
+
+    def for_user(self, user_id: str) -> List[SSEConnection]:
+        return [self.connections[cid] for cid in self.by_user.get(user_id, ())]
+
+    def lagging(self, limit: int = 10) -> List[Dict]:
+        """Return the connections with the oldest queued messages, slowest first."""
+        connections = sorted(
+            (c for c in self.connections.values() if len(c.queue)),
+            key=lambda c: c.queue.lag(),
+            reverse=True,
+        )
+        return [
+            {
+                "connection_id": connection.connection_id,
+                "user_id": connection.user_id,
+                "org_id": connection.org_id,
+                "queued": len(connection.queue),
+                "lag_seconds": round(connection.queue.lag(), 3),
+                "dropped": connection.queue.dropped,
+                "coalesced": connection.queue.coalesced,
+            }
+            for connection in connections[:limit]
+        ]
+
+
+def _discard(index: Dict[str, Set[str]], key: str, connection_id: str):
+    connection_ids = index.get(key)
+    if connection_ids is not None:
+        connection_ids.discard(connection_id)
+        if not connection_ids:
+            del index[key]
+
+
+def _queues():
+    for connection_registry in list(_registries):
+        for connection in connection_registry.connections.values():
+            yield connection.queue
+
+
+sse_queue_lag_max.set_function(
+    lambda: {(): max((queue.lag() for queue in _queues()), default=0.0)}
+)
+sse_worker_connections.set_function(
+    lambda: {(): sum(len(connection_registry) for connection_registry in _registries)}
+)
+sse_connections_backlogged.set_function(
+    lambda: {(): sum(1 for queue in _queues() if len(queue) * 2 >= queue.maxsize)}
+)
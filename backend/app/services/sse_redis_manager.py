@@ -1,336 +1,525 @@
 import asyncio
 import json
 import logging
-from typing import Dict, Set, List
-from datetime import datetime, timedelta
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from datetime import datetime
+
+from app.core.config import settings
+from app.services.sse_connections import (
+    ConnectionRegistry,
+    SSEConnection,
+    message_key,
+)
+from app.utils.metrics import registry
 
 logger = logging.getLogger(__name__)
 
+sse_connections = registry.gauge(
+    "sse_connections",
+    "Open SSE connections across all workers, by organization, as of the last "
+    "stats refresh",
+    ["org_id"],
+)
+
+# Sent instead of a replay when events after the client's last one are gone
+RESYNC_MESSAGE = f"data: {json.dumps({'type': 'resync'})}\n\n"
+
 
 class RedisSSEManager:
     """
     Redis-based Server-Sent Events connection manager.
 
+    Expects a `redis.asyncio` client. Each organization's events are appended to
+    a capped Redis Stream, so a broadcast is a single `XADD` and every event gets
+    an ordered ID that is sent as the SSE `id:`. Each worker runs one reader task
+    (see `start`) that follows the streams of the organizations it has clients
+    for and hands new events to their local queues. A client reconnecting with
+    the ID of the last event it got is replayed exactly the events it missed.
+
+    Every SSE stream is its own connection with a unique ID, so a user with
+    several tabs open receives events in all of them.
+
+    Liveness is tracked per organization in a sorted set of connection IDs
+    scored by the time they expire. Each worker refreshes the scores of all its
+    connections in one pipeline every `HEARTBEAT_INTERVAL` (see
+    `_run_heartbeats`), so the live connections of an organization are a
+    single `ZRANGEBYSCORE`.
+
+    Connection counts per organization are kept in a Redis hash, incremented
+    and decremented as connections come and go, so statistics never need to
+    walk the keyspace. A periodic `SCAN` reconciles the hash with the live
+    connections, correcting drift from crashed workers and failed writes.
     """
 
     def __init__(self, redis_client):
         self.redis = redis_client
-        self.local_queues: Dict[str, asyncio.Queue] = (
-            {}
-        )  # Still need local queues for asyncio
+        # Connections served by this worker; Redis only tracks them for liveness
+        self.local = ConnectionRegistry()
 
         # Key patterns
-        self.CONNECTION_KEY = "sse:connections:{user_id}"
-        self.ORG_USERS_KEY = "sse:org:{org_id}:users"
-        self.METADATA_KEY = "sse:metadata:{user_id}"
-        self.QUEUE_KEY = "sse:queue:{user_id}"
+        self.CONNECTION_KEY = "sse:connections:{connection_id}"
+        self.ORG_CONNECTIONS_KEY = "sse:org:{org_id}:live"
+        self.STREAM_KEY = "sse:org:{org_id}:stream"
+        self.STATS_KEY = "sse:stats:connections"  # Organization ID -> connections
+        self.RECONCILE_KEY = "sse:stats:reconciled"
 
         # Configuration
         self.CONNECTION_TTL = 3600  # 1 hour
-        self.HEARTBEAT_INTERVAL = 60  # 60 seconds
-        self.QUEUE_TTL = 300  # 5 minutes for pending messages
+        self.HEARTBEAT_INTERVAL = 30  # Seconds between heartbeat batches
+        self.HEARTBEAT_GRACE = 120  # Seconds a connection is live without heartbeat
+        self.STREAM_TTL = 86400  # Streams of organizations without events expire
+        self.STREAM_MAXLEN = settings.SSE_STREAM_MAXLEN
+        self.READ_BLOCK_MS = 1000  # Also how soon new organizations are followed
+        self.READ_COUNT = 500
+        self.RETRY_DELAY = 1  # Seconds before retrying a failed stream read
+        self.STATS_REFRESH_INTERVAL = 15  # Seconds between gauge refreshes
+        self.RECONCILE_INTERVAL = settings.SSE_STATS_RECONCILE_SECONDS
+        self.SCAN_COUNT = 500
+
+        # Last stream entry delivered to local connections, by organization
+        self._cursors: Dict[str, Optional[str]] = {}
+        self._reader: Optional[asyncio.Task] = None
+        self._stats: Optional[asyncio.Task] = None
+        self._heartbeats: Optional[asyncio.Task] = None
+        self._orgs_changed = asyncio.Event()
+        self._reported_orgs: Set[str] = set()
+
+    async def start(self):
+        """Start this worker's stream reader, heartbeat and connection stats tasks."""
+        if self._reader:
+            return
+
+        self._reader = asyncio.create_task(self._run_reader())
+        self._heartbeats = asyncio.create_task(self._run_heartbeats())
+        self._stats = asyncio.create_task(self._run_stats())
+        logger.info("SSE stream reader started")
+
+    async def stop(self):
+        """Stop the stream reader, heartbeat and connection stats tasks."""
+        for task in (self._reader, self._heartbeats, self._stats):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._reader = self._heartbeats = self._stats = None
 
     async def register_connection(
-        self, user_id: str, org_id: int, session_token: str = None
-    ) -> asyncio.Queue:
+        self,
+        user_id: str,
+        org_id: int,
+        session_token: str = None,
+        last_event_id: Optional[str] = None,
+    ) -> SSEConnection:
         """
-        Register a new SSE connection in Redis and return a local asyncio.Queue.
+        Register a new SSE connection in Redis and return it.
 
         Args:
             user_id: Unique user identifier
             org_id: Organization ID for the user
             session_token: Optional session token for validation
+            last_event_id: ID of the last event a reconnecting client received;
+                the events after it are queued first
 
         Returns:
-            asyncio.Queue for receiving messages
+            The connection, whose queue receives the messages for this stream
         """
+        org = str(org_id)
+        if not self.local.has_org(org_id):
+            self._cursors[org] = None
+            self._orgs_changed.set()
+        connection = self.local.add(user_id, org_id)
+        connection_id = connection.connection_id
+
+        # Live events wait until the missed ones are queued ahead of them
+        replayed = None
+        if last_event_id:
+            connection.queue.hold()
+
         try:
-            queue = asyncio.Queue()
-            self.local_queues[user_id] = queue
+            await self._follow(org)
+            if last_event_id:
+                replayed = await self._replay(
+                    org, last_event_id, connection.queue.maxsize
+                )
 
-            connection_key = self.CONNECTION_KEY.format(user_id=user_id)
+            connection_key = self.CONNECTION_KEY.format(connection_id=connection_id)
             connection_data = {
+                "user_id": user_id,
                 "org_id": str(org_id),
                 "connected_at": datetime.utcnow().isoformat(),
-                "last_heartbeat": datetime.utcnow().isoformat(),
                 "session_token_hash": (
                     str(hash(session_token)) if session_token else "none"
                 ),
             }
 
-            pipe = self.redis.pipeline()
+            pipe = self.redis.pipeline(transaction=False)
             pipe.hset(connection_key, mapping=connection_data)
             pipe.expire(connection_key, self.CONNECTION_TTL)
 
-            org_key = self.ORG_USERS_KEY.format(org_id=org_id)
-            pipe.sadd(org_key, user_id)
+            org_key = self.ORG_CONNECTIONS_KEY.format(org_id=org_id)
+            pipe.zadd(org_key, {connection_id: time.time() + self.HEARTBEAT_GRACE})
             pipe.expire(org_key, self.CONNECTION_TTL)
-
-            metadata_key = self.METADATA_KEY.format(user_id=user_id)
-            metadata = {
-                "connection_type": "sse",
-                "server_instance": "fastapi_main",
-                "capabilities": ["workflow_runs", "jobs"],
-            }
-            pipe.set(metadata_key, json.dumps(metadata), ex=self.CONNECTION_TTL)
+            pipe.hincrby(self.STATS_KEY, org, 1)
 
             result = await self._execute_pipeline(pipe)
             if result is None:
                 raise Exception("Pipeline execution failed")
 
-            await self._deliver_pending_messages(user_id, queue)
-
-            logger.info(f"Registered SSE connection for user {user_id} in org {org_id}")
-            return queue
+            logger.info(
+                f"Registered SSE connection {connection_id} for user {user_id} in org {org_id}"
+            )
 
         except Exception as e:
             logger.error(f"Failed to register SSE connection for user {user_id}: {e}")
-            # Fallback to local-only queue
-            if user_id not in self.local_queues:
-                self.local_queues[user_id] = asyncio.Queue()
-            return self.local_queues[user_id]
+            if last_event_id and replayed is None:
+                replayed = [RESYNC_MESSAGE]
 
-    async def unregister_connection(self, user_id: str):
+        if last_event_id:
+            connection.queue.release(replayed or ())
+        return connection
+
+    async def unregister_connection(self, connection_id: str):
         """
         Unregister an SSE connection from Redis.
 
         Args:
-            user_id: User identifier to unregister
+            connection_id: Connection identifier to unregister
         """
-        try:
-            connection_key = self.CONNECTION_KEY.format(user_id=user_id)
-            connection_data = await self._execute_redis_cmd("hgetall", connection_key)
-
-            if connection_data:
-                org_id = connection_data.get("org_id")
-                if org_id:
-                    org_key = self.ORG_USERS_KEY.format(org_id=org_id)
-                    await self._execute_redis_cmd("srem", org_key, user_id)
-
-            pipe = self.redis.pipeline()
-            pipe.delete(connection_key)
-            pipe.delete(self.METADATA_KEY.format(user_id=user_id))
-            queue_key = self.QUEUE_KEY.format(user_id=user_id)
-            pipe.expire(queue_key, self.QUEUE_TTL)
+        connection = self.local.remove(connection_id)
+        if connection is None:
+            return
 
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.zrem(
+                self.ORG_CONNECTIONS_KEY.format(org_id=connection.org_id), connection_id
+            )
+            pipe.delete(self.CONNECTION_KEY.format(connection_id=connection_id))
+            pipe.hincrby(self.STATS_KEY, connection.org_id, -1)
             await self._execute_pipeline(pipe)
 
-            self.local_queues.pop(user_id, None)
-
-            logger.info(f"Unregistered SSE connection for user {user_id}")
-
-        except Exception as e:
-            logger.error(f"Failed to unregister SSE connection for user {user_id}: {e}")
-
-    async def update_heartbeat(self, user_id: str):
-        """
-        Update the heartbeat timestamp for a connection.
+            if not self.local.has_org(connection.org_id):
+                self._cursors.pop(connection.org_id, None)
 
-        Args:
-            user_id: User identifier
-        """
-        try:
-            connection_key = self.CONNECTION_KEY.format(user_id=user_id)
-            await self._execute_redis_cmd(
-                "hset", connection_key, "last_heartbeat", datetime.utcnow().isoformat()
+            logger.info(
+                f"Unregistered SSE connection {connection_id} for user {connection.user_id}"
             )
-            await self._execute_redis_cmd("expire", connection_key, self.CONNECTION_TTL)
+
         except Exception as e:
-            logger.debug(f"Failed to update heartbeat for user {user_id}: {e}")
+            logger.error(f"Failed to unregister SSE connection {connection_id}: {e}")
 
-    async def get_org_users(self, org_id: int) -> Set[str]:
+    async def get_org_connections(self, org_id: int) -> Set[str]:
         """
-        Get all users currently connected to an organization.
+        Get all connections currently open to an organization, on any worker.
 
         Args:
             org_id: Organization ID
 
         Returns:
-            Set of user IDs connected to the organization
+            Set of connection IDs with a recent heartbeat
         """
         try:
-            org_key = self.ORG_USERS_KEY.format(org_id=org_id)
-            user_ids = await self._execute_redis_cmd("smembers", org_key)
-
-            active_users = set()
-            for user_id in user_ids or []:
-                if await self._is_connection_active(user_id):
-                    active_users.add(user_id)
-                else:
-                    await self._execute_redis_cmd("srem", org_key, user_id)
-
-            return active_users
+            org_key = self.ORG_CONNECTIONS_KEY.format(org_id=org_id)
+            return set(await self.redis.zrangebyscore(org_key, time.time(), "+inf"))
 
         except Exception as e:
-            logger.error(f"Failed to get org users for org {org_id}: {e}")
+            logger.error(f"Failed to get org connections for org {org_id}: {e}")
             return set()
 
-    async def broadcast_to_org(self, org_id: int, event_type: str, data: dict) -> int:
+    async def broadcast_to_org(
+        self, org_id: int, event_type: str, data: dict
+    ) -> Optional[str]:
         """
         Broadcast a message to all users in an organization.
 
+        The event is serialized once and appended to the organization's stream,
+        whatever the number of users and workers. If that fails, it is still
+        delivered, without an ID, to this worker's connections.
+
         Args:
             org_id: Organization ID
             event_type: Type of event
             data: Event data
 
         Returns:
-            Number of users the message was sent to
+            The stream ID of the event, or None if it was only delivered locally
         """
-        try:
-            user_ids = await self.get_org_users(org_id)
-            message = f"data: {json.dumps({'type': event_type, **data})}\n\n"
-
-            delivered_count = 0
-            failed_users = []
-
-            for user_id in user_ids:
-                if await self._send_message_to_user(user_id, message):
-                    delivered_count += 1
-                else:
-                    failed_users.append(user_id)
-
-            if failed_users:
-                await self._cleanup_failed_connections(failed_users, org_id)
-
-            if user_ids:
-                logger.info(
-                    f"Broadcasted {event_type} to {delivered_count}/{len(user_ids)} users in org {org_id}"
-                )
+        payload = json.dumps({"type": event_type, **data})
+        stream_key = self.STREAM_KEY.format(org_id=org_id)
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.xadd(
+            stream_key, {"data": payload}, maxlen=self.STREAM_MAXLEN, approximate=True
+        )
+        pipe.expire(stream_key, self.STREAM_TTL)
+        result = await self._execute_pipeline(pipe)
+        if result is None:
+            self._deliver_local(str(org_id), f"data: {payload}\n\n")
+            return None
 
-            return delivered_count
-
-        except Exception as e:
-            logger.error(f"Failed to broadcast to org {org_id}: {e}")
-            return 0
+        return result[0]
 
     async def get_connection_stats(self) -> dict:
         """
         Get statistics about SSE connections.
 
+        Reads the maintained counters, so it costs one `HGETALL` whatever the
+        number of connections.
+
         Returns:
             Dictionary with connection statistics
         """
         try:
-            connection_pattern = self.CONNECTION_KEY.format(user_id="*")
-            connection_keys = await self._execute_redis_cmd("keys", connection_pattern)
-            total_connections = len(connection_keys or [])
-
-            org_pattern = self.ORG_USERS_KEY.format(org_id="*")
-            org_keys = await self._execute_redis_cmd("keys", org_pattern)
-            org_stats = {}
-
-            for org_key in org_keys or []:
-                org_id = org_key.split(":")[2]
-                user_count = await self._execute_redis_cmd("scard", org_key)
-                org_stats[org_id] = user_count
-
+            org_stats = await self.refresh_connection_counts()
             return {
-                "total_connections": total_connections,
-                "local_queues": len(self.local_queues),
+                "total_connections": sum(org_stats.values()),
+                "local_connections": len(self.local),
+                "local_users": len(self.local.by_user),
+                "lagging_connections": self.local.lagging(),
                 "organizations": org_stats,
-                "redis_connected": await self._test_redis_connection(),
+                "redis_connected": True,
             }
 
         except Exception as e:
             logger.error(f"Failed to get connection stats: {e}")
             return {
                 "total_connections": 0,
-                "local_queues": len(self.local_queues),
+                "local_connections": len(self.local),
+                "local_users": len(self.local.by_user),
                 "organizations": {},
                 "redis_connected": False,
                 "error": str(e),
             }
 
-    # Private helper methods
-
-    async def _is_connection_active(self, user_id: str) -> bool:
-        """Check if a connection is still active based on heartbeat."""
-        try:
-            connection_key = self.CONNECTION_KEY.format(user_id=user_id)
-            last_heartbeat = await self._execute_redis_cmd(
-                "hget", connection_key, "last_heartbeat"
-            )
-
-            if not last_heartbeat:
-                return False
-
-            last_time = datetime.fromisoformat(last_heartbeat)
-            cutoff_time = datetime.utcnow() - timedelta(
-                seconds=self.HEARTBEAT_INTERVAL * 2
-            )  # 2x grace period
-
-            return last_time > cutoff_time
-
-        except Exception as e:
-            logger.debug(f"Error checking connection active for user {user_id}: {e}")
-            return False
-
-    async def _send_message_to_user(self, user_id: str, message: str) -> bool:
+    async def refresh_connection_counts(self) -> Dict[str, int]:
         """
-        Send a message to a specific user.
-
-        Args:
-            user_id: User to send message to
-            message: SSE formatted message
+        Read the connection counters and update the `sse_connections` gauge.
 
         Returns:
-            True if message was delivered, False otherwise
+            Open connections by organization ID, without organizations at zero
         """
-        try:
-            if user_id in self.local_queues:
-                queue = self.local_queues[user_id]
-                await queue.put(message)
-                return True
-
-            queue_key = self.QUEUE_KEY.format(user_id=user_id)
-            await self._execute_redis_cmd("lpush", queue_key, message)
-            await self._execute_redis_cmd("expire", queue_key, self.QUEUE_TTL)
-            await self._execute_redis_cmd("ltrim", queue_key, 0, 99)
+        counts = {
+            org_id: int(count)
+            for org_id, count in (await self.redis.hgetall(self.STATS_KEY)).items()
+            if int(count) > 0
+        }
+
+        for org_id, count in counts.items():
+            sse_connections.set(count, org_id=org_id)
+        for org_id in self._reported_orgs - counts.keys():
+            sse_connections.remove(org_id=org_id)
+        self._reported_orgs = set(counts)
+        return counts
+
+    async def reconcile_connection_stats(self) -> Dict[str, int]:
+        """
+        Recount the live connections with `SCAN` and overwrite the counters.
 
-            logger.debug(f"Queued message for offline user {user_id}")
-            return True
+        Connections opened or closed during the scan may be off by one until the
+        next reconciliation.
 
-        except Exception as e:
-            logger.warning(f"Failed to send message to user {user_id}: {e}")
-            return False
+        Returns:
+            Open connections by organization ID
+        """
+        counts: Dict[str, int] = {}
+        batch = []
+        pattern = self.ORG_CONNECTIONS_KEY.format(org_id="*")
+        async for org_key in self.redis.scan_iter(match=pattern, count=self.SCAN_COUNT):
+            batch.append(org_key)
+            if len(batch) >= self.SCAN_COUNT:
+                await self._count_connections(batch, counts)
+                batch = []
+        if batch:
+            await self._count_connections(batch, counts)
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(self.STATS_KEY)
+        if counts:
+            pipe.hset(self.STATS_KEY, mapping=counts)
+        await pipe.execute()
+
+        logger.info(
+            f"Reconciled SSE connection stats: {sum(counts.values())} connections "
+            f"in {len(counts)} organizations"
+        )
+        return counts
 
-    async def _deliver_pending_messages(self, user_id: str, queue: asyncio.Queue):
-        """Deliver any pending messages to a newly connected user."""
-        try:
-            queue_key = self.QUEUE_KEY.format(user_id=user_id)
+    # Private helper methods
 
-            messages = await self._execute_redis_cmd("lrange", queue_key, 0, -1)
-            if messages:
-                for message in reversed(messages):
-                    await queue.put(message)
+    async def _count_connections(self, org_keys: List[str], counts: Dict):
+        """Add the number of live connections in each organization set to `counts`."""
+        now = time.time()
+        pipe = self.redis.pipeline(transaction=False)
+        for org_key in org_keys:
+            pipe.zcount(org_key, now, "+inf")
+        for org_key, count in zip(org_keys, await pipe.execute()):
+            if count:
+                # Organization keys are "sse:org:{org_id}:live"
+                counts[org_key.split(":")[2]] = count
+
+    async def _send_heartbeats(self):
+        """
+        Extend the expiry of every local connection in a single pipeline.
 
-                await self._execute_redis_cmd("delete", queue_key)
-                logger.info(
-                    f"Delivered {len(messages)} pending messages to user {user_id}"
+        Per organization, one `ZADD` refreshes the scores of this worker's
+        connections and one `ZREMRANGEBYSCORE` prunes the connections left
+        behind by workers that died without unregistering them.
+        """
+        if not self.local:
+            return
+
+        now = time.time()
+        pipe = self.redis.pipeline(transaction=False)
+        for org_id, connection_ids in self.local.by_org.items():
+            org_key = self.ORG_CONNECTIONS_KEY.format(org_id=org_id)
+            pipe.zadd(
+                org_key,
+                {
+                    connection_id: now + self.HEARTBEAT_GRACE
+                    for connection_id in connection_ids
+                },
+            )
+            pipe.zremrangebyscore(org_key, "-inf", now)
+            pipe.expire(org_key, self.CONNECTION_TTL)
+            for connection_id in connection_ids:
+                pipe.expire(
+                    self.CONNECTION_KEY.format(connection_id=connection_id),
+                    self.CONNECTION_TTL,
                 )
+        await pipe.execute()
+
+    async def _run_heartbeats(self):
+        """Send this worker's heartbeats every `HEARTBEAT_INTERVAL` seconds."""
+        while True:
+            await asyncio.sleep(self.HEARTBEAT_INTERVAL)
+            try:
+                await self._send_heartbeats()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"SSE heartbeat error: {e}")
+
+    async def _run_stats(self):
+        """Refresh the connection gauge, reconciling the counters now and then."""
+        while True:
+            try:
+                # Whichever worker gets here first reconciles, once per interval
+                if await self.redis.set(
+                    self.RECONCILE_KEY, "1", nx=True, ex=self.RECONCILE_INTERVAL
+                ):
+                    await self.reconcile_connection_stats()
+                await self.refresh_connection_counts()
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"SSE connection stats error: {e}")
+
+            await asyncio.sleep(self.STATS_REFRESH_INTERVAL)
+
+    def _deliver_local(self, org_id: str, message: str) -> int:
+        """Put a message on the queue of each of the organization's local connections."""
+        connections = self.local.for_org(org_id)
+        if connections:
+            key = message_key(message)
+            for connection in connections:
+                connection.queue.put(message, key)
+        return len(connections)
+
+    async def _follow(self, org_id: str):
+        """Start following an organization's stream from its latest entry."""
+        if org_id not in self._cursors or self._cursors[org_id] is not None:
+            return
+
+        latest = await self.redis.xrevrange(
+            self.STREAM_KEY.format(org_id=org_id), count=1
+        )
+        # Another connection may have started following meanwhile
+        if org_id in self._cursors and self._cursors[org_id] is None:
+            self._cursors[org_id] = latest[0][0] if latest else "0-0"
+
+    async def _replay(self, org_id: str, last_event_id: str, limit: int) -> List[str]:
+        """
+        Return the messages after `last_event_id` up to the reader's position.
 
-        except Exception as e:
-            logger.debug(f"Failed to deliver pending messages to user {user_id}: {e}")
+        Later events reach the connection through the reader, so together the
+        client gets every event after `last_event_id` exactly once. If the stream
+        no longer holds everything after `last_event_id` (trimmed or expired), a
+        `resync` message is returned first so the client refetches.
 
-    async def _cleanup_failed_connections(self, user_ids: List[str], org_id: int):
-        """Clean up connections that failed to receive messages."""
-        try:
-            org_key = self.ORG_USERS_KEY.format(org_id=org_id)
-            for user_id in user_ids:
-                await self.unregister_connection(user_id)
-                logger.debug(f"Cleaned up failed connection for user {user_id}")
-        except Exception as e:
-            logger.debug(f"Failed to cleanup failed connections: {e}")
+        More than `limit` missed events would overflow the connection's queue,
+        dropping some or closing the connection before it sends anything, so
+        only a `resync` message is returned then.
+        """
+        cursor = self._cursors.get(org_id)
+        stream_key = self.STREAM_KEY.format(org_id=org_id)
+        if cursor is None or _stream_id(last_event_id) is None:
+            return [RESYNC_MESSAGE]
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.xrange(stream_key, count=1)
+        pipe.xrange(stream_key, min=f"({last_event_id}", max=cursor, count=limit + 1)
+        oldest, entries = await pipe.execute()
+        if len(entries) > limit:
+            return [RESYNC_MESSAGE]
+
+        messages = []
+        if not oldest or _stream_id(oldest[0][0]) > _stream_id(last_event_id):
+            messages.append(RESYNC_MESSAGE)
+        if _stream_id(last_event_id) < _stream_id(cursor):
+            messages.extend(
+                _sse_message(event_id, fields["data"]) for event_id, fields in entries
+            )
+        return messages
+
+    async def _run_reader(self):
+        """Hand new entries of the followed streams to local connections."""
+        while True:
+            try:
+                for org_id in [o for o, c in self._cursors.items() if c is None]:
+                    await self._follow(org_id)
+
+                streams = {
+                    self.STREAM_KEY.format(org_id=org_id): cursor
+                    for org_id, cursor in self._cursors.items()
+                    if cursor is not None
+                }
+                if not streams:
+                    self._orgs_changed.clear()
+                    await self._orgs_changed.wait()
+                    continue
+
+                response = await self.redis.xread(
+                    streams, count=self.READ_COUNT, block=self.READ_BLOCK_MS
+                )
+                for stream_key, entries in response or []:
+                    # Stream keys are "sse:org:{org_id}:stream"
+                    org_id = stream_key.split(":")[2]
+                    cursor = self._cursors.get(org_id)
+                    if cursor is None:
+                        continue
+                    for event_id, fields in entries:
+                        # Skip entries already replayed after a re-follow
+                        if _stream_id(event_id) > _stream_id(cursor):
+                            self._deliver_local(
+                                org_id, _sse_message(event_id, fields["data"])
+                            )
+                            cursor = event_id
+                    self._cursors[org_id] = cursor
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"SSE stream reader error: {e}")
+                await asyncio.sleep(self.RETRY_DELAY)
 
     async def _execute_redis_cmd(self, command: str, *args, **kwargs):
         """Execute a Redis command with error handling."""
         try:
-            cmd = getattr(self.redis, command)
-            if asyncio.iscoroutinefunction(cmd):
-                return await cmd(*args, **kwargs)
-            else:
-                return cmd(*args, **kwargs)
+            return await getattr(self.redis, command)(*args, **kwargs)
         except Exception as e:
             logger.error(f"Redis command '{command}' failed: {e}")
             return None
@@ -338,11 +527,7 @@ class RedisSSEManager:
     async def _execute_pipeline(self, pipe):
         """Execute a Redis pipeline with error handling."""
         try:
-            if asyncio.iscoroutinefunction(pipe.execute):
-                result = await pipe.execute()
-            else:
-                result = pipe.execute()
-            return result
+            return await pipe.execute()
         except Exception as e:
             logger.error(f"Redis pipeline execution failed: {e}")
             return None
@@ -350,8 +535,20 @@ class RedisSSEManager:
     async def _test_redis_connection(self) -> bool:
         """Test if Redis connection is working."""
         try:
-            result = await self._execute_redis_cmd("ping")
-            return result or result == b"PONG" or result == "PONG"
+            return bool(await self._execute_redis_cmd("ping"))
         except Exception as e:
             logger.error(e)
             return False
+
+
+def _sse_message(event_id: str, payload: str) -> str:
+    return f"id: {event_id}\ndata: {payload}\n\n"
+
+
+def _stream_id(event_id: str) -> Optional[Tuple[int, int]]:
+    """Parse a stream entry ID ("<ms>-<seq>") into a comparable tuple."""
+    try:
+        milliseconds, sequence = event_id.split("-")
+        return int(milliseconds), int(sequence)
+    except (AttributeError, ValueError):
+        return None
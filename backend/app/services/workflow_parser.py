@@ -0,0 +1,259 @@
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from app.core.config import settings
+from app.utils.labels import label_pool_key
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Bump when the summary format changes so persisted summaries get rebuilt
+SUMMARY_VERSION = 2
+
+MATRIX_EXPRESSION = re.compile(r"^\$\{\{\s*matrix\.([\w-]+)\s*\}\}$")
+
+workflow_parse_cache = registry.counter(
+    "workflow_parse_cache_total",
+    "Workflow YAML summary lookups by cache result",
+    ["result"],
+)
+
+
+def content_sha(content: str) -> str:
+    """Return the git blob SHA of workflow content, matching GitHub's `sha` field."""
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class WorkflowSummaryCache:
+    """Thread-safe LRU of parsed workflow summaries keyed by content SHA."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            summary = self._items.get(key)
+            if summary is not None:
+                self._items.move_to_end(key)
+            return summary
+
+    def put(self, key: str, summary: Dict[str, Any]):
+        with self._lock:
+            self._items[key] = summary
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+summary_cache = WorkflowSummaryCache(settings.WORKFLOW_SUMMARY_CACHE_SIZE)
+
+
+def get_workflow_summary(content: str, sha: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Return the structured summary of a workflow file, parsing it at most once per SHA.
+
+    The returned dict is shared with the cache and must not be mutated.
+
+    Args:
+        content (str): The workflow YAML.
+        sha (Optional[str]): The git blob SHA of the content, computed if omitted.
+
+    Returns:
+        Dict[str, Any]: The summary (see `parse_workflow`).
+    """
+    key = sha or content_sha(content)
+
+    summary = summary_cache.get(key)
+    if summary is not None:
+        workflow_parse_cache.inc(result="hit")
+        return summary
+
+    workflow_parse_cache.inc(result="miss")
+    summary = parse_workflow(content)
+    summary["sha"] = key
+    summary_cache.put(key, summary)
+    return summary
+
+
+def is_current(summary: Optional[Dict[str, Any]], sha: Optional[str]) -> bool:
+    """Return whether a persisted summary was built from `sha` with this parser version."""
+    return bool(
+        summary
+        and summary.get("version") == SUMMARY_VERSION
+        and (sha is None or summary.get("sha") == sha)
+    )
+
+
+def parse_workflow(content: str) -> Dict[str, Any]:
+    """
+    Parse workflow YAML into a structured summary.
+
+    Returns:
+        Dict[str, Any]: A JSON-serializable dict with:
+            - name, description: Top-level metadata.
+            - triggers: Event names from the `on` key.
+            - jobs: Per job id: display name, `needs`, `runs_on` labels, matrix
+              dimensions and estimated matrix size, and reusable workflow (`uses`).
+            - edges: `[needed_job, job]` pairs of the job dependency graph.
+            - runner_demand: Estimated job instances per runner pool (`label_pool_key`).
+            - error: Parse error message, if the YAML could not be parsed.
+    """
+    summary: Dict[str, Any] = {
+        "version": SUMMARY_VERSION,
+        "name": None,
+        "description": None,
+        "triggers": [],
+        "jobs": {},
+        "edges": [],
+        "runner_demand": {},
+        "error": None,
+    }
+
+    try:
+        data = yaml.safe_load(content)
+    except yaml.YAMLError as e:
+        logger.debug(f"Could not parse workflow YAML: {e}")
+        summary["error"] = str(e)
+        return summary
+
+    if not isinstance(data, dict):
+        summary["error"] = "Workflow is not a mapping"
+        return summary
+
+    summary["name"] = _as_text(data.get("name"))
+    summary["description"] = _as_text(data.get("description"))
+
+    # YAML 1.1 reads the bare key `on` as boolean True
+    triggers = data.get("on", data.get(True))
+    if isinstance(triggers, (dict, list)):
+        summary["triggers"] = [str(trigger) for trigger in triggers]
+    elif triggers:
+        summary["triggers"] = [str(triggers)]
+
+    jobs = data.get("jobs")
+    if not isinstance(jobs, dict):
+        return summary
+
+    for job_id, job in jobs.items():
+        if not isinstance(job, dict):
+            continue
+        job_id = str(job_id)
+
+        needs = job.get("needs") or []
+        if isinstance(needs, str):
+            needs = [needs]
+        needs = [str(need) for need in needs]
+
+        matrix = _parse_matrix(job.get("strategy"))
+        variants = _parse_runs_on(job.get("runs-on"), matrix["dimensions"])
+        runs_on = list(dict.fromkeys(label for labels in variants for label in labels))
+
+        summary["jobs"][job_id] = {
+            "name": _as_text(job.get("name")) or job_id,
+            "needs": needs,
+            "runs_on": runs_on,
+            "matrix": matrix["dimensions"],
+            "matrix_size": matrix["size"],
+            "uses": _as_text(job.get("uses")),
+            "if": _as_text(job.get("if")),
+        }
+        summary["edges"].extend([need, job_id] for need in needs)
+
+        # Matrix instances are spread evenly over the runs-on variants
+        for labels in variants:
+            pool = label_pool_key(labels)
+            summary["runner_demand"][pool] = summary["runner_demand"].get(
+                pool, 0
+            ) + max(matrix["size"] // len(variants), 1)
+
+    return summary
+
+
+def _as_text(value: Any) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def _as_json(value: Any) -> Any:
+    """Keep JSON scalars as-is and stringify anything else YAML produced (dates...)."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _parse_matrix(strategy: Any) -> Dict[str, Any]:
+    """Extract matrix dimensions and an estimate of the number of job instances."""
+    matrix = strategy.get("matrix") if isinstance(strategy, dict) else None
+    if not isinstance(matrix, dict):
+        # A matrix built from an expression can't be sized without running it
+        return {"dimensions": {}, "size": 1}
+
+    dimensions: Dict[str, List[Any]] = {}
+    size = 1
+    for key, values in matrix.items():
+        if key in ("include", "exclude"):
+            continue
+        values = values if isinstance(values, list) else [values]
+        dimensions[str(key)] = [_as_json(value) for value in values]
+        size *= max(len(values), 1)
+
+    include = matrix.get("include")
+    exclude = matrix.get("exclude")
+    if isinstance(exclude, list) and dimensions:
+        size = max(size - len(exclude), 0)
+    if isinstance(include, list):
+        # Without other dimensions every include entry is its own combination
+        size = max(size, len(include)) if dimensions else len(include)
+
+    return {"dimensions": dimensions, "size": max(size, 1)}
+
+
+def _parse_runs_on(runs_on: Any, dimensions: Dict[str, List[Any]]) -> List[List[str]]:
+    """
+    Normalize `runs-on` to label sets, one per runner variant.
+
+    A label like `${{ matrix.os }}` produces one variant per value of that matrix
+    dimension; anything else yields a single variant.
+    """
+    if isinstance(runs_on, dict):
+        labels = runs_on.get("labels") or []
+        labels = [labels] if isinstance(labels, str) else list(labels)
+        if runs_on.get("group"):
+            labels.append(f"group:{runs_on['group']}")
+    elif isinstance(runs_on, list):
+        labels = list(runs_on)
+    elif runs_on:
+        labels = [runs_on]
+    else:
+        labels = []
+
+    if not labels:
+        return []
+
+    variants = [[]]
+    for label in labels:
+        match = MATRIX_EXPRESSION.match(str(label))
+        if match and match.group(1) in dimensions:
+            values = [str(value) for value in dimensions[match.group(1)]]
+            variants = [variant + [value] for variant in variants for value in values]
+        else:
+            variants = [variant + [str(label)] for variant in variants]
+
+    return variants
+
+
+def describe_workflow(summary: Dict[str, Any]) -> Optional[str]:
+    """Return the workflow's `name` or `description`, if it declares one."""
+    return summary.get("name") or summary.get("description")
@@ -0,0 +1,364 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.db.models.job import Workflow
+from app.db.models.repository import Repository
+from app.db.session import SessionLocal
+from app.services.workflow_parser import get_workflow_summary
+from app.services.workflow_service import WorkflowService
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs are kept around this long so clients can read their final status
+FINISHED_JOB_TTL = 60 * 60
+
+# The state and installation lock of a running job expire this long after its
+# last progress, so a job whose worker died stops blocking new refreshes
+RUNNING_JOB_TTL = 5 * 60
+
+JOB_KEY = "workflow_refresh:job:{job_id}"
+INSTALLATION_LOCK_KEY = "workflow_refresh:installation:{installation_id}"
+
+# Delete the installation lock only if it still belongs to the job
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Jobs running on this worker, and without Redis also finished ones
+refresh_jobs: Dict[str, "WorkflowRefreshJob"] = {}
+
+
+class WorkflowRefreshJob:
+    """
+    Background refresh of workflow YAML content for one installation.
+
+    Each repository's `.github/workflows` directory is listed once to get the blob
+    SHA of every file, and only files whose SHA differs from the stored
+    `Workflow.content_sha` are downloaded. Downloads run concurrently up to
+    `concurrency`; database writes happen serially in the job's own session.
+    Progress is broadcast to the organization over SSE.
+
+    With Redis, the job's state is saved under `JOB_KEY` as it progresses, so
+    any worker can report it, and `INSTALLATION_LOCK_KEY` holds the ID of the
+    installation's running job.
+    """
+
+    def __init__(
+        self,
+        installation_id: int,
+        organization_id: Optional[str],
+        force: bool = False,
+        concurrency: Optional[int] = None,
+    ):
+        self.id = uuid.uuid4().hex
+        self.installation_id = installation_id
+        self.organization_id = organization_id
+        self.force = force
+        self.concurrency = concurrency or settings.WORKFLOW_REFRESH_CONCURRENCY
+        self.status = "pending"
+        self.total = 0
+        self.processed = 0
+        self.refreshed = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.errors: List[str] = []
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.redis = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_progress = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total": self.total,
+            "processed": self.processed,
+            "refreshed_count": self.refreshed,
+            "unchanged_count": self.unchanged,
+            "error_count": self.failed,
+            "errors": self.errors[:50],
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def start(self):
+        refresh_jobs[self.id] = self
+        self._task = asyncio.create_task(self.run())
+
+    async def run(self):
+        self.status = "running"
+        self.started_at = datetime.utcnow()
+        db = SessionLocal()
+
+        try:
+            await self._refresh(db)
+            self.status = "completed"
+        except Exception as e:
+            self.status = "failed"
+            self.errors.append(str(e))
+            logger.error(f"Workflow refresh job {self.id} failed: {e}")
+        finally:
+            db.close()
+            self.finished_at = datetime.utcnow()
+            await self._broadcast_progress(force=True)
+            await self._release()
+            logger.info(
+                f"Workflow refresh job {self.id} {self.status}: {self.refreshed} refreshed, "
+                f"{self.unchanged} unchanged, {self.failed} failed"
+            )
+
+    async def _refresh(self, db):
+        workflow_service = WorkflowService(db)
+
+        # Snapshot plain values so concurrent fetches never touch the session
+        rows = (
+            db.query(
+                Workflow.id,
+                Workflow.name,
+                Workflow.path,
+                Workflow.content_sha,
+                Workflow.content.isnot(None).label("has_content"),
+                Repository.full_name,
+            )
+            .join(Repository, Workflow.repository_id == Repository.id)
+            .filter(Workflow.installation_id == self.installation_id)
+            .all()
+        )
+
+        workflows_by_repo = defaultdict(list)
+        for row in rows:
+            workflows_by_repo[row.full_name].append(row)
+
+        self.total = len(rows)
+        await self._broadcast_progress(force=True)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def list_repository(full_name: str):
+            async with semaphore:
+                shas = await workflow_service.fetch_workflow_file_shas(
+                    full_name, self.installation_id
+                )
+            return full_name, shas
+
+        async def fetch_workflow(workflow, full_name: str):
+            async with semaphore:
+                result = await workflow_service._fetch_workflow_content_from_github(
+                    full_name, workflow.path, self.installation_id
+                )
+            return workflow, full_name, result
+
+        fetches = []
+        for listing in asyncio.as_completed(
+            [list_repository(full_name) for full_name in workflows_by_repo]
+        ):
+            full_name, shas = await listing
+            for workflow in workflows_by_repo[full_name]:
+                sha = shas.get(workflow.path) if shas is not None else None
+
+                if shas is not None and sha is None:
+                    self._record_failure(workflow, "file not found in repository")
+                elif (
+                    not self.force
+                    and workflow.has_content
+                    and sha == workflow.content_sha
+                ):
+                    self.unchanged += 1
+                    self.processed += 1
+                else:
+                    fetches.append(
+                        asyncio.ensure_future(fetch_workflow(workflow, full_name))
+                    )
+            await self._broadcast_progress()
+
+        try:
+            for fetch in asyncio.as_completed(fetches):
+                workflow, full_name, (content, description, sha) = await fetch
+                if not content:
+                    self._record_failure(workflow, "could not fetch content")
+                    continue
+
+                db.query(Workflow).filter(Workflow.id == workflow.id).update(
+                    {
+                        Workflow.content: content,
+                        Workflow.content_sha: sha,
+                        Workflow.summary: get_workflow_summary(content, sha),
+                        Workflow.description: description,
+                        Workflow.badge_url: workflow_service._generate_badge_url(
+                            full_name, workflow.name
+                        ),
+                        Workflow.updated_at: datetime.utcnow(),
+                    },
+                    synchronize_session=False,
+                )
+                db.commit()
+
+                self.refreshed += 1
+                self.processed += 1
+                await self._broadcast_progress()
+        finally:
+            for fetch in fetches:
+                fetch.cancel()
+
+    def _record_failure(self, workflow, reason: str):
+        self.failed += 1
+        self.processed += 1
+        self.errors.append(f"Workflow {workflow.id} ({workflow.name}): {reason}")
+
+    async def _broadcast_progress(self, force: bool = False):
+        """Save and send the progress, at most twice a second unless forced."""
+        now = time.monotonic()
+        if not force and now - self._last_progress < 0.5:
+            return
+        self._last_progress = now
+
+        await self._save()
+        if not self.organization_id:
+            return
+
+        from app.api.endpoints.sse import broadcast_event
+
+        try:
+            await broadcast_event(
+                self.organization_id, "workflow_refresh_progress", self.to_dict()
+            )
+        except Exception as e:
+            logger.debug(f"Failed to broadcast workflow refresh progress: {e}")
+
+    def _state(self) -> dict:
+        return {**self.to_dict(), "installation_id": self.installation_id}
+
+    async def _save(self):
+        """Save the job's state to Redis and extend its installation lock."""
+        if not self.redis:
+            return
+
+        ttl = FINISHED_JOB_TTL if self.finished else RUNNING_JOB_TTL
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.set(JOB_KEY.format(job_id=self.id), json.dumps(self._state()), ex=ttl)
+            if not self.finished:
+                pipe.expire(
+                    INSTALLATION_LOCK_KEY.format(installation_id=self.installation_id),
+                    RUNNING_JOB_TTL,
+                )
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to save workflow refresh job {self.id}: {e}")
+
+    async def _release(self):
+        """Let the installation start another refresh."""
+        if not self.redis:
+            return
+
+        refresh_jobs.pop(self.id, None)
+        try:
+            await self.redis.eval(
+                RELEASE_LOCK_SCRIPT,
+                1,
+                INSTALLATION_LOCK_KEY.format(installation_id=self.installation_id),
+                self.id,
+            )
+        except Exception as e:
+            logger.warning(
+                f"Failed to release workflow refresh lock of job {self.id}: {e}"
+            )
+
+
+async def start_workflow_refresh(
+    installation_id: int, organization_id: Optional[str], force: bool = False
+) -> dict:
+    """
+    Start a background workflow refresh for an installation.
+
+    If a refresh is already running for the installation, on any worker, that
+    job is returned instead of starting another one. Without Redis, only jobs of
+    this worker are known, which is only correct for single-worker deployments.
+
+    Args:
+        installation_id (int): The GitHub App installation ID.
+        organization_id (Optional[str]): Organization to send SSE progress events to.
+        force (bool): Re-download files even when their SHA is unchanged.
+
+    Returns:
+        dict: The state of the running job, as in `get_workflow_refresh`.
+    """
+    job = WorkflowRefreshJob(installation_id, organization_id, force=force)
+    redis = get_redis()
+
+    if redis:
+        lock_key = INSTALLATION_LOCK_KEY.format(installation_id=installation_id)
+        try:
+            # The running job may finish between both calls, hence a second try
+            running = None
+            for _ in range(2):
+                if await redis.set(lock_key, job.id, nx=True, ex=RUNNING_JOB_TTL):
+                    job.redis = redis
+                    break
+                running = await get_workflow_refresh(await redis.get(lock_key) or "")
+                if running and running["status"] in ("pending", "running"):
+                    return running
+            else:
+                if running:
+                    return running
+        except Exception as e:
+            logger.warning(f"Workflow refresh lock unavailable, running locally: {e}")
+
+    if not job.redis:
+        _prune_finished_jobs()
+        for other in refresh_jobs.values():
+            if other.installation_id == installation_id and not other.finished:
+                return other._state()
+
+    await job._save()
+    job.start()
+    return job._state()
+
+
+async def get_workflow_refresh(job_id: str) -> Optional[dict]:
+    """
+    Return the state of a workflow refresh job started on any worker.
+
+    Args:
+        job_id (str): The ID returned by `start_workflow_refresh`.
+
+    Returns:
+        Optional[dict]: The job's `to_dict` with its `installation_id`, or None
+        if the job is unknown or expired.
+    """
+    job = refresh_jobs.get(job_id)
+    if job:
+        return job._state()
+
+    redis = get_redis()
+    if not redis or not job_id:
+        return None
+    try:
+        state = await redis.get(JOB_KEY.format(job_id=job_id))
+    except Exception as e:
+        logger.warning(f"Failed to read workflow refresh job {job_id}: {e}")
+        return None
+    return json.loads(state) if state else None
+
+
+def _prune_finished_jobs():
+    cutoff = datetime.utcnow().timestamp() - FINISHED_JOB_TTL
+    for job_id, job in list(refresh_jobs.items()):
+        if job.finished and job.finished_at.timestamp() < cutoff:
+            del refresh_jobs[job_id]
@@ -1,7 +1,6 @@
 import asyncio
 import base64
 import logging
-import yaml
 import re
 
 
@@ -11,15 +10,29 @@ import urllib.parse
 import httpx
 
 from typing import Dict, List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 from app.db.models.job import Workflow, WorkflowRun, Job, JobStep, JobLog
 from app.db.models.repository import Repository
-from app.services.github_service import GitHubService
+from app.services.critical_path_service import CriticalPathService
+from app.services.github_client import background_requests, github_client
+from app.services.github_service import GitHubService, github_singleflight
+from app.services.queue_time_service import (
+    record_completed_job,
+    update_job_queue_time,
+)
+from app.services.runner_service import forget_runner_id, resolve_runner_id
+from app.services.workflow_parser import describe_workflow, get_workflow_summary
 
 logger = logging.getLogger(__name__)
 
+WORKFLOW_FILE_PATTERN = re.compile(r"^\.github/workflows/[^/]+\.ya?ml$")
+
+# GitHub truncates the commit list of push payloads at this many commits
+MAX_PUSH_COMMITS = 2048
+
 
 class WorkflowService:
     """
@@ -57,6 +70,9 @@ class WorkflowService:
                 workflow_run, workflow.id, repo.id, installation_id
             )
 
+            if run.status == "completed":
+                self._analyze_critical_path(run)
+
             logger.info(
                 f"Successfully processed workflow_run {run.run_id} for workflow {workflow.name}"
             )
@@ -90,7 +106,21 @@ class WorkflowService:
             job_status = workflow_job.get("status")
             if job_status == "completed":
                 logger.info(f"Job {job.job_id} completed, triggering log collection")
-                asyncio.create_task(self.fetch_and_store_job_logs(job.id))
+                with background_requests():
+                    asyncio.create_task(self.fetch_and_store_job_logs(job.id))
+
+                # Jobs reported after their run completed update its analysis
+                run = (
+                    self.db.query(WorkflowRun)
+                    .filter(
+                        WorkflowRun.run_id == job.run_id,
+                        WorkflowRun.run_attempt == job.run_attempt,
+                        WorkflowRun.status == "completed",
+                    )
+                    .first()
+                )
+                if run:
+                    self._analyze_critical_path(run)
             elif job_status == "in_progress":
                 logger.debug(
                     f"Job {job.job_id} in progress, logs will be collected on completion"
@@ -104,6 +134,15 @@ class WorkflowService:
             logger.error(f"Error processing workflow_job event: {e}")
             raise
 
+    def _analyze_critical_path(self, run: WorkflowRun):
+        """Compute the run's critical path; failures never affect event ingestion"""
+        try:
+            CriticalPathService(self.db).analyze_run(run)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Critical path analysis failed for run {run.run_id}: {e}")
+
     async def refresh_workflow_content(self, workflow_id: int):
         """Refresh YAML content, description, and badge URL for a specific workflow"""
         try:
@@ -125,12 +164,14 @@ class WorkflowService:
                 f"Refreshing content for workflow {workflow.name} at {workflow.path}"
             )
 
-            content, description = await self._fetch_workflow_content_from_github(
+            content, description, sha = await self._fetch_workflow_content_from_github(
                 repo.full_name, workflow.path, workflow.installation_id
             )
 
             if content:
                 workflow.content = content
+                workflow.content_sha = sha
+                workflow.summary = get_workflow_summary(content, sha)
                 workflow.description = description
                 workflow.badge_url = self._generate_badge_url(
                     repo.full_name, workflow.name
@@ -193,6 +234,139 @@ class WorkflowService:
             )
             raise
 
+    async def process_push_event(self, installation_id: int, payload: Dict) -> Dict:
+        """
+        Sync workflow definitions changed by a push to the default branch.
+
+        Only files under `.github/workflows/` that the pushed commits added, modified
+        or removed are touched, so pushes that don't change workflows cost no API
+        calls and the rest cost one call per changed file (plus one to register
+        newly added workflows).
+
+        Args:
+            installation_id (int): The GitHub App installation ID.
+            payload (Dict): The push webhook payload.
+
+        Returns:
+            Dict: Counts of updated, added and removed workflows.
+        """
+        result = {"updated": 0, "added": 0, "removed": 0}
+        repository_data = payload["repository"]
+        default_branch = repository_data.get("default_branch")
+
+        if (
+            payload.get("deleted")
+            or payload.get("ref") != f"refs/heads/{default_branch}"
+        ):
+            return result
+
+        commits = payload.get("commits") or []
+
+        # Replay the commits in order so a file added then removed ends up removed
+        changes: Dict[str, str] = {}
+        for commit in commits:
+            for change in ("added", "modified", "removed"):
+                for path in commit.get(change, []):
+                    if WORKFLOW_FILE_PATTERN.match(path):
+                        changes[path] = "removed" if change == "removed" else "changed"
+
+        if len(commits) >= MAX_PUSH_COMMITS:
+            logger.info(
+                f"Push to {repository_data['full_name']} has a truncated commit list, "
+                "running a full workflow sync"
+            )
+            await self.sync_workflows_for_repository(
+                repository_data["full_name"], installation_id
+            )
+
+        if not changes:
+            return result
+
+        repo = await self._get_or_create_repository(repository_data, installation_id)
+        workflows = {
+            workflow.path: workflow
+            for workflow in self.db.query(Workflow)
+            .filter(
+                Workflow.repository_id == repo.id,
+                Workflow.path.in_(list(changes)),
+            )
+            .all()
+        }
+
+        for path, change in changes.items():
+            if change != "removed" or path not in workflows:
+                continue
+            workflows[path].state = "deleted"
+            self.db.add(workflows[path])
+            result["removed"] += 1
+        self.db.commit()
+
+        # New files have to be registered with GitHub's workflow ID before storing
+        new_paths = [
+            path
+            for path, change in changes.items()
+            if change == "changed" and path not in workflows
+        ]
+        registered = await asyncio.gather(
+            *(
+                self._fetch_workflow_from_github(
+                    repo.full_name, path.rsplit("/", 1)[-1], installation_id
+                )
+                for path in new_paths
+            )
+        )
+        for workflow_data in registered:
+            if workflow_data:
+                await self._sync_workflow_from_github_data(
+                    workflow_data, repo.id, installation_id
+                )
+                result["added"] += 1
+
+        changed_paths = [
+            path for path, change in changes.items() if change == "changed"
+        ]
+        contents = await asyncio.gather(
+            *(
+                self._fetch_workflow_content_from_github(
+                    repo.full_name, path, installation_id
+                )
+                for path in changed_paths
+            )
+        )
+
+        workflows = {
+            workflow.path: workflow
+            for workflow in self.db.query(Workflow)
+            .filter(
+                Workflow.repository_id == repo.id,
+                Workflow.path.in_(changed_paths),
+            )
+            .all()
+        }
+        for path, (content, description, sha) in zip(changed_paths, contents):
+            workflow = workflows.get(path)
+            if not workflow or not content:
+                continue
+
+            workflow.content = content
+            workflow.content_sha = sha
+            workflow.summary = get_workflow_summary(content, sha)
+            workflow.description = description
+            workflow.badge_url = self._generate_badge_url(repo.full_name, workflow.name)
+            if workflow.state == "deleted":
+                workflow.state = "active"
+            self.db.add(workflow)
+            if path not in new_paths:
+                result["updated"] += 1
+
+        self.db.commit()
+
+        logger.info(
+            f"Synced workflow changes for {repo.full_name}: {result['updated']} updated, "
+            f"{result['added']} added, {result['removed']} removed"
+        )
+        return result
+
     async def _get_or_create_repository(
         self, repository_data: Dict, installation_id: int
     ) -> Repository:
@@ -306,7 +480,11 @@ class WorkflowService:
         return run
 
     async def _create_or_update_job(
-        self, workflow_job: Dict, repository_id: int, installation_id: int
+        self,
+        workflow_job: Dict,
+        repository_id: int,
+        installation_id: int,
+        retry: bool = True,
     ) -> Job:
         """Create or update job record"""
         job_id = str(workflow_job["id"])
@@ -322,20 +500,58 @@ class WorkflowService:
                 installation_id=installation_id,
             )
 
+        previous_status = job.status
         job.job_name = workflow_job.get("name")
         job.status = workflow_job.get("status")
         job.conclusion = workflow_job.get("conclusion")
         job.url = workflow_job.get("html_url")
         job.raw_data = workflow_job
 
+        # Queued jobs have no runner yet; later events fill it in
+        if workflow_job.get("runner_name"):
+            job.runner_name = workflow_job["runner_name"]
+            job.runner_id = resolve_runner_id(
+                self.db,
+                installation_id,
+                workflow_job.get("runner_id"),
+                workflow_job["runner_name"],
+            )
+
         if workflow_job.get("started_at"):
             job.started_at = self._parse_github_timestamp(workflow_job["started_at"])
         if workflow_job.get("completed_at"):
             job.completed_at = self._parse_github_timestamp(
                 workflow_job["completed_at"]
             )
+        if workflow_job.get("created_at"):
+            job.queued_at = self._parse_github_timestamp(workflow_job["created_at"])
+        update_job_queue_time(job, workflow_job.get("labels"))
 
         self.db.add(job)
+        try:
+            self.db.flush()
+        except IntegrityError:
+            self.db.rollback()
+            # The cached runner record may be gone; look it up again once
+            forgotten = forget_runner_id(
+                installation_id,
+                workflow_job.get("runner_id"),
+                workflow_job.get("runner_name"),
+            )
+            if not (retry and forgotten):
+                raise
+            return await self._create_or_update_job(
+                workflow_job, repository_id, installation_id, retry=False
+            )
+
+        # Redelivered completion events must not be counted twice
+        if job.status == "completed" and previous_status != "completed":
+            try:
+                with self.db.begin_nested():
+                    record_completed_job(self.db, job)
+            except Exception as e:
+                logger.error(f"Failed to add job {job_id} to queue rollups: {e}")
+
         self.db.commit()
         self.db.refresh(job)
 
@@ -376,76 +592,172 @@ class WorkflowService:
 
     async def _fetch_workflow_content_from_github(
         self, repo_full_name: str, workflow_path: str, installation_id: int
-    ) -> Tuple[Optional[str], Optional[str]]:
-        """Fetch workflow YAML content and description from GitHub"""
-        try:
-            token = await self.github_service.get_installation_token(installation_id)
-
-            async with httpx.AsyncClient() as client:
-                # Fetch file content
-                url = f"{self.github_service.api_url}/repos/{repo_full_name}/contents/{workflow_path}"
-                headers = {
-                    "Authorization": f"token {token}",
-                    "Accept": "application/vnd.github+json",
-                    "X-GitHub-Api-Version": "2022-11-28",
-                }
+    ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """Fetch workflow YAML content, description and blob SHA from GitHub"""
+        result = await github_singleflight.do(
+            f"workflow_yaml:{installation_id}:{repo_full_name}:{workflow_path}",
+            lambda: self._request_workflow_content(
+                repo_full_name, workflow_path, installation_id
+            ),
+        )
+        if not result:
+            return None, None, None
 
-                response = await client.get(url, headers=headers)
+        # Results shared through Redis come back as lists
+        content, description, sha = result
+        return content, description, sha
 
-                if response.status_code == 200:
-                    content_data = response.json()
+    async def _request_workflow_content(
+        self, repo_full_name: str, workflow_path: str, installation_id: int
+    ) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        """Request a workflow file from the GitHub contents API"""
+        try:
+            # Fetch file content
+            url = f"{self.github_service.api_url}/repos/{repo_full_name}/contents/{workflow_path}"
+            headers = {
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            }
 
-                    if content_data.get("encoding") == "base64":
-                        # Decode base64 content
-                        yaml_content = base64.b64decode(content_data["content"]).decode(
-                            "utf-8"
-                        )
+            response = await github_client.get(
+                url,
+                headers=headers,
+                auth=self.github_service.installation_auth(installation_id),
+            )
 
-                        # Extract description from YAML
-                        description = self._extract_description_from_yaml(yaml_content)
+            if response.status_code == 200:
+                content_data = response.json()
 
-                        return yaml_content, description
+                if content_data.get("encoding") == "base64":
+                    # Decode base64 content
+                    yaml_content = base64.b64decode(content_data["content"]).decode(
+                        "utf-8"
+                    )
 
-                else:
-                    logger.warning(
-                        f"Failed to fetch workflow content: {response.status_code} - {response.text}"
+                    # Parse once per blob SHA; later lookups hit the summary cache
+                    summary = get_workflow_summary(
+                        yaml_content, content_data.get("sha")
                     )
-                    return None, None
+
+                    return yaml_content, describe_workflow(summary), summary["sha"]
+
+            else:
+                logger.warning(
+                    f"Failed to fetch workflow content: {response.status_code} - {response.text}"
+                )
+                return None
 
         except Exception as e:
             logger.error(f"Error fetching workflow content from GitHub: {e}")
-            return None, None
+            return None
+
+    async def fetch_workflow_file_shas(
+        self, repo_full_name: str, installation_id: int
+    ) -> Optional[Dict[str, str]]:
+        """
+        List the workflow files of a repository with their git blob SHAs.
+
+        One contents API call returns every file in `.github/workflows`, so callers
+        can skip fetching files whose SHA matches what is already stored.
+
+        Args:
+            repo_full_name (str): The full name of the repository (owner/repo).
+            installation_id (int): The GitHub App installation ID.
+
+        Returns:
+            Optional[Dict[str, str]]: Mapping of file path to blob SHA, or None if the
+            listing could not be fetched.
+        """
+        try:
+            url = f"{self.github_service.api_url}/repos/{repo_full_name}/contents/.github/workflows"
+            headers = {
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            }
+
+            response = await github_client.get(
+                url,
+                headers=headers,
+                auth=self.github_service.installation_auth(installation_id),
+            )
+
+            if response.status_code == 404:
+                return {}
+            if response.status_code != 200:
+                logger.warning(
+                    f"Failed to list workflow files: {response.status_code} - {response.text}"
+                )
+                return None
+
+            return {
+                entry["path"]: entry["sha"]
+                for entry in response.json()
+                if entry.get("type") == "file"
+            }
+
+        except Exception as e:
+            logger.error(f"Error listing workflow files from GitHub: {e}")
+            return None
 
     async def _fetch_workflows_from_github(
         self, repo_full_name: str, installation_id: int
     ) -> List[Dict]:
         """Fetch all workflows for a repository from GitHub API"""
         try:
-            token = await self.github_service.get_installation_token(installation_id)
-
-            async with httpx.AsyncClient() as client:
-                url = f"{self.github_service.api_url}/repos/{repo_full_name}/actions/workflows"
-                headers = {
-                    "Authorization": f"token {token}",
-                    "Accept": "application/vnd.github+json",
-                    "X-GitHub-Api-Version": "2022-11-28",
-                }
-
-                response = await client.get(url, headers=headers)
-
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get("workflows", [])
-                else:
-                    logger.warning(
-                        f"Failed to fetch workflows: {response.status_code} - {response.text}"
-                    )
-                    return []
+            url = f"{self.github_service.api_url}/repos/{repo_full_name}/actions/workflows"
+            headers = {
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            }
 
+            workflows = []
+            async for page in self.github_service.paginate(
+                url,
+                headers=headers,
+                item_key="workflows",
+                auth=self.github_service.installation_auth(installation_id),
+            ):
+                workflows.extend(page)
+            return workflows
+
+        except httpx.HTTPStatusError as e:
+            logger.warning(
+                f"Failed to fetch workflows: {e.response.status_code} - {e.response.text}"
+            )
+            return []
         except Exception as e:
             logger.error(f"Error fetching workflows from GitHub: {e}")
             return []
 
+    async def _fetch_workflow_from_github(
+        self, repo_full_name: str, filename: str, installation_id: int
+    ) -> Optional[Dict]:
+        """Fetch a single workflow by its file name from GitHub API"""
+        try:
+            url = f"{self.github_service.api_url}/repos/{repo_full_name}/actions/workflows/{filename}"
+            headers = {
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            }
+
+            response = await github_client.get(
+                url,
+                headers=headers,
+                auth=self.github_service.installation_auth(installation_id),
+            )
+
+            if response.status_code != 200:
+                logger.warning(
+                    f"Failed to fetch workflow {filename}: {response.status_code} - {response.text}"
+                )
+                return None
+
+            return response.json()
+
+        except Exception as e:
+            logger.error(f"Error fetching workflow {filename} from GitHub: {e}")
+            return None
+
     async def _sync_workflow_from_github_data(
         self, workflow_data: Dict, repository_id: int, installation_id: int
     ):
@@ -477,12 +789,7 @@ class WorkflowService:
 
     def _extract_description_from_yaml(self, yaml_content: str) -> Optional[str]:
         """Extract description/name from workflow YAML"""
-        try:
-            workflow_data = yaml.safe_load(yaml_content)
-            return workflow_data.get("name") or workflow_data.get("description")
-        except Exception as e:
-            logger.debug(f"Could not parse YAML for description: {e}")
-            return None
+        return describe_workflow(get_workflow_summary(yaml_content))
 
     def _generate_badge_url(self, repo_full_name: str, workflow_name: str) -> str:
         """Generate GitHub workflow status badge URL"""
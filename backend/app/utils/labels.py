@@ -0,0 +1,32 @@
+from typing import Any, Iterable, List
+
+
+def label_names(labels: Any) -> List[str]:
+    """
+    Return the lowercase names of runner labels.
+
+    Accepts the label objects of the runners API (`{"name": ...}`), the plain
+    strings of `workflow_job` webhooks and `runs-on`, or a single string.
+    """
+    if not labels:
+        return []
+    if isinstance(labels, str):
+        labels = [labels]
+
+    names = []
+    for label in labels:
+        name = label.get("name") if isinstance(label, dict) else label
+        if name:
+            names.append(str(name).strip().lower())
+    return names
+
+
+def label_pool_key(labels: Iterable[Any]) -> str:
+    """
+    Return the key of the runner pool identified by a set of labels.
+
+    GitHub matches labels case-insensitively and ignores their order, so the key
+    is the sorted, de-duplicated, lowercase label names joined by commas. Runner
+    labels and `runs-on` labels of the same pool produce the same key.
+    """
+    return ",".join(sorted(set(label_names(labels))))
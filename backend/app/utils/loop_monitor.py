@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+event_loop_lag = registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop woke a sleeping task, a measure of blocking calls",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+event_loop_lag_max = registry.gauge(
+    "event_loop_lag_max_seconds",
+    "Largest event loop lag observed in the last monitoring window",
+)
+
+
+class EventLoopMonitor:
+    """
+    Measure event loop lag by sleeping for a fixed interval and timing the wake-up.
+
+    Any time beyond the interval is time the loop spent running something else
+    without yielding, such as a synchronous network call.
+    """
+
+    def __init__(
+        self, interval: float = 0.1, window: float = 10.0, keep_samples: bool = False
+    ):
+        self.interval = interval
+        self.window = window
+        self.max_lag = 0.0
+        self.samples: Optional[List[float]] = [] if keep_samples else None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        window_started = time.monotonic()
+        window_max = 0.0
+
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+
+            lag = max(now - started - self.interval, 0.0)
+            event_loop_lag.observe(lag)
+            if self.samples is not None:
+                self.samples.append(lag)
+            window_max = max(window_max, lag)
+            self.max_lag = max(self.max_lag, lag)
+
+            if now - window_started >= self.window:
+                event_loop_lag_max.set(window_max)
+                if window_max > 0.5:
+                    logger.warning(f"Event loop blocked for up to {window_max:.3f}s")
+                window_started, window_max = now, 0.0
+
+
+event_loop_monitor = EventLoopMonitor()
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict
+
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+singleflight_calls = registry.counter(
+    "singleflight_calls_total",
+    "Calls that executed the underlying function (flight leaders)",
+    ["group"],
+)
+singleflight_coalesced = registry.counter(
+    "singleflight_coalesced_calls_total",
+    "Calls that shared the result of an in-flight call instead of executing it",
+    ["group", "scope"],
+)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into a single in-flight call.
+
+    Callers that arrive while a call for the same key is running await that call
+    and receive its result (or exception) instead of issuing their own request.
+    When a Redis client is supplied, leaders also publish their result to Redis so
+    that callers on other workers can share it while the flight is in progress.
+    Results must be JSON serializable in that mode.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        redis_client=None,
+        lock_ttl: float = 10.0,
+        result_ttl: float = 2.0,
+        poll_interval: float = 0.05,
+    ):
+        self.name = name
+        self.redis = redis_client
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def in_flight(self) -> int:
+        """Return the number of keys with a call currently in flight."""
+        return len(self._inflight)
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        distributed: bool = True,
+    ) -> Any:
+        """
+        Run `fn` once for all concurrent callers sharing `key`.
+
+        Args:
+            key: Identity of the call. Must not contain secrets when Redis is used.
+            fn: Zero-argument coroutine function performing the call.
+            distributed: Whether the result may be shared across workers via Redis.
+
+        Returns:
+            Any: The result of the shared call.
+        """
+        task = self._inflight.get(key)
+
+        if task is not None:
+            singleflight_coalesced.inc(group=self.name, scope="local")
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(self._execute(key, fn, distributed))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._on_done(key, t))
+
+        # Shield so a cancelled caller does not cancel the call other callers await
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every waiter was cancelled
+            task.exception()
+
+    async def _execute(
+        self, key: str, fn: Callable[[], Awaitable[Any]], distributed: bool
+    ) -> Any:
+        if not self.redis or not distributed:
+            singleflight_calls.inc(group=self.name)
+            return await fn()
+
+        lock_key = f"singleflight:{self.name}:lock:{key}"
+        result_key = f"singleflight:{self.name}:result:{key}"
+        token = uuid.uuid4().hex
+
+        try:
+            acquired = await self.redis.set(
+                lock_key, token, nx=True, px=int(self.lock_ttl * 1000)
+            )
+        except Exception as e:
+            logger.debug(f"Singleflight lock unavailable for {key}: {e}")
+            singleflight_calls.inc(group=self.name)
+            return await fn()
+
+        if not acquired:
+            shared = await self._wait_for_remote_result(lock_key, result_key)
+            if shared is not None:
+                singleflight_coalesced.inc(group=self.name, scope="redis")
+                return shared["value"]
+
+        singleflight_calls.inc(group=self.name)
+        try:
+            result = await fn()
+            if acquired:
+                await self._publish_result(result_key, result)
+            return result
+        finally:
+            if acquired:
+                await self._release_lock(lock_key, token)
+
+    async def _wait_for_remote_result(self, lock_key: str, result_key: str):
+        """Poll for the result of a flight led by another worker."""
+        deadline = time.monotonic() + self.lock_ttl
+
+        try:
+            while time.monotonic() < deadline:
+                cached = await self.redis.get(result_key)
+                if cached is not None:
+                    return json.loads(cached)
+                if not await self.redis.exists(lock_key):
+                    cached = await self.redis.get(result_key)
+                    return json.loads(cached) if cached is not None else None
+                await asyncio.sleep(self.poll_interval)
+        except Exception as e:
+            logger.debug(f"Singleflight wait failed for {result_key}: {e}")
+
+        return None
+
+    async def _publish_result(self, result_key: str, result: Any):
+        try:
+            await self.redis.set(
+                result_key,
+                json.dumps({"value": result}, default=str),
+                px=int(self.result_ttl * 1000),
+            )
+        except Exception as e:
+            logger.debug(f"Failed to publish singleflight result {result_key}: {e}")
+
+    async def _release_lock(self, lock_key: str, token: str):
+        try:
+            if await self.redis.get(lock_key) == token:
+                await self.redis.delete(lock_key)
+        except Exception as e:
+            logger.debug(f"Failed to release singleflight lock {lock_key}: {e}")
@@ -1,16 +1,27 @@
 import os
+import secrets
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.utils.logger import setup_logger
 from app.db.session import engine, Base
 from app.api.router import api_router
 from app.core.config import settings
+from app.core.redis import close_redis, get_redis, init_redis
+from app.api.endpoints.sse import close_sse, configure_sse
+from app.services.github_client import github_client
+from app.services.github_service import github_singleflight
+from app.services.runner_service import (
+    configure_runner_scheduler,
+    runner_scheduler_election,
+)
+from app.utils.loop_monitor import event_loop_monitor
+from app.utils.metrics import registry
 
-# from app.core.scheduler import runner_scheduler
 from app.middleware.logging import StructuredLoggingMiddleware
 from app.middleware.auth import BetterAuthMiddleware
 
@@ -27,10 +38,21 @@ origins = os.getenv("BACKEND_CORS_ORIGINS", "").split(",")
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
-    # await runner_scheduler.start()
+    event_loop_monitor.start()
+    redis_available = await init_redis()
+    await configure_sse(redis_available)
+    configure_runner_scheduler(redis_available)
+    if settings.GITHUB_SINGLEFLIGHT_REDIS:
+        github_singleflight.redis = get_redis()
+    if settings.RUNNER_SCHEDULER_ENABLED:
+        await runner_scheduler_election.start()
     yield
     # Shutdown
-    # await runner_scheduler.stop()
+    await runner_scheduler_election.stop()
+    await close_sse()
+    await github_client.aclose()
+    await close_redis()
+    await event_loop_monitor.stop()
 
 
 app = FastAPI(
@@ -57,3 +79,15 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "Pipeline Vision"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(authorization: str = Header("")):
+    # Metrics include organization IDs and runner labels, so scrapers need the
+    # token; /metrics skips session auth since Prometheus has no session
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not secrets.compare_digest(authorization.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return registry.render()
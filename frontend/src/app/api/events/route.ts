@@ -22,6 +22,12 @@ export async function GET(request: NextRequest) {
     const sessionToken = sessionData.token;
     const userId = user.id;
 
+    // Resume from the last event the browser received, sent as a header by
+    // EventSource's own reconnects or as a query parameter by the hook's
+    const lastEventId =
+      request.headers.get("Last-Event-ID") ||
+      request.nextUrl.searchParams.get("last_event_id");
+
     const backendResponse = await fetch(`${FASTAPI_BASE_URL}/api/v1/events`, {
       method: "GET",
       headers: {
@@ -29,6 +35,7 @@ export async function GET(request: NextRequest) {
         Authorization: `Bearer ${sessionToken}`,
         Accept: "text/event-stream",
         "Cache-Control": "no-cache",
+        ...(lastEventId ? { "Last-Event-ID": lastEventId } : {}),
       },
     });
 
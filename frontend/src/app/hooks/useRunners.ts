@@ -33,6 +33,57 @@ export interface RunnersResponse {
   busy: number;
 }
 
+// A runner change pushed in a `runners_updated` SSE event. Only the fields that
+// changed are present, except for runners created since the last fetch.
+export interface RunnerChange {
+  runner_id: string | number;
+  change: "created" | "updated" | "offline";
+  name?: string;
+  status?: string;
+  busy?: boolean;
+  labels?: RunnerLabel[] | string[];
+}
+
+const isSelfHosted = (labels: (RunnerLabel | string)[] = []) =>
+  labels.some(
+    (label) =>
+      (typeof label === "string" ? label : label.name).toLowerCase() ===
+      "self-hosted"
+  );
+
+// Apply pushed runner changes to a cached runners response. Returns undefined
+// when a change can't be applied in place (a new self-hosted runner), so the
+// query must be refetched. Changes to runners the list doesn't show, such as
+// GitHub-hosted ones, are ignored.
+export function applyRunnerChanges(
+  current: RunnersResponse,
+  changes: RunnerChange[]
+): RunnersResponse | undefined {
+  const byRunnerId = new Map(changes.map((c) => [String(c.runner_id), c]));
+
+  const runners = current.runners.map((runner) => {
+    const change = byRunnerId.get(String(runner.runner_id));
+    if (!change) return runner;
+    byRunnerId.delete(String(runner.runner_id));
+    // eslint-disable-next-line @typescript-eslint/no-unused-vars
+    const { runner_id, change: _kind, ...fields } = change;
+    return { ...runner, ...fields } as Runner;
+  });
+
+  const missing = Array.from(byRunnerId.values());
+  if (missing.some((c) => c.change === "created" && isSelfHosted(c.labels))) {
+    return undefined;
+  }
+
+  return {
+    total_runners: current.total_runners,
+    runners,
+    online: runners.filter((runner) => runner.status === "online").length,
+    offline: runners.filter((runner) => runner.status === "offline").length,
+    busy: runners.filter((runner) => runner.busy).length,
+  };
+}
+
 export function useRunners() {
   const { authenticatedFetch, isAuthenticated } = useAuthenticatedFetch();
   const { preference } = usePreference();
@@ -47,8 +98,9 @@ export function useRunners() {
       return response.json();
     },
     enabled: isAuthenticated && !!preference?.organization_id,
-    refetchInterval: 30 * 1000, // 30 seconds
-    staleTime: 15 * 1000, // 15 seconds
+    // Runner changes are pushed over SSE and patched into the cache; while SSE is
+    // down, useServerSentEvents falls back to refetching this query periodically
+    staleTime: 5 * 60 * 1000, // 5 minutes
     retry: (failureCount, error) => {
       if (error instanceof Error && error.message === "Session expired") {
         return false;
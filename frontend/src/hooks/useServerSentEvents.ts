@@ -1,6 +1,17 @@
 import { useEffect, useRef, useState, useCallback } from "react";
 import { useQueryClient } from "@tanstack/react-query";
 import { usePreference } from "@/app/contexts/PreferenceContext";
+import {
+  applyRunnerChanges,
+  type RunnerChange,
+  type RunnersResponse,
+} from "@/app/hooks/useRunners";
+
+interface SSEEvent {
+  type?: string;
+  run_id?: string | number;
+  runners?: RunnerChange[];
+}
 
 export function useServerSentEvents() {
   const [isConnected, setIsConnected] = useState(false);
@@ -14,6 +25,8 @@ export function useServerSentEvents() {
   const lastHeartbeatRef = useRef<number>(Date.now());
   const healthCheckIntervalRef = useRef<NodeJS.Timeout | null>(null);
   const retryCountRef = useRef(0);
+  // ID of the last event received, to resume from after a reconnect
+  const lastEventIdRef = useRef<string | null>(null);
 
   const queryClient = useQueryClient();
   const { preference } = usePreference();
@@ -102,6 +115,68 @@ export function useServerSentEvents() {
       return;
     }
 
+    const organizationId = preference.organization_id;
+
+    // Apply a list of events, invalidating each affected query only once
+    const handleEvents = (events: SSEEvent[]) => {
+      const runIds = new Set<string>();
+      let workflowsChanged = false;
+      let jobsChanged = false;
+
+      for (const data of events) {
+        const type = data.type ?? "";
+        const isRunEvent = type.startsWith("workflow_run_");
+        // job_updated is the legacy job event, kept for compatibility
+        const isJobEvent =
+          type.startsWith("workflow_job_") || type === "job_updated";
+
+        if (isRunEvent || isJobEvent) {
+          workflowsChanged = true;
+          jobsChanged = jobsChanged || isJobEvent;
+          if (data.run_id) runIds.add(String(data.run_id));
+        }
+
+        // Handle runner changes from job webhooks and the runner sync,
+        // patching the cached runners in place instead of refetching them
+        if (type === "runners_updated") {
+          const queryKey = ["runners", organizationId];
+          const current = queryClient.getQueryData<RunnersResponse>(queryKey);
+          const updated =
+            current && applyRunnerChanges(current, data.runners ?? []);
+
+          if (updated) {
+            queryClient.setQueryData(queryKey, updated);
+          } else if (current) {
+            queryClient.invalidateQueries({ queryKey });
+          }
+        }
+      }
+
+      if (!workflowsChanged) return;
+
+      // Any open workflow run, whatever its attempt
+      if (runIds.size > 0) {
+        queryClient.invalidateQueries({
+          predicate: (query) =>
+            query.queryKey[0] === "workflow-run" &&
+            query.queryKey[1] === organizationId &&
+            runIds.has(String(query.queryKey[2])),
+        });
+      }
+
+      if (jobsChanged) {
+        queryClient.invalidateQueries({ queryKey: ["jobs"] });
+      }
+
+      // Active queries are refetched right away by the invalidation
+      queryClient.invalidateQueries({
+        queryKey: ["workflow-runs", organizationId],
+      });
+      queryClient.invalidateQueries({
+        queryKey: ["dashboard", "stats", organizationId],
+      });
+    };
+
     const connectSSE = () => {
       // Clear any existing reconnect timeout
       if (reconnectTimeoutRef.current) {
@@ -121,7 +196,11 @@ export function useServerSentEvents() {
       }
 
       try {
-        const eventSource = new EventSource("/api/events");
+        const eventSource = new EventSource(
+          lastEventIdRef.current
+            ? `/api/events?last_event_id=${encodeURIComponent(lastEventIdRef.current)}`
+            : "/api/events"
+        );
         eventSourceRef.current = eventSource;
 
         eventSource.onopen = () => {
@@ -167,7 +246,9 @@ export function useServerSentEvents() {
         eventSource.onmessage = (event) => {
           try {
             const data = JSON.parse(event.data);
-            // Only log non-heartbeat events to reduce noise
+            if (event.lastEventId) {
+              lastEventIdRef.current = event.lastEventId;
+            }
 
             // Handle heartbeat
             if (data.type === "heartbeat") {
@@ -175,135 +256,15 @@ export function useServerSentEvents() {
               return;
             }
 
-            // Handle workflow run events
-            if (data.type && data.type.startsWith("workflow_run_")) {
-              queryClient.invalidateQueries({
-                queryKey: ["workflow-runs", preference.organization_id],
-              });
-
-              queryClient.invalidateQueries({
-                queryKey: ["dashboard", "stats", preference.organization_id],
-              });
-
-              // Also invalidate specific workflow run if we have the run_id
-              if (data.run_id) {
-                queryClient.invalidateQueries({
-                  queryKey: [
-                    "workflow-run",
-                    preference.organization_id,
-                    data.run_id,
-                  ],
-                });
-
-                // Also invalidate with specific run_attempt if available
-                if (data.run_attempt) {
-                  queryClient.invalidateQueries({
-                    queryKey: [
-                      "workflow-run",
-                      preference.organization_id,
-                      data.run_id,
-                      data.run_attempt,
-                    ],
-                  });
-                }
-              }
-
-              // Force a refetch of the workflow runs list and dashboard stats
-              queryClient.refetchQueries({
-                queryKey: ["workflow-runs", preference.organization_id],
-              });
-              queryClient.refetchQueries({
-                queryKey: ["dashboard", "stats", preference.organization_id],
-              });
-            }
-
-            // Handle workflow job events
-            if (data.type && data.type.startsWith("workflow_job_")) {
-              // Invalidate specific workflow run details if open (includes jobs)
-              if (data.run_id) {
-                // Invalidate all workflow-run queries for this run_id regardless of attempt
-                const baseQueryKey = [
-                  "workflow-run",
-                  preference.organization_id,
-                  data.run_id,
-                ];
-                queryClient.invalidateQueries({ queryKey: baseQueryKey });
-
-                // Also invalidate with specific run_attempt if available
-                if (data.run_attempt) {
-                  const specificQueryKey = [
-                    "workflow-run",
-                    preference.organization_id,
-                    data.run_id,
-                    data.run_attempt,
-                  ];
-                  queryClient.invalidateQueries({ queryKey: specificQueryKey });
-                }
-
-                // More aggressive: invalidate any workflow-run query that contains this run_id
-                queryClient.invalidateQueries({
-                  predicate: (query) => {
-                    const isWorkflowRun = query.queryKey[0] === "workflow-run";
-                    const matchesOrg =
-                      query.queryKey[1] === preference.organization_id;
-                    const matchesRunId = query.queryKey[2] === data.run_id;
-                    const shouldInvalidate =
-                      isWorkflowRun && matchesOrg && matchesRunId;
-                    if (shouldInvalidate) {
-                    }
-                    return shouldInvalidate;
-                  },
-                });
-              }
-
-              // Invalidate general jobs queries (broader pattern to catch different keys)
-              queryClient.invalidateQueries({
-                queryKey: ["jobs"],
-              });
-
-              // Invalidate dashboard stats to update running jobs count
-              queryClient.invalidateQueries({
-                queryKey: ["dashboard", "stats", preference.organization_id],
-              });
-
-              // Force a refetch of the workflow runs list and dashboard stats to show job updates
-              queryClient.refetchQueries({
-                queryKey: ["workflow-runs", preference.organization_id],
-              });
-              queryClient.refetchQueries({
-                queryKey: ["dashboard", "stats", preference.organization_id],
-              });
+            // Events were missed while disconnected and can't be replayed
+            if (data.type === "resync") {
+              performFallbackRefresh();
+              return;
             }
 
-            // Handle legacy job_updated event (keep for compatibility)
-            if (data.type === "job_updated") {
-              if (data.run_id) {
-                queryClient.invalidateQueries({
-                  queryKey: [
-                    "workflow-run",
-                    preference.organization_id,
-                    data.run_id,
-                  ],
-                });
-              }
-
-              queryClient.invalidateQueries({
-                queryKey: ["jobs"],
-              });
-
-              // Invalidate dashboard stats to update running jobs count
-              queryClient.invalidateQueries({
-                queryKey: ["dashboard", "stats", preference.organization_id],
-              });
-
-              // Force a refetch of the workflow runs list and dashboard stats
-              queryClient.refetchQueries({
-                queryKey: ["workflow-runs", preference.organization_id],
-              });
-              queryClient.refetchQueries({
-                queryKey: ["dashboard", "stats", preference.organization_id],
-              });
-            }
+            // The server sends bursts of events collected within a short
+            // window as one batch, with the latest state of each run and job
+            handleEvents(data.type === "batch" ? data.events : [data]);
           } catch (e) {
             console.error(e);
           }
@@ -340,6 +301,7 @@ export function useServerSentEvents() {
       setRetryCount(0);
       retryCountRef.current = 0;
       setError(null);
+      lastEventIdRef.current = null;
     };
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [preference?.organization_id, queryClient]);